@@ -69,6 +69,22 @@ def create_app(config_name='development'):
         response.headers["Access-Control-Allow-Credentials"] = "true"
         return response
 
+    # Compress JSON/text responses; installed before Socket.IO wraps wsgi_app,
+    # so Engine.IO traffic bypasses it
+    if app.config.get('COMPRESSION_ENABLED'):
+        from app.utils.compression import CompressionMiddleware
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            min_size=app.config.get('COMPRESSION_MIN_SIZE', 1024),
+            level=app.config.get('COMPRESSION_LEVEL', 6),
+            cache_size=app.config.get('COMPRESSION_CACHE_SIZE', 256)
+        )
+
+    # orjson-backed provider for jsonify and Socket.IO packets; must be set
+    # before socketio.init_app below captures app.json
+    from app.utils.json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
+
     # Configure Socket.IO
     socketio.init_app(
         app,
@@ -110,6 +126,48 @@ def create_app(config_name='development'):
     
     # Register blueprints
     register_blueprints(app)
+
+    # Statistics rollup hooks, cache invalidation and `flask stats` commands
+    from app.utils.rollups import init_rollups
+    from app.utils.stats import init_stats_cache
+    init_rollups(app)
+    init_stats_cache()
+
+    # Search index DDL for db.create_all (FTS5 shadow tables on SQLite)
+    from app.utils.search import init_search
+    init_search()
+
+    # Admin lookup autocomplete index and its incremental update hooks
+    from app.utils.autocomplete import init_autocomplete
+    init_autocomplete(app)
+
+    # Per-request SQL statement counting for @query_budget views
+    from app.utils.query_budget import init_query_budget
+    init_query_budget(app)
+
+    # Per-user data versions behind conditional GET on loans and withdrawals
+    from app.utils.etags import init_etags
+    init_etags()
+
+    # Drop cached user identities when role, status or credentials change
+    from app.utils.identity import init_identity_cache
+    init_identity_cache()
+
+    # Password hashing in a bounded process pool, with the configured method and cost
+    from app.utils.passwords import init_passwords
+    init_passwords(app)
+
+    # `flask purge` command group for expired tokens and old audit rows
+    from app.utils.retention import init_retention
+    init_retention(app)
+
+    # Worker ID for Snowflake-style loan application numbers
+    from app.utils.application_numbers import init_application_numbers
+    init_application_numbers(app)
+
+    # Background job queue and the `flask worker` command
+    from app.utils.jobs import init_jobs
+    init_jobs(app)
     
     # Production-specific setup
     if config_name == 'production':
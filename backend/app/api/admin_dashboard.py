@@ -3,15 +3,15 @@ Admin dashboard API module providing administrative endpoints for platform manag
 Includes routes for statistics, loan management, user management, and OTP generation.
 """
 import sqlalchemy.exc
-import random
 
 from functools import wraps
 import logging
 from datetime import datetime, timedelta
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from flask_limiter.middleware import current_remote_address
 from flask_limiter.util import get_remote_address
@@ -25,9 +25,17 @@ app_limiter = Limiter(
 )
 from app.models.user import AccountStatus, User
 from app.models.loan import Loan, LoanStatus
-from app.models.activity_log import ActivityLog
 from app.models.withdrawal import Withdrawal
-from app.models.OTP import OTP
+from app.utils.audit import audit_admin_action
+from app.utils.autocomplete import DEFAULT_LIMIT, WARMING_RETRY_AFTER, autocomplete_index
+from app.utils.otp import ALLOWED_LENGTHS as ALLOWED_OTP_LENGTHS, issue_otp
+from app.utils.fieldsets import ADMIN_LOAN_FIELDS, ADMIN_USER_FIELDS, LOAN_FIELDS, USER_FIELDS
+from app.utils.pagination import parse_sort, requested_count_strategy
+from app.utils.query_budget import query_budget
+from app.utils.read_models import read_page, read_select
+from app.utils.search import loan_search_clause, user_search_clause
+from app.utils.stats import cached_platform_stats
+from app.utils.timeseries import INTERVALS, parse_timestamp, volume_series
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -41,6 +49,10 @@ limiter = Limiter(
 
 admin_dashboard_bp = Blueprint('admin_dashboard', __name__, url_prefix='/api/admin')
 
+# Columns the admin listings may be sorted (and therefore keyset-paginated) by
+LOAN_SORT_FIELDS = {'created_at', 'loan_amount', 'application_date', 'application_number'}
+USER_SORT_FIELDS = {'created_at', 'name', 'phone_number'}
+
 def admin_required(allowed_roles=['admin']):
     """Decorator to enforce flexible role-based admin authentication"""
     def wrapper(f):
@@ -70,7 +82,7 @@ def secure_data():
 
 @admin_dashboard_bp.route('/generate-otp', methods=['POST'])
 @limiter.limit("50 per minute")
-@admin_required
+@admin_required()
 def generate_otp():
     """Admin route to generate OTP for a customer"""
     try:
@@ -82,93 +94,33 @@ def generate_otp():
             return jsonify({"error": "Customer ID is required"}), 400
 
         # Validate OTP length
-        if otp_length not in [6, 8, 10]:
+        if otp_length not in ALLOWED_OTP_LENGTHS:
             return jsonify({
                 "error": "Invalid OTP length, please provide a length of 6, 8, or 10"
             }), 400
-    
-        # Generate OTP
-        otp_code = ''.join(random.choices('0123456789', k=otp_length))
 
-        # Save OTP to the database
-        otp_entry = OTP(customer_id=customer_id, otp_code=otp_code, created_at=datetime.utcnow())
-        db.session.add(otp_entry)
-        db.session.commit()
+        # Hashed in Redis with a TTL; the plain code is only returned here
+        otp_code = issue_otp(int(customer_id), otp_length)
 
         return jsonify({"otp_code": otp_code}), 200
 
     except (ValueError, TypeError) as e:
         logger.error("OTP generation validation error: %s", str(e))
         return jsonify({"error": "Invalid input data for OTP generation"}), 400
-    except sqlalchemy.exc.SQLAlchemyError as e:
-        logger.error("OTP database error: %s", str(e))
-        return jsonify({"error": "Failed to save OTP to database"}), 500
 
 @admin_dashboard_bp.route('/stats', methods=['GET'])
 @limiter.limit("10 per minute")
-@admin_required
+@admin_required()
+@query_budget(8)
 def get_platform_stats():
     """Get comprehensive platform statistics with caching"""
     try:
-        # Time ranges for analytics
-        now = datetime.utcnow()
-        time_ranges = {
-            '24h': now - timedelta(hours=24),
-            '7d': now - timedelta(days=7),
-            '30d': now - timedelta(days=30)
-        }
-
-        # User analytics
-        user_stats = {
-            'total': User.query.count(),
-            'new': {
-                '24h': User.query.filter(User.created_at >= time_ranges['24h']).count(),
-                '7d': User.query.filter(User.created_at >= time_ranges['7d']).count(),
-                '30d': User.query.filter(User.created_at >= time_ranges['30d']).count()
-            }
-        }
-
-        # Loan analytics
-        loan_stats = {
-            'total': Loan.query.count(),
-            'amount': {
-                'total': db.session.query(db.func.sum(Loan.loan_amount)).scalar() or 0,
-                'approved': db.session.query(db.func.sum(Loan.loan_amount))
-                            .filter(LoanStatus == LoanStatus.APPROVED).scalar() or 0
-            },
-            'status': {
-                status.name: Loan.query.filter(LoanStatus == LoanStatus).count()
-                for status in LoanStatus
-            }
-        }
-
-        # Withdrawal analytics
-        withdrawal_stats = {
-            'amount': Withdrawal.query.count(),
-            'otp-code': Withdrawal.query.count(),
-            'completed': Withdrawal.query.filter_by(WithdrawalStatus='COMPLETED').count(),
-            'pending': Withdrawal.query.filter_by(WithdrawalStatus='Processing...').count()
-        }
-
-        # Recent activity
-        recent_activity = {
-            'loans': [loan.to_admin_dict() for loan in 
-                     Loan.query.order_by(Loan.created_at.desc()).limit(5).all()],
-            'users': [user.to_admin_dict() for user in 
-                     User.query.order_by(User.created_at.desc()).limit(5).all()],
-            'withdrawals': [w.to_admin_dict() for w in 
-                          Withdrawal.query.order_by(Withdrawal.created_at.desc()).limit(5).all()]
-        }
-
         return jsonify({
             'status': 'success',
-            'data': {
-                'users': user_stats,
-                'loans': loan_stats,
-                'withdrawals': withdrawal_stats,
-                'recent_activity': recent_activity,
-                'timestamp': now.isoformat()
-            }
+            'data': cached_platform_stats(
+                ttl=current_app.config.get('STATS_CACHE_TTL', 60),
+                stale_ttl=current_app.config.get('STATS_CACHE_STALE_TTL', 300)
+            )
         })
 
     except (AttributeError, TypeError) as e:
@@ -186,15 +138,80 @@ def get_platform_stats():
             'code': 'STATS_RETRIEVAL_ERROR'
         }), 500
 
+@admin_dashboard_bp.route('/stats/timeseries', methods=['GET'])
+@limiter.limit("30 per minute")
+@admin_required()
+@query_budget(3)
+def get_stats_timeseries():
+    """Get hourly, daily or weekly loan and withdrawal volume over a date range"""
+    try:
+        interval = request.args.get('interval', 'day')
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported interval: {interval}")
+
+        end = request.args.get('end')
+        end = parse_timestamp(end) if end else datetime.utcnow()
+        start = request.args.get('start')
+        start = parse_timestamp(start) if start else end - INTERVALS[interval] * 30
+
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'interval': interval,
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'series': volume_series(start, end, interval)
+            }
+        })
+
+    except ValueError as e:
+        logger.error("Time series parameter error: %s", str(e))
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'code': 'INVALID_PARAMETERS'
+        }), 400
+    except sqlalchemy.exc.SQLAlchemyError as e:
+        logger.error("Database error in stats time series: %s", str(e))
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to retrieve time series from database',
+            'code': 'STATS_RETRIEVAL_ERROR'
+        }), 500
+
+@admin_dashboard_bp.route('/lookup/suggest', methods=['GET'])
+@limiter.limit("300 per minute")
+@admin_required()
+@query_budget(2)
+def lookup_suggest():
+    """Prefix suggestions for customer names, phone numbers and application numbers"""
+    prefix = request.args.get('q', '').strip()
+    if not prefix:
+        return jsonify({'status': 'success', 'data': {'suggestions': []}})
+
+    suggestions = autocomplete_index.suggest(
+        prefix,
+        limit=request.args.get('limit', DEFAULT_LIMIT, type=int),
+        max_age=current_app.config.get('AUTOCOMPLETE_MAX_AGE')
+    )
+    if suggestions is None:
+        # The index is being built in the background; never scan the tables here
+        response = jsonify({'status': 'success', 'data': {'suggestions': [], 'warming': True}})
+        response.headers['Retry-After'] = str(WARMING_RETRY_AFTER)
+        return response
+
+    return jsonify({'status': 'success', 'data': {'suggestions': suggestions}})
+
 @admin_dashboard_bp.route('/loans', methods=['GET'])
 @limiter.limit("10 per minute")
-@admin_required
+@admin_required()
+@query_budget(2)
 def get_loans():
     """Get paginated, filterable list of loans with advanced search"""
     try:
         # Parse query parameters
         params = {
-            'page': request.args.get('page', 1, type=int),
+            'cursor': request.args.get('cursor'),
             'per_page': request.args.get('per_page', 20, type=int),
             'status': request.args.get('status'),
             'search': request.args.get('search', '').strip(),
@@ -202,61 +219,50 @@ def get_loans():
             'min_amount': request.args.get('min_amount', type=float),
             'max_amount': request.args.get('max_amount', type=float),
             'date_from': request.args.get('date_from'),
-            'date_to': request.args.get('date_to')
+            'date_to': request.args.get('date_to'),
+            'fields': LOAN_FIELDS.parse(request.args.get('fields'), default=ADMIN_LOAN_FIELDS)
         }
+        sort_column, descending = parse_sort(Loan, params['sort'], LOAN_SORT_FIELDS)
 
-        # Base query
-        query = Loan.query.join(User)
+        # Only the requested columns (and borrower join) are selected, as plain rows
+        query = read_select(LOAN_FIELDS, params['fields'], sort_column)
 
         # Apply filters
         if params['status']:
-            query = query.filter(LoanStatus == params['status'])
+            query = query.where(Loan.loan_status == LoanStatus(params['status']))
 
         if params['search']:
-            search = f"%{params['search']}%"
-            query = query.filter(
-                db.or_(
-                    Loan.application_number.ilike(search),
-                    User.username.ilike(search),
-                    User.email.ilike(search),
-                    User.phone_number.ilike(search)
-                )
-            )
+            query = query.where(loan_search_clause(params['search']))
 
         if params['min_amount']:
-            query = query.filter(Loan.loan_amount >= params['min_amount'])
+            query = query.where(Loan.loan_amount >= params['min_amount'])
 
         if params['max_amount']:
-            query = query.filter(Loan.loan_amount <= params['max_amount'])
+            query = query.where(Loan.loan_amount <= params['max_amount'])
 
         if params['date_from']:
-            query = query.filter(Loan.created_at >= params['date_from'])
+            query = query.where(Loan.created_at >= params['date_from'])
 
         if params['date_to']:
-            query = query.filter(Loan.created_at <= params['date_to'])
-
-        # Apply sorting
-        sort_field, sort_dir = params['sort'][0] == '-', params['sort'].lstrip('-')
-        sort_column = getattr(Loan, sort_field, Loan.created_at)
-        query = query.order_by(sort_column.desc() if sort_dir else sort_column.asc())
-
-        # Pagination
-        paginated_loans = query.paginate(
-            page=params['page'],
+            query = query.where(Loan.created_at <= params['date_to'])
+
+        # Keyset pagination on the sort column plus primary key
+        loans, pagination = read_page(
+            query,
+            LOAN_FIELDS.row_serializer(params['fields']),
+            sort_column,
+            LOAN_FIELDS.primary_key,
+            descending=descending,
             per_page=params['per_page'],
-            error_out=False
+            cursor=params['cursor'],
+            count_strategy=requested_count_strategy()
         )
 
         return jsonify({
             'status': 'success',
             'data': {
-                'loans': [loan.to_admin_dict() for loan in paginated_loans.items],
-                'pagination': {
-                    'total': paginated_loans.total,
-                    'pages': paginated_loans.pages,
-                    'current_page': paginated_loans.page,
-                    'per_page': paginated_loans.per_page
-                }
+                'loans': loans,
+                'pagination': pagination
             }
         })
 
@@ -277,11 +283,12 @@ def get_loans():
 
 @admin_dashboard_bp.route('/loans/<string:loan_id>', methods=['GET', 'PUT', 'PATCH', 'DELETE'])
 @limiter.limit("10 per minute")
-@admin_required
+@admin_required()
+@query_budget(6)
 def manage_loan(loan_id):
     """Manage individual loan and related customer data with audit logging"""
-    loan = Loan.query.filter_by(application_number=loan_id).first_or_404()
-    users = User.query.get(loan.user_id)
+    loan = Loan.query.options(joinedload(Loan.borrower)).filter_by(application_number=loan_id).first_or_404()
+    users = loan.borrower
 
     if request.method == 'GET':
         return jsonify({
@@ -292,7 +299,6 @@ def manage_loan(loan_id):
     elif request.method in ['PUT', 'PATCH']:
         try:
             data = request.get_json()
-            admin_id = get_jwt().get('sub')
             changes = []
 
             # Update loan status
@@ -320,17 +326,9 @@ def manage_loan(loan_id):
                     changes.append(f"{field} changed from {old_value} to {data[field]}")
 
             if changes:
-                # Create audit log
-                audit_log = ActivityLog(
-                    admin_id=admin_id,
-                    customer_id=users.id,
-                    loan_id=loan.id,
-                    action="CUSTOMER_LOAN_UPDATE",
-                    description=" | ".join(changes),
-                    ip_address=request.remote_addr
-                )
-                db.session.add(audit_log)
                 db.session.commit()
+                # Audit row written by a background job, outside the request
+                audit_admin_action(f"CUSTOMER_LOAN_UPDATE {loan_id}: " + " | ".join(changes))
 
             return jsonify({
                 'status': 'success',
@@ -357,23 +355,12 @@ def manage_loan(loan_id):
 
     elif request.method == 'DELETE':
         try:
-            admin_id = get_jwt().get('sub')
-
             # Soft delete customer data
             users.status = AccountStatus.INACTIVE  # Mark as inactive instead of permanent deletion
             loan.status = LoanStatus.DELETED  # Mark loan as deleted
             db.session.commit()
 
-            audit_log = ActivityLog(
-                admin_id=admin_id,
-                customer_id=users.id,
-                loan_id=loan.id,
-                action="CUSTOMER_LOAN_DELETE",
-                description=f"Loan {loan_id} and Customer {users.full_name} marked as INACTIVE",
-                ip_address=request.remote_addr
-            )
-            db.session.add(audit_log)
-            db.session.commit()
+            audit_admin_action(f"CUSTOMER_LOAN_DELETE {loan_id}: customer {users.user_id} marked as INACTIVE")
 
             return jsonify({'status': 'success', 'message': 'Customer and loan data deleted successfully'})
 
@@ -389,60 +376,51 @@ def manage_loan(loan_id):
 
 @admin_dashboard_bp.route('/users', methods=['GET'])
 @limiter.limit("10 per minute")
-@admin_required
+@admin_required()
+@query_budget(2)
 def get_users():
     """Get paginated user list with advanced filtering"""
     try:
         params = {
-            'page': request.args.get('page', 1, type=int),
+            'cursor': request.args.get('cursor'),
             'per_page': request.args.get('per_page', 20, type=int),
             'search': request.args.get('search', '').strip(),
             'role': request.args.get('role'),
             'status': request.args.get('status'),
-            'sort': request.args.get('sort', '-created_at')
+            'sort': request.args.get('sort', '-created_at'),
+            'fields': USER_FIELDS.parse(request.args.get('fields'), default=ADMIN_USER_FIELDS)
         }
+        sort_column, descending = parse_sort(User, params['sort'], USER_SORT_FIELDS)
 
-        query = User.query
+        query = read_select(USER_FIELDS, params['fields'], sort_column)
 
         # Apply filters
         if params['search']:
-            search = f"%{params['search']}%"
-            query = query.filter(
-                db.or_(
-                    User.username.ilike(search),
-                    User.email.ilike(search),
-                    User.phone_number.ilike(search)
-                )
-            )
+            query = query.where(user_search_clause(params['search']))
 
         if params['role']:
-            query = query.filter(User.role == params['role'])
+            query = query.where(User.role == params['role'])
 
-        if params['account_status']:
-            query = query.filter(User.is_active == (params['account_status'] == 'active'))
-
-        # Apply sorting
-        sort_field, sort_dir = params['sort'][0] == '-', params['sort'].lstrip('-')
-        sort_column = getattr(User, sort_field, User.created_at)
-        query = query.order_by(sort_column.desc() if sort_dir else sort_column.asc())
-
-        # Pagination
-        paginated_users = query.paginate(
-            page=params['page'],
+        if params['status']:
+            query = query.where(User.account_status == AccountStatus(params['status'].lower()))
+
+        # Keyset pagination on the sort column plus primary key
+        users, pagination = read_page(
+            query,
+            USER_FIELDS.row_serializer(params['fields']),
+            sort_column,
+            USER_FIELDS.primary_key,
+            descending=descending,
             per_page=params['per_page'],
-            error_out=False
+            cursor=params['cursor'],
+            count_strategy=requested_count_strategy()
         )
 
         return jsonify({
             'status': 'success',
             'data': {
-                'users': [user.to_admin_dict() for user in paginated_users.items],
-                'pagination': {
-                    'total': paginated_users.total,
-                    'pages': paginated_users.pages,
-                    'current_page': paginated_users.page,
-                    'per_page': paginated_users.per_page
-                }
+                'users': users,
+                'pagination': pagination
             }
         })
 
@@ -471,6 +449,8 @@ def configure_admin_routes(bp):
     # Register routes directly on the provided blueprint
     bp.add_url_rule('/generate-otp', view_func=generate_otp, methods=['POST'])
     bp.add_url_rule('/stats', view_func=get_platform_stats, methods=['GET'])
+    bp.add_url_rule('/stats/timeseries', view_func=get_stats_timeseries, methods=['GET'])
+    bp.add_url_rule('/lookup/suggest', view_func=lookup_suggest, methods=['GET'])
     bp.add_url_rule('/loans', view_func=get_loans, methods=['GET'])
     bp.add_url_rule('/loans/<string:loan_id>', view_func=manage_loan, methods=['GET', 'PUT', 'PATCH'])
     bp.add_url_rule('/users', view_func=get_users, methods=['GET'])
@@ -9,12 +9,15 @@ from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
     jwt_required,
+    get_jwt,
     get_jwt_identity
 )
 from flask_limiter.util import get_remote_address
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from werkzeug.security import generate_password_hash
 from app.models.user import User
+from app.utils.identity import load_identity
+from app.utils.passwords import hash_password, verify_and_upgrade
+from app.utils.revocation import revoke_token
 from app.utils.validators import validate_password, validate_email, validate_phone
 from app.models import db, limiter
 
@@ -49,11 +52,21 @@ def create_auth_response(user):
 
 def validate_admin_request(current_user):
     """Validate admin privileges."""
-    if not current_user or current_user.role < ROLES['admin']:
+    if not current_user or not current_user.role or current_user.role.value < ROLES['admin']:
         logger.warning("Unauthorized admin access attempt by user %s", get_jwt_identity())
         return jsonify({'error': 'Insufficient privileges'}), 403
     return None
 
+def save_upgraded_hash(user):
+    """Persist a password hash replaced on login; a failure here must not fail the login."""
+    if user not in db.session.dirty:
+        return
+    try:
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.warning("Could not store upgraded password hash for user %s: %s", user.user_id, str(e))
+
 # ======================
 # ADMIN AUTH ENDPOINTS
 # ======================
@@ -63,7 +76,7 @@ def validate_admin_request(current_user):
 @limiter.limit("10 per day", key_func=lambda: get_jwt_identity() or get_remote_address())
 def admin_register():
     """Register new admin account."""
-    current_user = User.query.get(get_jwt_identity())
+    current_user = load_identity(get_jwt_identity())
     if error := validate_admin_request(current_user):
         return error
 
@@ -83,7 +96,7 @@ def admin_register():
         admin = User(
             username=data['username'],
             email=data['email'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=hash_password(data['password']),
             role=ROLES['admin'],
             is_active=True
         )
@@ -91,7 +104,7 @@ def admin_register():
         db.session.add(admin)
         db.session.commit()
         
-        logger.info("New admin created by %s", current_user.username)
+        logger.info("New admin created by %s", current_user.name)
         return jsonify(create_auth_response(admin)), 201
         
     except IntegrityError:
@@ -116,8 +129,9 @@ def admin_login():
         role=ROLES['admin']
     ).first()
     
-    if not admin or not admin.check_password(data['password']):
+    if not admin or not verify_and_upgrade(admin, data['password']):
         return jsonify({'error': 'Invalid credentials'}), 401
+    save_upgraded_hash(admin)
 
     logger.info("Admin login: %s", admin.email)
     return jsonify(create_auth_response(admin)), 200
@@ -146,7 +160,7 @@ def user_register():
         user = User(
             phone_number=data['phone_number'],
             username=data['username'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=hash_password(data['password']),
             role=ROLES['user'],
             is_active=True
         )
@@ -182,8 +196,9 @@ def user_login():
         role=ROLES['user']
     ).first()
     
-    if not user or not user.check_password(data['password']):
+    if not user or not verify_and_upgrade(user, data['password']):
         return jsonify({'error': 'Invalid credentials'}), 401
+    save_upgraded_hash(user)
 
     logger.info("User login: %s", user.phone_number)
     return jsonify(create_auth_response(user)), 200
@@ -196,14 +211,22 @@ def user_login():
 @jwt_required(refresh=True)
 def refresh_tokens():
     """Refresh access token endpoint."""
-    current_user = User.query.get(get_jwt_identity())
+    current_user = load_identity(get_jwt_identity())
     if not current_user:
         return jsonify({'error': 'User not found'}), 404
         
     return jsonify({
-        'access_token': create_access_token(identity=current_user.id)
+        'access_token': create_access_token(identity=current_user.user_id)
     }), 200
 
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """Revoke the access or refresh token presented with the request."""
+    revoke_token(get_jwt())
+    logger.info("Token revoked for user %s", get_jwt_identity())
+    return jsonify({'message': 'Token revoked'}), 200
+
 def configure_auth_routes(bp):
     """
     Configure routes for the auth blueprint
@@ -216,4 +239,5 @@ def configure_auth_routes(bp):
     bp.add_url_rule('/admin/login', view_func=admin_login, methods=['POST'])
     bp.add_url_rule('/register', view_func=user_register, methods=['POST'])
     bp.add_url_rule('/login', view_func=user_login, methods=['POST'])
-    bp.add_url_rule('/refresh', view_func=refresh_tokens, methods=['POST'])
\ No newline at end of file
+    bp.add_url_rule('/refresh', view_func=refresh_tokens, methods=['POST'])
+    bp.add_url_rule('/logout', view_func=logout, methods=['POST'])
\ No newline at end of file
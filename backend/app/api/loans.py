@@ -2,21 +2,31 @@
 API endpoints for loan management functionality.
 Provides CRUD operations for loan applications and status updates.
 """
+import logging
 from datetime import datetime, timedelta
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.audit import audit_admin_action
 from app.utils.decorators import admin_required
 from app.models import db
-from app.models.loan import Loan, LoanStatus
+from app.models.loan import NATIONAL_ID_CONSTRAINT, PENDING_LOAN_INDEX, Loan, LoanStatus
 from app.utils.validators import validate_loan_request
-from app.utils.pagination import paginate
+from app.utils.etags import conditional_get
+from app.utils.fieldsets import LOAN_DETAIL_FIELDS, LOAN_FIELDS
+from app.utils.idempotency import idempotent
+from app.utils.read_models import paginate_read_model
+from app.utils.sql import violates_unique
 import sqlalchemy.exc
+from sqlalchemy import false
+
+logger = logging.getLogger(__name__)
 
 loans_bp = Blueprint('loans', __name__, url_prefix='/api/loans')
 
 @loans_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_loan():
     """Create a new loan application"""
     current_user_id = get_jwt_identity()
@@ -29,28 +39,17 @@ def create_loan():
     if error := validate_loan_request(data):
         return jsonify({'message': error}), 400
     
-    # Check if user has existing pending loan
-    existing_loan = Loan.query.filter_by(
-        user_id=current_user_id,
-        status=LoanStatus.PENDING
-    ).first()
-    
-    if existing_loan:
-        return jsonify({
-            'message': 'You already have a pending loan application',
-            'application_number': existing_loan.application_number
-        }), 400
-    
-    # Create new loan
+    # One INSERT; the partial unique index rejects a second pending application
     loan = Loan(
         user_id=current_user_id,
         application_number=Loan.generate_application_number(),
+        national_id=data['national_id'].strip(),
         loan_amount=data['amount'],
         interest_rate=data.get('interest_rate', 4.0),
-        termMonths=data['termMonths'],
+        term_months=data['termMonths'],
         purpose=data.get('purpose', 'Personal Loan'),
         application_date=datetime.utcnow(),
-        status=LoanStatus.PENDING
+        loan_status=LoanStatus.PENDING
     )
     
     try:
@@ -61,36 +60,56 @@ def create_loan():
             'application_number': loan.application_number,
             'loan': loan.to_dict()
         }), 201
+    except sqlalchemy.exc.IntegrityError as e:
+        db.session.rollback()
+        if violates_unique(e, NATIONAL_ID_CONSTRAINT, 'loans', ('national_id',)):
+            return jsonify({'message': 'An application with this national ID already exists'}), 400
+        if not violates_unique(e, PENDING_LOAN_INDEX, 'loans', ('user_id',)):
+            logger.error("Integrity error creating loan for user %s: %s", current_user_id, str(e))
+            return jsonify({'message': 'Database error'}), 500
+        # Only the rejected path reads the existing application
+        return jsonify({
+            'message': 'You already have a pending loan application',
+            'application_number': db.session.query(Loan.application_number).filter_by(
+                user_id=current_user_id, loan_status=LoanStatus.PENDING
+            ).scalar()
+        }), 400
     except (ValueError, TypeError) as e:
         db.session.rollback()
-        return jsonify({'message': 'Validation error', 'error': str(e)}), 400
+        logger.warning("Invalid loan application from user %s: %s", current_user_id, str(e))
+        return jsonify({'message': 'Validation error'}), 400
     except sqlalchemy.exc.SQLAlchemyError as e:
         db.session.rollback()
-        return jsonify({'message': 'Database error', 'error': str(e)}), 500
+        logger.error("Database error creating loan for user %s: %s", current_user_id, str(e))
+        return jsonify({'message': 'Database error'}), 500
 
 @loans_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get
 def get_loans():
     """Get paginated list of loans for current user"""
     current_user_id = get_jwt_identity()
     status = request.args.get('status')
     
-    # Start building query
-    query = Loan.query.filter_by(user_id=current_user_id)
+    # Start building filters
+    criteria = [Loan.user_id == current_user_id, Loan.is_deleted == false()]
     
     # Filter by status if provided
     if status and hasattr(LoanStatus, status):
-        query = query.filter(Loan.status == status)
-    
-    # Paginate results
-    return paginate(
-        query,
-        serializer=lambda loan: loan.to_dict(),
-        per_page=min(request.args.get('per_page', 10, type=int), 100)
+        criteria.append(Loan.loan_status == LoanStatus[status])
+    
+    # Paginate rows straight from a Core select, newest first
+    return paginate_read_model(
+        LOAN_FIELDS,
+        criteria,
+        default_fields=LOAN_DETAIL_FIELDS,
+        per_page=min(request.args.get('per_page', 10, type=int), 100),
+        sort_column=Loan.created_at
     )
 
 @loans_bp.route('/<string:loan_id>', methods=['GET'])
 @jwt_required()
+@conditional_get
 def get_loan(loan_id):
     """Get details of a specific loan"""
     current_user_id = get_jwt_identity()
@@ -189,6 +208,7 @@ def update_loan_status(loan_id):
     
     try:
         db.session.commit()
+        audit_admin_action(f"LOAN_STATUS {loan.application_number}: {new_status}")
         return jsonify(loan.to_dict()), 200
     except (ValueError, AttributeError) as e:
         db.session.rollback()
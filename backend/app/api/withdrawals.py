@@ -4,40 +4,28 @@ Provides functionality for creating, retrieving, and managing withdrawal request
 """
 import uuid
 from datetime import datetime
-from functools import wraps
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import db
 from app.models.withdrawal import Withdrawal, WithdrawalStatus
+from app.utils.audit import audit_admin_action
+from app.utils.decorators import admin_required
+from app.utils.etags import conditional_get
+from app.utils.fieldsets import WITHDRAWAL_FIELDS
+from app.utils.idempotency import idempotent
+from app.utils.otp import verify_otp
+from app.utils.read_models import read_offset_page, read_select
 from app.utils.validators import validate_withdrawal_request
 import sqlalchemy.exc
+from sqlalchemy import false
 
 # Blueprint for withdrawals
 withdrawals_bp = Blueprint("withdrawals", __name__)
 
-# Admin access decorator
-def admin_required(func):
-    """
-    Decorator to restrict access to admin users only.
-    
-    Args:
-        func: The function to be decorated
-        
-    Returns:
-        The wrapped function that checks for admin privileges
-    """
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        # In a real scenario, replace this with your user role verification logic
-        current_user_role = get_jwt_identity()  # Fetch user identity and determine role
-        if current_user_role != 'admin':  # Adjust this condition to fit your logic
-            return jsonify({'message': 'Admin access required'}), 403
-        return func(*args, **kwargs)
-    return wrapper
-
 @withdrawals_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_withdrawal():
     """
     Create a new withdrawal request.
@@ -62,6 +50,10 @@ def create_withdrawal():
     if data['amount'] <= 0:
         return jsonify({'message': 'Withdrawal amount must be greater than zero'}), 400
 
+    # Single Redis round trip; the code is consumed whether or not the insert succeeds
+    if not verify_otp(current_user_id, data['otp-code']):
+        return jsonify({'message': 'Invalid or expired OTP'}), 400
+
     # Generate a unique transaction ID
     transaction_id = str(uuid.uuid4())
 
@@ -89,6 +81,7 @@ def create_withdrawal():
 
 @withdrawals_bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get
 def get_withdrawals():
     """
     Retrieve a paginated list of user's withdrawal requests.
@@ -104,28 +97,38 @@ def get_withdrawals():
     per_page = min(request.args.get('per_page', 10, type=int), 100)  # Limit max items per page
     status = request.args.get('status')
 
-    query = Withdrawal.query.filter_by(user_id=current_user_id)
+    # Plain rows from a Core select; no ORM instances are built for a listing
+    names = WITHDRAWAL_FIELDS.names
+    statement = read_select(WITHDRAWAL_FIELDS, names).where(
+        Withdrawal.user_id == current_user_id,
+        Withdrawal.is_deleted == false()
+    )
 
     if status:
-        query = query.filter_by(status=status)
+        try:
+            statement = statement.where(Withdrawal.withdrawal_status == WithdrawalStatus(status))
+        except ValueError:
+            return jsonify({'message': f'Invalid status: {status}'}), 400
 
     # Order by newest first
-    query = query.order_by(Withdrawal.request_date.desc())
+    statement = statement.order_by(Withdrawal.created_at.desc(), Withdrawal.id.desc())
 
     # Paginate results
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    withdrawals = pagination.items
+    items, total, pages = read_offset_page(
+        statement, WITHDRAWAL_FIELDS.row_serializer(names), page=page, per_page=per_page
+    )
 
     return jsonify({
-        'items': [withdrawal.to_dict() for withdrawal in withdrawals],
-        'total': pagination.total,
-        'pages': pagination.pages,
+        'items': items,
+        'total': total,
+        'pages': pages,
         'page': page,
         'per_page': per_page
     }), 200
 
 @withdrawals_bp.route('/<int:withdrawal_id>', methods=['GET'])
 @jwt_required()
+@conditional_get
 def get_withdrawal(withdrawal_id):
     """
     Retrieve details of a specific withdrawal request.
@@ -194,16 +197,18 @@ def process_withdrawal(withdrawal_id):
     Returns:
         JSON response with updated withdrawal details or error message
     """
-    # In a real application, you would check if the current user has admin rights
     withdrawal = Withdrawal.query.get_or_404(withdrawal_id)
 
     data = request.get_json() or {}
-    processing_status = data.get('status')
+    try:
+        processing_status = WithdrawalStatus(data.get('status'))
+    except ValueError:
+        processing_status = None
 
     if processing_status not in [WithdrawalStatus.COMPLETED, WithdrawalStatus.REJECTED]:
         return jsonify({'message': 'Invalid processing status'}), 400
 
-    withdrawal.status = processing_status
+    withdrawal.withdrawal_status = processing_status
     withdrawal.processed_date = datetime.utcnow()
 
     if 'notes' in data:
@@ -215,6 +220,7 @@ def process_withdrawal(withdrawal_id):
         db.session.rollback()
         return jsonify({'message': 'Database error', 'error': str(e)}), 500
 
+    audit_admin_action(f"WITHDRAWAL_PROCESSED {withdrawal_id}: {processing_status.value}")
     return jsonify(withdrawal.to_dict()), 200
 
 def configure_withdrawal_routes(bp):
@@ -77,6 +77,70 @@ class Config:
     CACHE_REDIS_URL = REDIS_URL
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
 
+    # Admin statistics cache (fresh window, then served stale while refreshing)
+    STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', 60))
+    STATS_CACHE_STALE_TTL = int(os.getenv('STATS_CACHE_STALE_TTL', 300))
+
+    # Listing totals: exact, cached (per filter fingerprint) or estimated (planner)
+    PAGINATION_COUNT_STRATEGY = os.getenv('PAGINATION_COUNT_STRATEGY', 'cached')
+    PAGINATION_COUNT_TTL = int(os.getenv('PAGINATION_COUNT_TTL', 60))
+
+    # Admin lookup autocomplete: build at startup, rebuild after this many seconds
+    AUTOCOMPLETE_WARM = os.getenv('AUTOCOMPLETE_WARM', 'true').lower() == 'true'
+    AUTOCOMPLETE_MAX_AGE = int(os.getenv('AUTOCOMPLETE_MAX_AGE', 300))
+
+    # Fail requests that exceed their @query_budget instead of only logging them
+    QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'false').lower() == 'true'
+
+    # Lifetime of the per-user data versions behind conditional GET ETags
+    ETAG_VERSION_TTL = int(os.getenv('ETAG_VERSION_TTL', 3600))
+
+    # gzip/brotli response compression and the number of compressed bodies kept for reuse
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+    COMPRESSION_CACHE_SIZE = int(os.getenv('COMPRESSION_CACHE_SIZE', 256))
+
+    # JWT revocation tiers: in-process "not revoked" reuse, Redis mirror rebuild, pub/sub fan-out
+    REVOCATION_NEGATIVE_TTL = int(os.getenv('REVOCATION_NEGATIVE_TTL', 5))
+    REVOCATION_RESYNC_INTERVAL = int(os.getenv('REVOCATION_RESYNC_INTERVAL', 300))
+    REVOCATION_PUBSUB = os.getenv('REVOCATION_PUBSUB', 'true').lower() == 'true'
+
+    # Seconds an authenticated user's role/status snapshot is reused across requests
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', 30))
+
+    # Password hashing: method and cost for new hashes (older ones are upgraded on login) and the process pool
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Withdrawal OTPs: seconds a code stays valid and wrong guesses before it is discarded
+    OTP_TTL = int(os.getenv('OTP_TTL', 300))
+    OTP_MAX_ATTEMPTS = int(os.getenv('OTP_MAX_ATTEMPTS', 5))
+
+    # Retention purge: rows per delete transaction, pause between batches, audit log lifetime
+    RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', 1000))
+    RETENTION_BATCH_PAUSE = float(os.getenv('RETENTION_BATCH_PAUSE', 0.05))
+    ACTIVITY_LOG_RETENTION_DAYS = int(os.getenv('ACTIVITY_LOG_RETENTION_DAYS', 365))
+
+    # Idempotency-Key: how long responses are replayed, the in-flight claim, and how long duplicates wait
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 86400))
+    IDEMPOTENCY_LOCK_TTL = int(os.getenv('IDEMPOTENCY_LOCK_TTL', 30))
+    IDEMPOTENCY_WAIT_TIMEOUT = int(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', 10))
+
+    # Background jobs: queue backend ('redis' or 'memory'), `flask worker` pool size, in-process threads
+    JOBS_BACKEND = os.getenv('JOBS_BACKEND', 'redis')
+    JOBS_CONCURRENCY = int(os.getenv('JOBS_CONCURRENCY', 4))
+    JOBS_LOCAL_CONCURRENCY = int(os.getenv('JOBS_LOCAL_CONCURRENCY', 1))
+    JOBS_EAGER = os.getenv('JOBS_EAGER', 'false').lower() == 'true'
+
+    # Application number worker ID (0-1023): leased per process from Redis when unset, renewed
+    # within the lease TTL; a fixed ID is only for single-process deployments
+    APPLICATION_NUMBER_WORKER_ID = (int(os.environ['APPLICATION_NUMBER_WORKER_ID'])
+                                    if os.getenv('APPLICATION_NUMBER_WORKER_ID') else None)
+    APPLICATION_NUMBER_LEASE_TTL = int(os.getenv('APPLICATION_NUMBER_LEASE_TTL', 60))
+
     def __init__(self):
         """Initialize configuration with validation."""
         self.validate()
@@ -108,6 +172,15 @@ class TestingConfig(Config):
     WTF_CSRF_ENABLED = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=5)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(seconds=10)
+    AUTOCOMPLETE_WARM = False
+    QUERY_BUDGET_STRICT = True
+    REVOCATION_PUBSUB = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_HASH_WORKERS = 0
+    RETENTION_BATCH_PAUSE = 0
+    JOBS_BACKEND = 'memory'
+    JOBS_EAGER = True
+    APPLICATION_NUMBER_WORKER_ID = 0
 
 class ProductionConfig(Config):
     """Production configuration with enhanced security."""
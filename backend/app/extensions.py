@@ -51,16 +51,21 @@ def init_extensions(app):
             logger.warning("JWT payload missing 'sub' field.")
             return None
 
-        user = db.session.get(User, identity)
+        # Per-request memo and short-TTL cache instead of a query per request
+        from app.utils.identity import load_identity
+        user = load_identity(identity)
         if not user:
             logger.warning(f"User lookup failed for identity: {identity}")
         
         return user
 
+    # Revocation: in-process and Redis tiers in front of token_blocklist
+    from app.utils.revocation import init_revocation, is_token_revoked
+    init_revocation(app)
+
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        jti = jwt_payload["jti"]
-        return db.session.query(db.exists().where(TokenBlocklist.jti == jti)).scalar()
+        return is_token_revoked(jwt_payload)
 
     # Error handlers
     @jwt.expired_token_loader
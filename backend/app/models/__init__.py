@@ -2,8 +2,8 @@ from config import db
 
 from .user import User
 from .loan import Loan
-from .OTP import OTP
 from .token import TokenBlocklist
 from .activity_log import ActivityLog
 from .withdrawal import Withdrawal
 from .loanprogresssteps import LoanProgressSteps
+from .stats_daily import StatsDaily
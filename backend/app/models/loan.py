@@ -1,6 +1,8 @@
 from datetime import datetime
 from app.models import db
 from enum import Enum
+from app.utils.application_numbers import generate_application_number
+from app.utils.serializers import CompiledSerializer
 
 class LoanStatus(Enum):
     PENDING = 'pending'
@@ -27,11 +29,40 @@ class LoanStatus(Enum):
     ACCOUNT_FROZEN = 'account frozen'
     PAID = 'paid'
 
+# At most one pending application per user, enforced by the database
+PENDING_LOAN_INDEX = 'uq_loans_user_id_pending'
+
+# PostgreSQL's default name for the unique constraint on national_id
+NATIONAL_ID_CONSTRAINT = 'loans_national_id_key'
+
+# Keys of Loan.to_admin_dict, in output order
+ADMIN_FIELDS = (
+    ('id', 'application_id'), 'application_number', 'user_id', 'loan_amount', 'interest_rate',
+    'term_months', 'loan_status', 'purpose', 'application_date', 'approval_date', 'created_at'
+)
+
 class Loan(db.Model):
     __tablename__ = 'loans'
+    __table_args__ = (
+        # Substring and prefix search (see app.utils.search); pg_trgm is PostgreSQL-only
+        db.Index('ix_loans_application_number_trgm', 'application_number', postgresql_using='gin',
+                 postgresql_ops={'application_number': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_loans_application_number_prefix', 'application_number',
+                 postgresql_ops={'application_number': 'varchar_pattern_ops'}).ddl_if(dialect='postgresql'),
+        # Hot query shapes: pending-loan check, per-user listing, admin date ranges
+        db.Index('ix_loans_user_id_loan_status', 'user_id', 'loan_status'),
+        db.Index('ix_loans_user_id_created_at_live', 'user_id', 'created_at', 'application_id',
+                 postgresql_where=db.text('is_deleted = false'),
+                 sqlite_where=db.text('is_deleted = 0')),
+        db.Index('ix_loans_created_at', 'created_at'),
+        db.Index('ix_loans_approval_date', 'approval_date'),
+        db.Index(PENDING_LOAN_INDEX, 'user_id', unique=True,
+                 postgresql_where=db.text("loan_status = 'PENDING'"),
+                 sqlite_where=db.text("loan_status = 'PENDING'")),
+    )
     
     application_id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), index=True)
     application_number = db.Column(db.String(20), unique=True, nullable=False, index=True)
     
     national_id = db.Column(db.String(20), unique=True, nullable=False)
@@ -57,8 +88,34 @@ class Loan(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_deleted = db.Column(db.Boolean, default=False)
 
-@staticmethod
-def validate_loan_amount(amount):
+    # Compiled once per class (see app.utils.serializers)
+    to_dict = CompiledSerializer((
+        ('id', 'application_id'), 'user_id', 'application_id', 'application_number',
+        'national_id', 'address', 'loan_amount', 'interest_rate', 'term_months', 'loan_status',
+        'purpose', 'employment_status', 'employer', 'employment_duration', 'monthly_income',
+        'bank_name', 'account_name', 'account_number', 'application_date', 'approval_date',
+        'due_date', 'created_at', 'updated_at'
+    ))
+
+    _admin_dict = CompiledSerializer(ADMIN_FIELDS)
+    _admin_dict_with_borrower = CompiledSerializer(ADMIN_FIELDS, nested={'borrower': ('borrower', 'to_admin_dict')})
+
+    def to_admin_dict(self, include_borrower=False):
+        """
+        Serialize the loan for admin views.
+
+        The borrower summary reads the `borrower` relationship; callers
+        rendering many loans should eager-load it (see app.utils.loaders).
+        """
+        return self._admin_dict_with_borrower() if include_borrower else self._admin_dict()
+
+    @staticmethod
+    def generate_application_number():
+        """Unique, time-ordered application number; needs no database lookup."""
+        return generate_application_number()
+
+    @staticmethod
+    def validate_loan_amount(amount):
         """
         Validate that the loan amount is within allowed limits.
         Raises ValueError if the amount is invalid.
@@ -68,52 +125,5 @@ def validate_loan_amount(amount):
         if amount > 3000000.00:
             raise ValueError("Loan amount cannot exceed PHP 3,000,000.00")
 
-def to_dict(self):
-        """
-        Serialize the Loan object to a dictionary for JSON responses.
-        """
-        def get_enum_value(field):
-            return field.value if isinstance(field, Enum) else field
-
-        def format_datetime(field):
-            return field.isoformat() if isinstance(field, datetime) else None
-
-        def serialize_field(field):
-            if isinstance(field, Enum):
-                return get_enum_value(field)
-            if isinstance(field, datetime):
-                return format_datetime(field)
-            if isinstance(field, list):
-                return [serialize_field(item) for item in field]  # Handle lists
-            return field
-
-        return {
-            'id': getattr(self, 'id', None),
-            'user_id': getattr(self, 'user_id', None),
-            'application_id': getattr(self, 'application_id', None),
-            'application_number': getattr(self, 'application_number', None),
-            'name': getattr(self, 'name', None),
-            'national_id': getattr(self, 'national_id', None),
-            'address': getattr(self, 'address', None),
-            'loan_amount': getattr(self, 'loan_amount', 0.0),
-            'interest_rate': getattr(self, 'interest_rate', 4.0),
-            'term_months': getattr(self, 'termMonths', [6, 12, 24, 36, 48]),
-            'loan_status': serialize_field(self.loan_status),
-            'purpose': getattr(self, 'purpose', None),
-            'employment_status': getattr(self, 'employment_status', None),
-            'employer': getattr(self, 'employer', None),
-            'employment_duration': getattr(self, 'employment_duration', None),
-            'monthly_income': getattr(self, 'monthly_income', None),
-            'bank_name': getattr(self, 'bank_name', None),
-            'account_name': getattr(self, 'account_name', None),
-            'account_number': getattr(self, 'account_number', None),
-            'application_date': serialize_field(self.application_date),
-            'approval_date': serialize_field(self.approval_date),
-            'due_date': serialize_field(self.due_date),
-            'created_at': serialize_field(self.created_at),
-            'updated_at': serialize_field(self.updated_at),
-    }
-
-
-def __repr__(self):
-    return f'<Application Number {self.application_number} - User {self.user_id} - PHP {self.loan_amount}>'
+    def __repr__(self):
+        return f'<Application Number {self.application_number} - User {self.user_id} - PHP {self.loan_amount}>'
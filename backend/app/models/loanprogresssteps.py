@@ -2,6 +2,7 @@ from datetime import datetime
 from app.models import db
 from sqlalchemy import Enum
 from app.models.loan import LoanStatus
+from app.utils.serializers import CompiledSerializer
 
 class LoanProgressSteps(db.Model):
     __tablename__ = 'loanprogresssteps'
@@ -15,13 +16,6 @@ class LoanProgressSteps(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     completed_at = db.Column(db.DateTime, nullable=True)
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'application_id': self.application_id,
-            'loan_status': self.loan_status.value,  # ✅ Fixed property reference
-            'current_step': self.current_step,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None
-        }
\ No newline at end of file
+    to_dict = CompiledSerializer((
+        'id', 'application_id', 'loan_status', 'current_step', 'created_at', 'updated_at', 'completed_at'
+    ))
\ No newline at end of file
@@ -0,0 +1,30 @@
+from datetime import datetime
+from app.models import db
+
+
+class StatsDaily(db.Model):
+    """Per-day rollup of platform counters, maintained from model write hooks"""
+    __tablename__ = 'stats_daily'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'metric', 'dimension', name='uq_stats_daily_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    metric = db.Column(db.String(32), nullable=False)
+    dimension = db.Column(db.String(64), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    amount = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'metric': self.metric,
+            'dimension': self.dimension,
+            'count': self.count,
+            'amount': self.amount
+        }
+
+    def __repr__(self):
+        return f'<StatsDaily {self.day} {self.metric}:{self.dimension} = {self.count}>'
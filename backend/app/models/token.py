@@ -9,4 +9,6 @@ class TokenBlocklist(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(36), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Token expiry: bounds the Redis mirror's key TTLs and lets expired rows be purged
+    expires_at = db.Column(db.DateTime, index=True)
\ No newline at end of file
@@ -1,8 +1,9 @@
 from datetime import datetime
 from enum import Enum
 from ..extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
 import re
+from app.utils.passwords import hash_password, verify_password
+from app.utils.serializers import CompiledSerializer
 
 # Enum for user roles
 class Useroles(Enum):
@@ -16,8 +17,25 @@ class AccountStatus(Enum):
     BANNED = "banned"
     SUSPENDED = "suspended"
 
+def role_label(role):
+    """Lower-case role name, defaulting to 'user'"""
+    return role.name.lower() if role else 'user'
+
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Substring search (see app.utils.search); pg_trgm is PostgreSQL-only
+        db.Index('ix_users_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_users_email_trgm', 'email', postgresql_using='gin',
+                 postgresql_ops={'email': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_users_phone_number_trgm', 'phone_number', postgresql_using='gin',
+                 postgresql_ops={'phone_number': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_users_phone_number_prefix', 'phone_number',
+                 postgresql_ops={'phone_number': 'varchar_pattern_ops'}).ddl_if(dialect='postgresql'),
+        # Admin stats date windows and the default admin listing sort
+        db.Index('ix_users_created_at', 'created_at'),
+    )
     
     user_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), unique=True, index=True)
@@ -45,11 +63,11 @@ class User(db.Model):
     @staticmethod
     def generate_password_hash(password):
         """Static method for password hashing"""
-        return generate_password_hash(password)
+        return hash_password(password)
     
     def check_password(self, password):
         """Verify password against stored hash"""
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     @staticmethod
     def validate_phone(phone_number):
@@ -59,22 +77,22 @@ class User(db.Model):
             raise ValueError(f"Invalid phone number format: {phone_number}")
         return True
     
-    def to_dict(self):
-        """Serialize user object to dictionary"""
-        return {
-            'id': self.user_id,
-            'name': self.name,
-            'email': self.email,
-            'phone_number': self.phone_number,
-            'role': self.role_name(),
-            'account_status': self.account_status.value if self.account_status else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Serialize user object to dictionary (compiled, see app.utils.serializers)
+    to_dict = CompiledSerializer(
+        (('id', 'user_id'), 'name', 'email', 'phone_number', 'role', 'account_status',
+         'created_at', 'updated_at'),
+        formatters={'role': role_label}
+    )
+    
+    # Admin listings: column attributes only, no relationships
+    to_admin_dict = CompiledSerializer(
+        (('id', 'user_id'), 'name', 'email', 'phone_number', 'role', 'account_status', 'created_at'),
+        formatters={'role': role_label}
+    )
     
     def role_name(self):
         """Get string representation of role"""
-        return self.role.name.lower() if self.role else 'user'
+        return role_label(self.role)
     
     def is_admin(self):
         """Check if user has admin privileges"""
@@ -2,7 +2,8 @@ from datetime import datetime
 from app.models import db
 from enum import Enum
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, false
+from app.utils.serializers import CompiledSerializer
 
 
 class ValidationError(Exception):
@@ -30,18 +31,24 @@ class WithdrawalStatus(Enum):
 
 class WithdrawalQuery(db.Query):
     def not_deleted(self):
-        return self.filter(Withdrawal.is_deleted.is_(False))
+        # Compare against a literal so the partial `is_deleted = false` indexes match
+        return self.filter(Withdrawal.is_deleted == false())
 
 
 class Withdrawal(db.Model):
     __tablename__ = 'withdrawals'
     __table_args__ = (
         CheckConstraint('amount > 0', name='check_amount_positive'),
+        # Per-user listing over live rows and admin date ranges
+        db.Index('ix_withdrawals_user_id_created_at_live', 'user_id', 'created_at', 'id',
+                 postgresql_where=db.text('is_deleted = false'),
+                 sqlite_where=db.text('is_deleted = 0')),
+        db.Index('ix_withdrawals_created_at', 'created_at'),
     )
     query_class = WithdrawalQuery
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), index=True)
     application_id = db.Column(db.String(20), unique=True, nullable=False)
     application_number = db.Column(db.String(20), unique=True, nullable=False, index=True)
     amount = db.Column(db.Float, nullable=False)
@@ -68,21 +75,17 @@ class Withdrawal(db.Model):
         if self.amount <= 0:
             raise ValueError("Withdrawal amount must be greater than zero.")
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'application_id': self.application_id,
-            'application_number': self.application_number,
-            'amount': self.amount,
-            'otp': self.otp,
-            'withdrawal_status': self.withdrawal_status.value if isinstance(self.withdrawal_status, Enum) else self.withdrawal_status,
-            'transaction_id': self.transaction_id,
-            'processed_date': self.processed_date.isoformat() if self.processed_date else None,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    # The OTP is never serialized, not even back to its owner
+    to_dict = CompiledSerializer((
+        'id', 'user_id', 'application_id', 'application_number', 'amount',
+        'withdrawal_status', 'transaction_id', 'processed_date', 'notes', 'created_at', 'updated_at'
+    ))
+
+    # Admin views never expose the OTP
+    to_admin_dict = CompiledSerializer((
+        'id', 'user_id', 'application_number', 'amount', 'withdrawal_status',
+        'transaction_id', 'processed_date', 'created_at'
+    ))
 
     def __repr__(self):
         return f'<Withdrawal {self.id} - PHP {self.amount}>'
\ No newline at end of file
@@ -0,0 +1,304 @@
+"""
+Collision-free loan application numbers without a database round trip.
+
+Numbers are Snowflake-style 64-bit IDs: 41 bits of milliseconds since
+EPOCH_MS, a 10-bit worker ID and a 12-bit per-millisecond sequence. They are
+rendered as `LN` + 13 Crockford base32 characters + one Luhn mod 32 check
+character, 16 characters in all. They sort by creation time, and mistyped
+numbers can be rejected before any lookup.
+
+Uniqueness across processes comes from the worker ID. By default each
+process leases one the first time it generates a number: it takes the first
+free `application_number:worker:<id>` key with SET NX EX and a daemon thread
+renews it every third of APPLICATION_NUMBER_LEASE_TTL. A lease that could not
+be renewed for a whole TTL may have been taken over, so the next number
+leases a fresh ID. Without Redis no ID is guessed; generation fails with 503.
+
+APPLICATION_NUMBER_WORKER_ID pins the ID instead, for single-process
+deployments only: a process forked after configuration (a preloaded
+gunicorn worker) refuses to use it, and every process started with the same
+value would share it.
+
+Within a process a logical clock never moves backwards, so neither a burst
+beyond 4096 numbers per millisecond nor a wall-clock step back can repeat an
+ID.
+"""
+import atexit
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+
+import redis
+from werkzeug.exceptions import ServiceUnavailable
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'LN'
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+# 2024-01-01T00:00:00Z; 41 bits of milliseconds last until 2093
+EPOCH_MS = 1704067200000
+
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+ENCODED_LENGTH = 13
+
+WORKER_LEASE_KEY = 'application_number:worker:{}'
+
+_RENEW_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+
+
+def encode(value):
+    """Fixed-width Crockford base32 of a non-negative 64-bit integer."""
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def decode(text):
+    value = 0
+    for char in text:
+        value = value * 32 + _DECODE[char]
+    return value
+
+
+def check_character(text):
+    """Luhn mod 32 check character for base32 `text`."""
+    total = 0
+    for position, char in enumerate(reversed(text)):
+        digit = _DECODE[char]
+        if position % 2 == 0:
+            digit *= 2
+            digit = digit // 32 + digit % 32
+        total += digit
+    return ALPHABET[(32 - total % 32) % 32]
+
+
+def is_valid(number):
+    """True if `number` is well formed and its check character matches."""
+    if not isinstance(number, str) or len(number) != len(PREFIX) + ENCODED_LENGTH + 1:
+        return False
+    number = number.upper()
+    body, check = number[len(PREFIX):-1], number[-1]
+    if not number.startswith(PREFIX) or any(char not in _DECODE for char in body + check):
+        return False
+    return check_character(body) == check
+
+
+def parse(number):
+    """
+    Split a valid application number into its components.
+
+    Returns:
+        (created_at_ms, worker_id, sequence)
+    """
+    if not is_valid(number):
+        raise ValueError(f"Invalid application number: {number!r}")
+    value = decode(number.upper()[len(PREFIX):-1])
+    return (
+        (value >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS,
+        (value >> SEQUENCE_BITS) & MAX_WORKER_ID,
+        value & SEQUENCE_MASK
+    )
+
+
+class WorkerIdUnavailable(ServiceUnavailable):
+    description = 'Application numbers are temporarily unavailable. Please try again shortly.'
+
+
+class WorkerLease:
+    """
+    One process's claim on a worker ID, held as an expiring Redis key.
+
+    Args:
+        client: Redis client
+        ttl: Seconds the key lives without a renewal
+    """
+
+    def __init__(self, client, ttl):
+        self.client = client
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        self.pid = os.getpid()
+        self.worker_id = None
+        self._expires_at = 0.0
+        self._stopped = threading.Event()
+
+    @property
+    def valid(self):
+        """True while the key is known to be ours: renewed within the last TTL."""
+        return self.pid == os.getpid() and time.monotonic() < self._expires_at
+
+    def acquire(self):
+        """
+        Claim the first free worker ID, starting from a random one.
+
+        Raises:
+            WorkerIdUnavailable: If all MAX_WORKER_ID + 1 IDs are leased
+            redis.RedisError: If Redis fails
+        """
+        first = random.randrange(MAX_WORKER_ID + 1)
+        for offset in range(MAX_WORKER_ID + 1):
+            worker_id = (first + offset) & MAX_WORKER_ID
+            # Measured from before the SET, so the local view never outlives the key
+            expires_at = time.monotonic() + self.ttl
+            if self.client.set(WORKER_LEASE_KEY.format(worker_id), self.owner, nx=True, ex=self.ttl):
+                self.worker_id, self._expires_at = worker_id, expires_at
+                threading.Thread(target=self._heartbeat, name='application-number-lease', daemon=True).start()
+                return self
+        raise WorkerIdUnavailable('All application number worker IDs are leased')
+
+    def renew(self):
+        """Extend the key if we still own it. Returns False once it was lost."""
+        expires_at = time.monotonic() + self.ttl
+        key = WORKER_LEASE_KEY.format(self.worker_id)
+        if self.client.eval(_RENEW_LEASE_SCRIPT, 1, key, self.owner, int(self.ttl * 1000)):
+            self._expires_at = expires_at
+            return True
+        self._expires_at = 0.0
+        return False
+
+    def _heartbeat(self):
+        while not self._stopped.wait(self.ttl / 3):
+            try:
+                if not self.renew():
+                    logger.error("Lease on application number worker ID %d was lost", self.worker_id)
+                    return
+            except redis.RedisError as e:
+                logger.warning("Could not renew application number worker ID %d: %s", self.worker_id, str(e))
+
+    def release(self):
+        """Stop renewing and free the ID; a no-op in forked children."""
+        self._stopped.set()
+        self._expires_at = 0.0
+        if self.worker_id is None or self.pid != os.getpid():
+            return
+        try:
+            self.client.eval(_RELEASE_LEASE_SCRIPT, 1, WORKER_LEASE_KEY.format(self.worker_id), self.owner)
+        except redis.RedisError as e:
+            logger.warning("Could not release application number worker ID %d: %s", self.worker_id, str(e))
+
+
+def _lease_worker_id(ttl):
+    """
+    A new WorkerLease from the shared Redis.
+
+    Raises:
+        WorkerIdUnavailable: If Redis is unavailable or every ID is leased
+    """
+    from app.utils.cache import get_redis, mark_redis_down
+    client = get_redis()
+    if client is None:
+        raise WorkerIdUnavailable('No APPLICATION_NUMBER_WORKER_ID and Redis is unavailable')
+    try:
+        lease = WorkerLease(client, ttl).acquire()
+    except redis.RedisError as e:
+        mark_redis_down(e)
+        raise WorkerIdUnavailable('No APPLICATION_NUMBER_WORKER_ID and Redis is unavailable') from e
+    atexit.register(lease.release)
+    logger.info("Leased application number worker ID %d", lease.worker_id)
+    return lease
+
+
+class ApplicationNumberGenerator:
+    """
+    Thread-safe generator of time-ordered application numbers.
+
+    Args:
+        worker_id: 0..1023, unique among live processes; leased lazily when None
+        clock: Callable returning the current time in milliseconds
+        lease_ttl: Seconds a leased worker ID lives without a renewal
+    """
+
+    def __init__(self, worker_id=None, clock=None, lease_ttl=60):
+        self.clock = clock or (lambda: time.time_ns() // 1_000_000)
+        self.lease_ttl = lease_ttl
+        self._configured_worker_id = None
+        self._configured_pid = None
+        self._lease = None
+        self._lease_lock = threading.Lock()
+        self._last = 0
+        self._lock = threading.Lock()
+        if worker_id is not None:
+            self.configure({'APPLICATION_NUMBER_WORKER_ID': worker_id})
+
+    def configure(self, config):
+        worker_id = config.get('APPLICATION_NUMBER_WORKER_ID')
+        if worker_id is not None and not 0 <= int(worker_id) <= MAX_WORKER_ID:
+            raise ValueError(f"APPLICATION_NUMBER_WORKER_ID must be between 0 and {MAX_WORKER_ID}")
+        self._configured_worker_id = None if worker_id is None else int(worker_id)
+        self._configured_pid = os.getpid()
+        self.lease_ttl = config.get('APPLICATION_NUMBER_LEASE_TTL', self.lease_ttl)
+
+    @property
+    def worker_id(self):
+        """
+        This process's worker ID.
+
+        Raises:
+            RuntimeError: If a configured ID is used in a forked child
+            WorkerIdUnavailable: If no ID can be leased
+        """
+        if self._configured_worker_id is not None:
+            if self._configured_pid != os.getpid():
+                raise RuntimeError(
+                    f"APPLICATION_NUMBER_WORKER_ID was configured in process {self._configured_pid} and "
+                    f"would be shared by forked process {os.getpid()}; leave it unset to lease an ID per process"
+                )
+            return self._configured_worker_id
+
+        lease = self._lease
+        if lease is None or not lease.valid:
+            with self._lease_lock:
+                lease = self._lease
+                if lease is None or not lease.valid:
+                    if lease is not None:
+                        lease.release()
+                    self._lease = lease = _lease_worker_id(self.lease_ttl)
+        return lease.worker_id
+
+    def next_id(self):
+        """The next 64-bit ID; strictly increasing within this process."""
+        worker_id = self.worker_id
+        with self._lock:
+            # Logical clock: (milliseconds << SEQUENCE_BITS) + sequence, never repeated
+            ticks = max((self.clock() - EPOCH_MS) << SEQUENCE_BITS, self._last + 1)
+            self._last = ticks
+        millis, sequence = ticks >> SEQUENCE_BITS, ticks & SEQUENCE_MASK
+        return (millis << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS) | sequence
+
+    def generate(self):
+        body = encode(self.next_id())
+        return f"{PREFIX}{body}{check_character(body)}"
+
+
+application_numbers = ApplicationNumberGenerator()
+
+
+def generate_application_number():
+    return application_numbers.generate()
+
+
+def init_application_numbers(app):
+    application_numbers.configure(app.config)
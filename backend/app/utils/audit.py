@@ -0,0 +1,40 @@
+"""
+Audit trail writes, run as background jobs after the request commits.
+"""
+import logging
+
+from flask_jwt_extended import get_jwt_identity
+
+from app.extensions import db
+from app.models.activity_log import ActivityLog
+from app.utils.jobs import job
+
+logger = logging.getLogger(__name__)
+
+MAX_ACTION_LENGTH = 500
+
+
+@job(retries=5)
+def record_activity(admin_id, action):
+    """Append one `activity_logs` row for an action taken by `admin_id`."""
+    db.session.add(ActivityLog(admin_id=admin_id, action=action[:MAX_ACTION_LENGTH]))
+    db.session.commit()
+
+
+def audit_admin_action(action):
+    """
+    Queue an audit row for the admin authenticated on the current request.
+
+    The JWT identity is checked here, so a job that could never succeed is
+    not queued (and retried) at all.
+
+    Returns:
+        The job ID, or None if the identity is not a user ID
+    """
+    identity = get_jwt_identity()
+    try:
+        admin_id = int(identity)
+    except (TypeError, ValueError):
+        logger.error("Not auditing %r: JWT identity %r is not a user ID", action, identity)
+        return None
+    return record_activity.delay(admin_id, action)
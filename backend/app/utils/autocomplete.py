@@ -0,0 +1,316 @@
+"""
+In-process prefix index behind the admin lookup box.
+
+Each worker keeps customer names, phone numbers and application numbers in
+a sorted token array and answers prefix queries with `bisect`, so typing in
+the lookup box never reaches the database. The index is built once (at
+startup, or on a background thread after the first lookup finds it cold),
+patched from User/Loan mapper events after each commit, and rebuilt
+periodically on a background thread to pick up writes made by other
+workers. Local writes that arrive during a rebuild are applied to the old
+index and replayed onto the new one before the swap.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from flask import current_app
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models.user import User
+from app.models.loan import Loan
+from app.utils.db_events import run_after_commit_for
+from app.utils.search import is_phone_term, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+USER = 'user'
+LOAN = 'loan'
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Seconds a caller should wait before asking again while the index is cold
+WARMING_RETRY_AFTER = 1
+
+
+def user_tokens(name, phone_number):
+    """Lookup tokens for a customer: the full name, each later word and the phone."""
+    tokens = set()
+    if name:
+        lowered = name.lower()
+        words = lowered.split()
+        tokens.add(lowered)
+        tokens.update(' '.join(words[i:]) for i in range(1, len(words)))
+    if phone_number:
+        phone = normalize_phone(phone_number)
+        tokens.add(phone)
+        tokens.add(phone.lstrip('+'))
+    return tokens
+
+
+def query_token(prefix):
+    """The typed prefix in token form; phone-shaped input is normalized like `user_tokens`."""
+    if is_phone_term(prefix):
+        return normalize_phone(prefix).lstrip('+')
+    return prefix.lower()
+
+
+def loan_tokens(application_number):
+    return {application_number.lower()} if application_number else set()
+
+
+def user_document(user_id, name, phone_number):
+    return {'type': USER, 'id': user_id, 'label': name, 'phone_number': phone_number}
+
+
+def loan_document(application_id, application_number, user_id):
+    return {'type': LOAN, 'id': application_id, 'label': application_number, 'user_id': user_id}
+
+
+class PrefixIndex:
+    """Sorted (token, kind, id) array with per-document token bookkeeping."""
+
+    def __init__(self, entries=None):
+        self._lock = threading.RLock()
+        self._tokens = []
+        self._documents = {}
+        if entries:
+            for kind, doc_id, tokens, document in entries:
+                self._documents[(kind, doc_id)] = (tokens, document)
+                self._tokens.extend((token, kind, doc_id) for token in tokens)
+            self._tokens.sort()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def upsert(self, kind, doc_id, tokens, document):
+        with self._lock:
+            self._remove(kind, doc_id)
+            self._documents[(kind, doc_id)] = (tokens, document)
+            for token in tokens:
+                insort(self._tokens, (token, kind, doc_id))
+
+    def remove(self, kind, doc_id):
+        with self._lock:
+            self._remove(kind, doc_id)
+
+    def _remove(self, kind, doc_id):
+        tokens, _ = self._documents.pop((kind, doc_id), ((), None))
+        for token in tokens:
+            entry = (token, kind, doc_id)
+            position = bisect_left(self._tokens, entry)
+            if position < len(self._tokens) and self._tokens[position] == entry:
+                del self._tokens[position]
+
+    def search(self, prefix, limit=DEFAULT_LIMIT):
+        """Documents with a token starting with `prefix`, in token order."""
+        prefix = query_token(prefix)
+        results = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._tokens, (prefix,))
+            while position < len(self._tokens) and len(results) < limit:
+                token, kind, doc_id = self._tokens[position]
+                if not token.startswith(prefix):
+                    break
+                if (kind, doc_id) not in seen:
+                    seen.add((kind, doc_id))
+                    results.append(self._documents[(kind, doc_id)][1])
+                position += 1
+        return results
+
+
+def load_entries():
+    """Read every indexable customer and loan as plain column tuples."""
+    entries = []
+    for user_id, name, phone_number in db.session.query(User.user_id, User.name, User.phone_number):
+        entries.append((USER, user_id, user_tokens(name, phone_number),
+                        user_document(user_id, name, phone_number)))
+    for application_id, application_number, user_id in db.session.query(
+        Loan.application_id, Loan.application_number, Loan.user_id
+    ):
+        entries.append((LOAN, application_id, loan_tokens(application_number),
+                        loan_document(application_id, application_number, user_id)))
+    return entries
+
+
+class AutocompleteIndex:
+    """Process-wide index, rebuilt on a background thread when stale."""
+
+    def __init__(self):
+        self._index = None
+        self._built_at = 0.0
+        self._build_lock = threading.Lock()
+        # Guards the swap and `_pending`, the writes seen while a build runs
+        self._lock = threading.Lock()
+        self._pending = None
+        self._rebuild_thread = None
+
+    @property
+    def built(self):
+        return self._index is not None
+
+    def build(self):
+        """Build a new index from the database and swap it in."""
+        with self._lock:
+            self._pending = []
+        try:
+            index = PrefixIndex(load_entries())
+            with self._lock:
+                for operation, args in self._pending:
+                    getattr(index, operation)(*args)
+                self._index, self._built_at = index, time.monotonic()
+        finally:
+            with self._lock:
+                self._pending = None
+        logger.info("Autocomplete index built with %d documents", len(index))
+        return index
+
+    def ensure_built(self, max_age=None):
+        """
+        Return the current index, building it if missing or older than `max_age`.
+
+        Only a missing index is built in the calling thread. A stale one is
+        rebuilt on a background thread while lookups keep answering from it.
+        """
+        index = self._index
+        if index is None:
+            with self._build_lock:
+                return self._index if self._index is not None else self.build()
+        self._refresh_if_stale(max_age)
+        return index
+
+    def _refresh_if_stale(self, max_age):
+        if max_age is not None and time.monotonic() - self._built_at > max_age:
+            self.build_in_background()
+
+    def build_in_background(self):
+        """Start a build on a background thread unless one is already running."""
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            self._rebuild_thread = threading.Thread(
+                target=self._rebuild, args=(current_app._get_current_object(),),
+                name='autocomplete-rebuild', daemon=True
+            )
+            self._rebuild_thread.start()
+        except Exception:
+            self._build_lock.release()
+            raise
+
+    def _rebuild(self, app):
+        try:
+            with app.app_context():
+                try:
+                    self.build()
+                except Exception as e:
+                    logger.warning("Autocomplete rebuild failed: %s", str(e))
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+        finally:
+            self._build_lock.release()
+
+    def wait_for_rebuild(self, timeout=None):
+        """Block until a background rebuild in progress has finished."""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT, max_age=None):
+        """
+        Suggestions for `prefix`, or None while the index is still cold.
+
+        Never reads the database: a missing index is built on a background
+        thread and the caller should ask again after WARMING_RETRY_AFTER.
+        """
+        index = self._index
+        if index is None:
+            self.build_in_background()
+            return None
+        self._refresh_if_stale(max_age)
+        return index.search(prefix, max(1, min(limit, MAX_LIMIT)))
+
+    def upsert(self, kind, doc_id, tokens, document):
+        self._apply('upsert', (kind, doc_id, tokens, document))
+
+    def remove(self, kind, doc_id):
+        self._apply('remove', (kind, doc_id))
+
+    def _apply(self, operation, args):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((operation, args))
+            if self._index is not None:
+                getattr(self._index, operation)(*args)
+
+    def reset(self):
+        self.wait_for_rebuild()
+        self._index, self._built_at = None, 0.0
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def _queue(target, key, callback):
+    # Values are captured at flush time; the instance is expired after commit
+    run_after_commit_for(target, f"autocomplete:{key}", callback)
+
+
+def on_user_write(mapper, connection, target):
+    user_id, name, phone_number = target.user_id, target.name, target.phone_number
+    _queue(target, f"{USER}:{user_id}", lambda: autocomplete_index.upsert(
+        USER, user_id, user_tokens(name, phone_number), user_document(user_id, name, phone_number)
+    ))
+
+
+def on_user_delete(mapper, connection, target):
+    user_id = target.user_id
+    _queue(target, f"{USER}:{user_id}", lambda: autocomplete_index.remove(USER, user_id))
+
+
+def on_loan_write(mapper, connection, target):
+    application_id, application_number, user_id = target.application_id, target.application_number, target.user_id
+    _queue(target, f"{LOAN}:{application_id}", lambda: autocomplete_index.upsert(
+        LOAN, application_id, loan_tokens(application_number),
+        loan_document(application_id, application_number, user_id)
+    ))
+
+
+def on_loan_delete(mapper, connection, target):
+    application_id = target.application_id
+    _queue(target, f"{LOAN}:{application_id}", lambda: autocomplete_index.remove(LOAN, application_id))
+
+
+LISTENERS = [
+    (User, 'after_insert', on_user_write),
+    (User, 'after_update', on_user_write),
+    (User, 'after_delete', on_user_delete),
+    (Loan, 'after_insert', on_loan_write),
+    (Loan, 'after_update', on_loan_write),
+    (Loan, 'after_delete', on_loan_delete),
+]
+
+
+def register_autocomplete_listeners():
+    """Attach the incremental update hooks (idempotent)."""
+    for model, name, listener in LISTENERS:
+        if not event.contains(model, name, listener):
+            event.listen(model, name, listener)
+
+
+def init_autocomplete(app):
+    """Register update hooks and, when AUTOCOMPLETE_WARM is set, build the index now."""
+    register_autocomplete_listeners()
+    if not app.config.get('AUTOCOMPLETE_WARM'):
+        return
+    with app.app_context():
+        try:
+            autocomplete_index.build()
+        except Exception as e:
+            # Tables may not exist yet (fresh deploy); the first lookup starts a build
+            logger.warning("Autocomplete warm-up skipped: %s", str(e))
+            db.session.rollback()
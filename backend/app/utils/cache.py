@@ -0,0 +1,242 @@
+"""
+Single-flight, stale-while-revalidate cache for expensive computations.
+
+Values live in Redis as a JSON envelope carrying a freshness deadline.
+Concurrent misses are collapsed into one recompute through a Redis lock,
+callers that find a stale value are served it while the lock holder
+refreshes, and the same semantics are provided in-process when Redis is
+unreachable.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+
+import redis
+from sqlalchemy import event
+
+from app.utils.db_events import run_after_commit_for
+
+logger = logging.getLogger(__name__)
+
+# How long to stop talking to Redis after a connection failure
+REDIS_RETRY_INTERVAL = 30
+WAIT_POLL_INTERVAL = 0.05
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_redis_down_until = 0.0
+_invalidation_hooks = set()
+
+
+def get_redis():
+    """Return the shared Redis client, or None while it is marked unavailable."""
+    if time.monotonic() < _redis_down_until:
+        return None
+    from app import redis_client
+    return redis_client
+
+
+def mark_redis_down(error):
+    """Skip Redis for REDIS_RETRY_INTERVAL seconds after a connection error."""
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY_INTERVAL
+    logger.warning("Redis unavailable, using in-process cache: %s", str(error))
+
+
+def _envelope(value, ttl):
+    # No `default=`: a value that would not round-trip (Decimal, datetime) must fail here
+    return json.dumps({'value': value, 'fresh_until': time.time() + ttl})
+
+
+class LocalCache:
+    """In-process fallback with the same single-flight and stale semantics."""
+
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[2] < time.time():
+            self._entries.pop(key, None)
+            return None
+        return entry
+
+    def get_or_compute(self, key, compute, ttl, stale_ttl):
+        entry = self._get(key)
+        if entry and entry[1] > time.time():
+            return entry[0]
+
+        lock = self._lock_for(key)
+        if entry and not lock.acquire(blocking=False):
+            # Someone is already refreshing; serve the stale value meanwhile
+            return entry[0]
+        if not entry:
+            lock.acquire()
+
+        try:
+            entry = self._get(key)
+            if entry and entry[1] > time.time():
+                return entry[0]
+            value = compute()
+            self.set(key, value, ttl, stale_ttl)
+            return value
+        finally:
+            lock.release()
+
+    def get(self, key):
+        entry = self._get(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, ttl, stale_ttl=0):
+        now = time.time()
+        expires_at = now + ttl + stale_ttl if ttl else float('inf')
+        self._entries[key] = (value, now + ttl if ttl else float('inf'), expires_at)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+local_cache = LocalCache()
+
+
+def _redis_get_or_compute(client, key, compute, ttl, stale_ttl, lock_timeout, wait_timeout):
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait_timeout
+
+    while True:
+        raw = client.get(key)
+        envelope = json.loads(raw) if raw else None
+        if envelope and envelope['fresh_until'] > time.time():
+            return envelope['value']
+
+        if client.set(lock_key, token, nx=True, px=int(lock_timeout * 1000)):
+            try:
+                value = compute()
+                envelope = _envelope(value, ttl)
+            except Exception:
+                client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                raise
+            try:
+                client.set(key, envelope, ex=int(ttl + stale_ttl))
+                client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except redis.RedisError as e:
+                # Only caching the value failed; never compute it twice. The lock expires on its own.
+                mark_redis_down(e)
+            return value
+
+        if envelope:
+            # Stale but present: another worker is refreshing it
+            return envelope['value']
+
+        if time.monotonic() >= deadline:
+            logger.warning("Timed out waiting for %s to be computed, computing locally", key)
+            return compute()
+        time.sleep(WAIT_POLL_INTERVAL)
+
+
+def get_or_compute(key, compute, ttl=60, stale_ttl=300, lock_timeout=30, wait_timeout=10):
+    """
+    Return the cached value for `key`, computing it at most once concurrently.
+
+    Args:
+        key: Cache key
+        compute: Zero-argument callable producing a plain JSON value (convert
+            Decimals and datetimes itself, so hits and misses look the same)
+        ttl: Seconds a value is considered fresh
+        stale_ttl: Extra seconds a stale value may be served during a refresh
+        lock_timeout: Upper bound on how long a recompute may hold the lock
+        wait_timeout: How long a caller waits for another worker's recompute
+
+    Returns:
+        The cached or freshly computed value
+    """
+    client = get_redis()
+    if client is not None:
+        try:
+            return _redis_get_or_compute(client, key, compute, ttl, stale_ttl, lock_timeout, wait_timeout)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+    return local_cache.get_or_compute(key, compute, ttl, stale_ttl)
+
+
+def get_many(namespace, fields):
+    """
+    Fetch permanently cached values stored under a Redis hash.
+
+    Returns:
+        Dictionary of field to decoded value for the fields that were found
+    """
+    client = get_redis()
+    if client is not None:
+        try:
+            raw = client.hmget(namespace, fields) if fields else []
+            return {field: json.loads(value) for field, value in zip(fields, raw) if value is not None}
+        except redis.RedisError as e:
+            mark_redis_down(e)
+    found = {}
+    for field in fields:
+        value = local_cache.get(f"{namespace}:{field}")
+        if value is not None:
+            found[field] = value
+    return found
+
+
+def set_many(namespace, mapping):
+    """Store `mapping` under a Redis hash without expiry."""
+    if not mapping:
+        return
+    for field, value in mapping.items():
+        local_cache.set(f"{namespace}:{field}", value, ttl=0)
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.hset(namespace, mapping={field: json.dumps(value) for field, value in mapping.items()})
+    except redis.RedisError as e:
+        mark_redis_down(e)
+
+
+def invalidate(*keys):
+    """Drop `keys` from Redis and from the in-process cache."""
+    local_cache.delete(*keys)
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.delete(*keys)
+    except redis.RedisError as e:
+        mark_redis_down(e)
+
+
+def invalidate_on_write(models, *keys):
+    """
+    Invalidate `keys` after any transaction that inserts, updates or deletes
+    an instance of one of `models` commits.
+    """
+    def queue_invalidation(mapper, connection, target):
+        run_after_commit_for(target, ('invalidate',) + keys, lambda: invalidate(*keys))
+
+    for model in models:
+        if (model, keys) in _invalidation_hooks:
+            continue
+        _invalidation_hooks.add((model, keys))
+        for identifier in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(model, identifier, queue_invalidation)
@@ -0,0 +1,176 @@
+"""
+WSGI response compression.
+
+Negotiates `br` (when the optional `brotli` package is installed) or `gzip`
+from `Accept-Encoding` and compresses buffered responses whose content type
+is textual and whose body reaches a size threshold.
+
+Most large bodies this app sends are repeats: cached stats, `@cache.cached`
+views and unchanged listings re-polled by dashboards. Compressed bodies are
+therefore kept in an in-process LRU keyed by the encoding and a digest of the
+uncompressed bytes; hashing is an order of magnitude cheaper than deflating,
+so a repeated payload is served precompressed.
+
+The middleware is installed beneath Socket.IO (see `create_app`), which
+handles its own transport compression.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from itertools import chain
+
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+from werkzeug.wsgi import ClosingIterator
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+GZIP = 'gzip'
+BROTLI = 'br'
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'image/svg+xml',
+    'text/css',
+    'text/csv',
+    'text/html',
+    'text/plain',
+)
+
+
+class CompressedCache:
+    """Thread-safe LRU of compressed bodies keyed by (encoding, body digest)."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(encoding, data):
+        return encoding, hashlib.blake2b(data, digest_size=16).digest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """
+    Compress eligible responses of the wrapped WSGI application.
+
+    Args:
+        app: WSGI application to wrap
+        min_size: Bodies smaller than this many bytes are sent as-is
+        level: gzip compression level
+        brotli_quality: brotli quality, when brotli is installed
+        mimetypes: Content types eligible for compression
+        cache_size: Number of compressed bodies kept for reuse
+    """
+
+    def __init__(self, app, min_size=1024, level=6, brotli_quality=5,
+                 mimetypes=COMPRESSIBLE_MIMETYPES, cache_size=256):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = frozenset(mimetypes)
+        self.cache = CompressedCache(cache_size)
+
+    def negotiate(self, environ):
+        """Preferred supported encoding for the request, or None."""
+        accept = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        candidates = [(accept.quality(BROTLI), 1, BROTLI)] if brotli is not None else []
+        candidates.append((accept.quality(GZIP), 0, GZIP))
+        quality, _, encoding = max(candidates)
+        return encoding if quality > 0 else None
+
+    def compress(self, data, encoding):
+        key = self.cache.key(encoding, data)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            if encoding == BROTLI:
+                compressed = brotli.compress(data, quality=self.brotli_quality)
+            else:
+                # Fixed mtime keeps the output byte-identical for identical input
+                compressed = gzip.compress(data, compresslevel=self.level, mtime=0)
+            self.cache.set(key, compressed)
+        return compressed
+
+    def eligible(self, status, headers):
+        """Whether a response with `status` and `headers` may be compressed."""
+        code = int(status.split(' ', 1)[0])
+        if code < 200 or code >= 300 or code in (204, 206):
+            return False
+        if 'Content-Encoding' in headers or 'no-transform' in headers.get('Cache-Control', ''):
+            return False
+        mimetype = headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if mimetype not in self.mimetypes:
+            return False
+        length = headers.get('Content-Length')
+        return length is None or int(length) >= self.min_size
+
+    def __call__(self, environ, start_response):
+        encoding = self.negotiate(environ)
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+
+        captured = []
+        body = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, Headers(headers), exc_info]
+            return body.append
+
+        app_iter = self.app(environ, capture)
+        chunks = iter(app_iter)
+        if not captured:
+            # start_response may be deferred until the first chunk is produced
+            body.append(next(chunks, b''))
+        status, headers, exc_info = captured
+        close = getattr(app_iter, 'close', None)
+
+        if not self.eligible(status, headers):
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return ClosingIterator(chain(body, chunks), close)
+
+        try:
+            data = b''.join(chain(body, chunks))
+        finally:
+            if close is not None:
+                close()
+
+        if 'Vary' in headers:
+            headers['Vary'] = f"{headers['Vary']}, Accept-Encoding"
+        else:
+            headers['Vary'] = 'Accept-Encoding'
+        if len(data) >= self.min_size:
+            data = self.compress(data, encoding)
+            headers['Content-Encoding'] = encoding
+            etag = headers.get('ETag')
+            if etag and not etag.startswith('W/'):
+                # The bytes differ from the identity representation
+                headers['ETag'] = f'W/{etag}'
+        headers['Content-Length'] = str(len(data))
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return [data]
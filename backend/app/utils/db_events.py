@@ -0,0 +1,49 @@
+"""
+Helpers for running side effects only once a transaction has committed.
+
+Mapper hooks fire during flush, before the transaction is known to
+succeed. Cache invalidation and similar side effects are queued on the
+session instead and executed after COMMIT, or dropped on ROLLBACK.
+"""
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = 'after_commit_callbacks'
+
+
+def run_after_commit(session, key, callback):
+    """
+    Queue `callback` to run after `session` commits.
+
+    Callbacks are de-duplicated by `key`, so a flush touching a hundred rows
+    still invalidates a cache entry once.
+    """
+    session.info.setdefault(_PENDING_KEY, {})[key] = callback
+
+
+def run_after_commit_for(target, key, callback):
+    """Queue `callback` on the session owning the mapped instance `target`."""
+    session = object_session(target)
+    if session is not None:
+        run_after_commit(session, key, callback)
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for key, callback in pending.items():
+        try:
+            callback()
+        except Exception as e:
+            logger.error("After-commit callback %s failed: %s", key, str(e))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,145 @@
+"""
+Weak ETags and conditional GET for a customer's own loans and withdrawals.
+
+Every customer has a version counter in Redis that is bumped after any
+transaction writing one of their loans or withdrawals commits. A response's
+ETag combines that version with the user and the requested URL, so a
+polling client that sends `If-None-Match` with an unchanged version gets a
+304 after a single Redis GET, without querying the database or serializing
+anything.
+
+Missing counters are seeded from the clock rather than zero, so a counter
+lost to eviction or expiry never hands out an ETag that was already issued
+for older data. While Redis is unavailable no ETags are issued at all: a
+process-local counter would not see other workers' writes.
+
+Writes that bypass the ORM unit of work (bulk UPDATE/DELETE statements)
+do not fire mapper events and must call `bump_version` themselves.
+"""
+import hashlib
+import time
+from functools import wraps
+
+import redis
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import NEVER_SET, NO_VALUE
+
+from app.models.loan import Loan
+from app.models.withdrawal import Withdrawal
+from app.utils.cache import get_redis, mark_redis_down
+from app.utils.db_events import run_after_commit_for
+
+VERSION_KEY = "etag:version:{user_id}"
+
+
+def _version_key(user_id):
+    return VERSION_KEY.format(user_id=user_id)
+
+
+def current_version(user_id):
+    """
+    Return the user's data version, seeding it when missing.
+
+    Returns:
+        Version string, or None while Redis is unavailable
+    """
+    client = get_redis()
+    if client is None:
+        return None
+    key = _version_key(user_id)
+    try:
+        version = client.get(key)
+        if version is None:
+            client.set(key, time.time_ns(), nx=True, ex=current_app.config.get('ETAG_VERSION_TTL', 3600))
+            version = client.get(key)
+    except redis.RedisError as e:
+        mark_redis_down(e)
+        return None
+    return version.decode() if isinstance(version, bytes) else str(version)
+
+
+def bump_version(user_id, ttl=3600):
+    """Invalidate every ETag issued for `user_id`'s data."""
+    client = get_redis()
+    if client is None:
+        return
+    key = _version_key(user_id)
+    try:
+        with client.pipeline() as pipe:
+            # Seed from the clock if the counter expired, then advance it
+            pipe.set(key, time.time_ns(), nx=True)
+            pipe.incr(key)
+            pipe.expire(key, ttl)
+            pipe.execute()
+    except redis.RedisError as e:
+        mark_redis_down(e)
+
+
+def resource_etag(user_id, version):
+    """Opaque tag for the current request URL as seen by `user_id` at `version`."""
+    digest = hashlib.sha1(f"{user_id}|{version}|{request.full_path}".encode('utf-8')).hexdigest()
+    return digest[:32]
+
+
+def conditional_get(view):
+    """
+    Answer `If-None-Match` from the user's version counter.
+
+    Place below `@jwt_required()`. Successful responses get a weak ETag and
+    `Cache-Control: private, no-cache`, so clients revalidate on every poll.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = get_jwt_identity()
+        version = current_version(user_id) if user_id is not None else None
+        if version is None:
+            return view(*args, **kwargs)
+
+        etag = resource_etag(user_id, version)
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
+
+
+def _bump_after_commit(target, user_id, ttl):
+    run_after_commit_for(target, f"etag:{user_id}", lambda: bump_version(user_id, ttl))
+
+
+def on_owned_write(mapper, connection, target):
+    if target.user_id is not None:
+        _bump_after_commit(target, target.user_id, current_app.config.get('ETAG_VERSION_TTL', 3600))
+
+
+def on_owner_change(target, value, oldvalue, initiator):
+    # A reassigned row changes what its previous owner sees as well
+    if oldvalue not in (None, NO_VALUE, NEVER_SET) and oldvalue != value:
+        _bump_after_commit(target, oldvalue, current_app.config.get('ETAG_VERSION_TTL', 3600))
+
+
+MAPPER_LISTENERS = [
+    (model, identifier, on_owned_write)
+    for model in (Loan, Withdrawal)
+    for identifier in ('after_insert', 'after_update', 'after_delete')
+]
+
+OWNER_ATTRIBUTES = (Loan.user_id, Withdrawal.user_id)
+
+
+def init_etags():
+    """Attach the version bump hooks (idempotent)."""
+    for model, identifier, listener in MAPPER_LISTENERS:
+        if not event.contains(model, identifier, listener):
+            event.listen(model, identifier, listener)
+    for attribute in OWNER_ATTRIBUTES:
+        if not event.contains(attribute, 'set', on_owner_change):
+            # active_history loads the previous owner even when it was expired
+            event.listen(attribute, 'set', on_owner_change, active_history=True)
@@ -0,0 +1,228 @@
+"""
+Sparse fieldsets for list endpoints.
+
+A `?fields=a,b,c` argument selects which attributes a listing returns. The
+same field names drive the SQL projection (`load_only` plus an optional
+joined relationship) and the serializer, so rows are only hydrated with the
+columns the client asked for. The Core read path (app.utils.read_models)
+selects the same columns and serializes rows with `row_serializer`.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only
+
+from app.models.user import User, role_label
+from app.models.loan import Loan
+from app.models.withdrawal import Withdrawal
+from app.utils.pagination import primary_key_attribute
+from app.utils.serializers import compile_serializer
+
+
+class FieldSet:
+    """
+    Named, selectable fields of one model.
+
+    Args:
+        model: Mapped class the fields belong to
+        fields: Mapping of public field name to mapped column attribute
+        formatters: Optional per-field overrides of the type-based conversion
+        relations: Mapping of field name to (relationship name, FieldSet, field names)
+            for nested objects loaded with a join
+    """
+
+    def __init__(self, model, fields, formatters=None, relations=None):
+        self.model = model
+        self.fields = fields
+        self.formatters = formatters or {}
+        self.relations = relations or {}
+        self.primary_key = primary_key_attribute(model)
+        self._compiled = {}
+
+    @property
+    def names(self):
+        return tuple(self.fields) + tuple(self.relations)
+
+    def parse(self, raw, default=None):
+        """
+        Resolve a comma-separated `fields` argument.
+
+        Returns:
+            Tuple of field names, `default` (or every field) when `raw` is empty
+
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        if not raw:
+            return tuple(default or self.names)
+        names = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields and name not in self.relations]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return names
+
+    def columns(self, names, *extra):
+        """Column attributes needed to serialize `names`, plus the key and `extra`."""
+        columns = {self.primary_key.key: self.primary_key}
+        for name in names:
+            if name in self.fields:
+                columns.setdefault(self.fields[name].key, self.fields[name])
+            elif name in self.relations:
+                relationship = getattr(self.model, self.relations[name][0])
+                for local in relationship.property.local_columns:
+                    attribute = getattr(self.model, inspect(self.model).get_property_by_column(local).key)
+                    columns.setdefault(attribute.key, attribute)
+        for column in extra:
+            if column is not None:
+                columns.setdefault(column.key, column)
+        return list(columns.values())
+
+    def load_options(self, names, *extra):
+        """`load_only` for the selected columns and joins for selected relations."""
+        options = [load_only(*self.columns(names, *extra))]
+        for name in names:
+            if name in self.relations:
+                key, nested, nested_names = self.relations[name]
+                options.append(joinedload(getattr(self.model, key)).load_only(*nested.columns(nested_names)))
+        return options
+
+    def serializer(self, names):
+        """
+        Compiled single-argument serializer for `names`, cached per field list.
+
+        Also suitable for `paginate`; see app.utils.serializers.
+        """
+        names = tuple(names)
+        function = self._compiled.get(names)
+        if function is None:
+            function = compile_serializer(
+                self.model,
+                [(name, self.fields[name].key) for name in names if name in self.fields],
+                formatters={name: self.formatters[name] for name in names if name in self.formatters},
+                nested={
+                    name: (self.relations[name][0], self.relations[name][1].serializer(self.relations[name][2]))
+                    for name in names if name in self.relations
+                },
+                name=f"serialize_{self.model.__tablename__}"
+            )
+            self._compiled[names] = function
+        return function
+
+    def serialize(self, instance, names):
+        return self.serializer(names)(instance)
+
+    def row_serializer(self, names, prefix=''):
+        """
+        Compiled serializer for Core rows selected by `read_models.read_select`.
+
+        Columns are read as row attributes named after the mapped attribute,
+        with a `<relation>__` prefix for the joined side of a relation; a
+        relation is None when its primary key column is.
+        """
+        names = tuple(names)
+        key = ('rows', prefix, names)
+        function = self._compiled.get(key)
+        if function is None:
+            function = compile_serializer(
+                self.model,
+                [(name, self.fields[name].key) for name in names if name in self.fields],
+                formatters={name: self.formatters[name] for name in names if name in self.formatters},
+                name=f"serialize_{self.model.__tablename__}_row",
+                instances=False,
+                prefix=prefix
+            )
+            relations = []
+            for name in names:
+                if name in self.relations:
+                    _, nested, nested_names = self.relations[name]
+                    relations.append((
+                        name, f"{name}__{nested.primary_key.key}",
+                        nested.row_serializer(nested_names, f"{name}__")
+                    ))
+            if relations:
+                function = _with_relations(function, relations)
+            self._compiled[key] = function
+        return function
+
+
+def _with_relations(serialize, relations):
+    # Outer-joined relations arrive flattened into the same row
+    def serialize_row(row):
+        data = serialize(row)
+        for name, key, nested in relations:
+            data[name] = None if getattr(row, key) is None else nested(row)
+        return data
+    return serialize_row
+
+
+USER_FIELDS = FieldSet(User, {
+    'id': User.user_id,
+    'name': User.name,
+    'email': User.email,
+    'phone_number': User.phone_number,
+    'role': User.role,
+    'account_status': User.account_status,
+    'created_at': User.created_at,
+    'updated_at': User.updated_at
+}, formatters={
+    'role': role_label
+})
+
+# Matches User.to_admin_dict
+ADMIN_USER_FIELDS = ('id', 'name', 'email', 'phone_number', 'role', 'account_status', 'created_at')
+
+LOAN_FIELDS = FieldSet(Loan, {
+    'id': Loan.application_id,
+    'application_id': Loan.application_id,
+    'application_number': Loan.application_number,
+    'user_id': Loan.user_id,
+    'national_id': Loan.national_id,
+    'address': Loan.address,
+    'loan_amount': Loan.loan_amount,
+    'interest_rate': Loan.interest_rate,
+    'term_months': Loan.term_months,
+    'loan_status': Loan.loan_status,
+    'purpose': Loan.purpose,
+    'employment_status': Loan.employment_status,
+    'employer': Loan.employer,
+    'employment_duration': Loan.employment_duration,
+    'monthly_income': Loan.monthly_income,
+    'bank_name': Loan.bank_name,
+    'account_name': Loan.account_name,
+    'account_number': Loan.account_number,
+    'application_date': Loan.application_date,
+    'approval_date': Loan.approval_date,
+    'due_date': Loan.due_date,
+    'created_at': Loan.created_at,
+    'updated_at': Loan.updated_at
+}, relations={
+    # Backref attributes only exist once mappers are configured, so refer by name
+    'borrower': ('borrower', USER_FIELDS, ADMIN_USER_FIELDS)
+})
+
+# Matches Loan.to_dict
+LOAN_DETAIL_FIELDS = (
+    'id', 'user_id', 'application_id', 'application_number', 'national_id', 'address',
+    'loan_amount', 'interest_rate', 'term_months', 'loan_status', 'purpose', 'employment_status',
+    'employer', 'employment_duration', 'monthly_income', 'bank_name', 'account_name',
+    'account_number', 'application_date', 'approval_date', 'due_date', 'created_at', 'updated_at'
+)
+
+# Matches Loan.to_admin_dict(include_borrower=True)
+ADMIN_LOAN_FIELDS = (
+    'id', 'application_number', 'user_id', 'loan_amount', 'interest_rate', 'term_months',
+    'loan_status', 'purpose', 'application_date', 'approval_date', 'created_at', 'borrower'
+)
+
+# The OTP is deliberately not selectable
+WITHDRAWAL_FIELDS = FieldSet(Withdrawal, {
+    'id': Withdrawal.id,
+    'user_id': Withdrawal.user_id,
+    'application_id': Withdrawal.application_id,
+    'application_number': Withdrawal.application_number,
+    'amount': Withdrawal.amount,
+    'withdrawal_status': Withdrawal.withdrawal_status,
+    'transaction_id': Withdrawal.transaction_id,
+    'processed_date': Withdrawal.processed_date,
+    'notes': Withdrawal.notes,
+    'created_at': Withdrawal.created_at,
+    'updated_at': Withdrawal.updated_at
+})
@@ -0,0 +1,236 @@
+"""
+`Idempotency-Key` handling for create endpoints that clients retry.
+
+The first request carrying a given key claims it (Redis `SET NX`, or an
+in-process store while Redis is unavailable), runs the view and stores the
+response for IDEMPOTENCY_TTL seconds. Retries with the same key get that
+response replayed with `Idempotent-Replayed: true` and never reach the view.
+A duplicate arriving while the first request is still running waits for
+its result, for at most IDEMPOTENCY_WAIT_TIMEOUT seconds, and then gets a
+409. The first request's claim lives IDEMPOTENCY_LOCK_TTL seconds and is
+extended every third of that while the view runs, so a slow view is never
+run twice; the TTL only bounds how long a crashed worker blocks the key.
+
+Keys are scoped to the authenticated user, method and path. Reusing a key
+with a different request body is rejected with 422. Responses with a 5xx
+status are not stored, so the client can retry them.
+"""
+import base64
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import redis
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+from app.utils.cache import get_redis, mark_redis_down
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+WAIT_POLL_INTERVAL = 0.05
+
+PENDING = 'pending'
+DONE = 'done'
+
+
+class RedisIdempotencyStore:
+    def __init__(self, client):
+        self.client = client
+
+    def claim(self, key, record, ttl):
+        return bool(self.client.set(key, json.dumps(record), nx=True, ex=ttl))
+
+    def get(self, key):
+        value = self.client.get(key)
+        return json.loads(value) if value else None
+
+    def complete(self, key, record, ttl):
+        self.client.set(key, json.dumps(record), ex=ttl)
+
+    def extend(self, key, ttl):
+        self.client.expire(key, ttl)
+
+    def release(self, key):
+        self.client.delete(key)
+
+
+class LocalIdempotencyStore:
+    """In-process stand-in used while Redis is unavailable."""
+
+    def __init__(self):
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._records.get(key)
+        if entry and entry[1] < time.monotonic():
+            del self._records[key]
+            return None
+        return entry
+
+    def claim(self, key, record, ttl):
+        with self._lock:
+            if self._live(key):
+                return False
+            self._records[key] = (record, time.monotonic() + ttl)
+            return True
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def complete(self, key, record, ttl):
+        with self._lock:
+            self._records[key] = (record, time.monotonic() + ttl)
+
+    def extend(self, key, ttl):
+        with self._lock:
+            entry = self._live(key)
+            if entry:
+                self._records[key] = (entry[0], time.monotonic() + ttl)
+
+    def release(self, key):
+        with self._lock:
+            self._records.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+local_idempotency_store = LocalIdempotencyStore()
+
+
+def _store():
+    client = get_redis()
+    return RedisIdempotencyStore(client) if client is not None else local_idempotency_store
+
+
+def _record_key(user_id, idempotency_key):
+    digest = hashlib.sha256(idempotency_key.encode()).hexdigest()
+    return f"idempotency:{user_id}:{request.method}:{request.path}:{digest}"
+
+
+def _to_record(response, fingerprint):
+    return {
+        'state': DONE,
+        'fingerprint': fingerprint,
+        'status': response.status_code,
+        'content_type': response.content_type,
+        'body': base64.b64encode(response.get_data()).decode()
+    }
+
+
+def _replay(record):
+    response = current_app.response_class(
+        base64.b64decode(record['body']), status=record['status'], content_type=record['content_type']
+    )
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _error(message, status):
+    return make_response(jsonify({'message': message}), status)
+
+
+def _await_result(store, key, fingerprint, record):
+    """Replay, reject or wait for `record`, the existing entry under `key`."""
+    deadline = time.monotonic() + current_app.config.get('IDEMPOTENCY_WAIT_TIMEOUT', 10)
+    while record is not None:
+        if record['fingerprint'] != fingerprint:
+            return _error('Idempotency-Key was already used with a different request', 422)
+        if record['state'] == DONE:
+            return _replay(record)
+        if time.monotonic() >= deadline:
+            response = _error('A request with this Idempotency-Key is still in progress', 409)
+            response.headers['Retry-After'] = '1'
+            return response
+        time.sleep(WAIT_POLL_INTERVAL)
+        record = store.get(key)
+    # The first request failed and released the key; let the caller claim it
+    return None
+
+
+def _claim(store, key, fingerprint, lock_ttl):
+    """Claim `key`, or return the response owed to a duplicate request."""
+    while not store.claim(key, {'state': PENDING, 'fingerprint': fingerprint}, lock_ttl):
+        response = _await_result(store, key, fingerprint, store.get(key))
+        if response is not None:
+            return response
+    return None
+
+
+@contextmanager
+def _keep_claimed(store, key, ttl):
+    # Extend the PENDING claim until the view returns
+    stopped = threading.Event()
+
+    def heartbeat():
+        while not stopped.wait(ttl / 3):
+            try:
+                store.extend(key, ttl)
+            except redis.RedisError as e:
+                logger.warning("Could not extend idempotency claim: %s", str(e))
+
+    thread = threading.Thread(target=heartbeat, name='idempotency-claim', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+
+
+def idempotent(view):
+    """
+    Run `view` at most once per `Idempotency-Key` and replay its response.
+
+    Place below `@jwt_required()`. Requests without the header are passed
+    through unchanged.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        idempotency_key = request.headers.get(HEADER)
+        if idempotency_key is None:
+            return view(*args, **kwargs)
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            return _error(f'{HEADER} must be 1 to {MAX_KEY_LENGTH} characters', 400)
+
+        key = _record_key(get_jwt_identity(), idempotency_key)
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        lock_ttl = current_app.config.get('IDEMPOTENCY_LOCK_TTL', 30)
+
+        store = _store()
+        try:
+            response = _claim(store, key, fingerprint, lock_ttl)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+            store = local_idempotency_store
+            response = _claim(store, key, fingerprint, lock_ttl)
+        if response is not None:
+            return response
+
+        try:
+            with _keep_claimed(store, key, lock_ttl):
+                response = make_response(view(*args, **kwargs))
+        except Exception:
+            store.release(key)
+            raise
+
+        try:
+            if response.status_code >= 500:
+                store.release(key)
+            else:
+                store.complete(key, _to_record(response, fingerprint), current_app.config.get('IDEMPOTENCY_TTL', 86400))
+        except redis.RedisError as e:
+            mark_redis_down(e)
+        return response
+    return wrapper
@@ -0,0 +1,124 @@
+"""
+Cached identity of the authenticated user.
+
+JWT-protected views need the caller's role and account status, not a full
+`User` row. `load_identity` memoizes the identity on `flask.g` for the
+request and caches it across requests (Redis, or in-process without it) for
+IDENTITY_CACHE_TTL seconds. The cache entry is dropped after any commit that
+changes the user's role, account status, password hash, name or email, or
+deletes the user, so access changes apply on the next request.
+"""
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, inspect
+
+from app.extensions import db
+from app.models.user import AccountStatus, User, Useroles
+from app.utils.cache import get_or_compute, invalidate
+from app.utils.db_events import run_after_commit_for
+
+# Changes to these columns invalidate the cached identity
+IDENTITY_COLUMNS = ('role', 'account_status', 'password_hash', 'name', 'email')
+
+
+def _key(user_id):
+    return f"identity:{user_id}"
+
+
+class UserIdentity:
+    """Read-only snapshot of the columns authorization decisions use."""
+
+    __slots__ = ('user_id', 'name', 'email', 'role', 'account_status')
+
+    def __init__(self, user_id, name, email, role, account_status):
+        self.user_id = user_id
+        self.name = name
+        self.email = email
+        self.role = role
+        self.account_status = account_status
+
+    @property
+    def id(self):
+        return self.user_id
+
+    @property
+    def is_active(self):
+        return self.account_status in (None, AccountStatus.ACTIVE)
+
+    def to_cache(self):
+        return {
+            'user_id': self.user_id,
+            'name': self.name,
+            'email': self.email,
+            'role': self.role.name if self.role else None,
+            'account_status': self.account_status.value if self.account_status else None
+        }
+
+    @classmethod
+    def from_cache(cls, data):
+        return cls(
+            data['user_id'],
+            data['name'],
+            data['email'],
+            Useroles[data['role']] if data['role'] else None,
+            AccountStatus(data['account_status']) if data['account_status'] else None
+        )
+
+
+def _fetch(user_id):
+    row = db.session.query(
+        User.user_id, User.name, User.email, User.role, User.account_status
+    ).filter(User.user_id == user_id).first()
+    return UserIdentity(*row).to_cache() if row else None
+
+
+def load_identity(user_id):
+    """
+    Identity of `user_id`, or None if no such user exists.
+
+    Repeated calls within a request return the same object without any I/O.
+    """
+    if user_id is None:
+        return None
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    memo = g.setdefault('_identities', {})
+    if user_id not in memo:
+        ttl = current_app.config.get('IDENTITY_CACHE_TTL', 30)
+        data = get_or_compute(_key(user_id), lambda: _fetch(user_id), ttl=ttl, stale_ttl=0)
+        memo[user_id] = UserIdentity.from_cache(data) if data else None
+    return memo[user_id]
+
+
+def invalidate_identity(user_id):
+    """Drop the cached identity of `user_id` everywhere, including this request's memo."""
+    invalidate(_key(user_id))
+    if has_app_context():
+        g.get('_identities', {}).pop(user_id, None)
+
+
+def on_user_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[column].history.has_changes() for column in IDENTITY_COLUMNS):
+        user_id = target.user_id
+        run_after_commit_for(target, _key(user_id), lambda: invalidate_identity(user_id))
+
+
+def on_user_delete(mapper, connection, target):
+    user_id = target.user_id
+    run_after_commit_for(target, _key(user_id), lambda: invalidate_identity(user_id))
+
+
+LISTENERS = [
+    (User, 'after_update', on_user_update),
+    (User, 'after_delete', on_user_delete),
+]
+
+
+def init_identity_cache():
+    """Attach the invalidation hooks (idempotent)."""
+    for model, identifier, listener in LISTENERS:
+        if not event.contains(model, identifier, listener):
+            event.listen(model, identifier, listener)
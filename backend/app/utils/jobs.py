@@ -0,0 +1,342 @@
+"""
+Background jobs for side effects that do not belong in the request.
+
+A function decorated with `@job` gains `.delay(*args, **kwargs)`, which
+queues a JSON payload naming the function by import path. `flask worker`
+runs queued jobs in a pool of threads or forked processes. A job that raises
+is retried up to `retries` times, after `backoff`, `2 * backoff`,
+`4 * backoff`... seconds, and then moved to a dead-letter list.
+
+Backends (JOBS_BACKEND):
+
+- `redis`: a list for ready jobs, a sorted set of retries by due time and a
+  dead-letter list, shared by every web and worker process. While Redis is
+  unreachable, jobs fall back to the in-process queue below instead of
+  being dropped.
+- `memory`: an in-process queue served by JOBS_LOCAL_CONCURRENCY daemon
+  threads of the enqueuing process.
+
+With JOBS_EAGER set (the test configuration), `.delay` runs the job at once
+in the calling thread.
+
+Delivery is at most once per attempt: a job taken by a worker that is then
+killed is not redelivered.
+"""
+import heapq
+import importlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from functools import wraps
+
+import click
+import redis
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.extensions import db
+from app.utils.cache import get_redis, mark_redis_down
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'jobs:queue'
+DELAYED_KEY = 'jobs:delayed'
+DEAD_KEY = 'jobs:dead'
+
+# Move retries that are due from the sorted set onto the ready list
+_PROMOTE_SCRIPT = """
+local due = redis.call('zrangebyscore', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, payload in ipairs(due) do
+    redis.call('zrem', KEYS[1], payload)
+    redis.call('lpush', KEYS[2], payload)
+end
+return #due
+"""
+
+
+class RedisBackend:
+    def __init__(self, client):
+        self.client = client
+
+    def push(self, payload):
+        self.client.lpush(QUEUE_KEY, json.dumps(payload))
+
+    def schedule(self, payload, run_at):
+        self.client.zadd(DELAYED_KEY, {json.dumps(payload): run_at})
+
+    def dead(self, payload):
+        self.client.lpush(DEAD_KEY, json.dumps(payload))
+
+    def pop(self, timeout):
+        self.client.eval(_PROMOTE_SCRIPT, 2, DELAYED_KEY, QUEUE_KEY, time.time())
+        item = self.client.brpop(QUEUE_KEY, timeout=max(int(timeout), 1))
+        return json.loads(item[1]) if item else None
+
+
+class MemoryBackend:
+    """In-process queue with the same interface as RedisBackend."""
+
+    def __init__(self):
+        self._ready = []
+        self._delayed = []
+        self._dead = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+
+    def push(self, payload):
+        with self._condition:
+            self._ready.append(payload)
+            self._condition.notify()
+
+    def schedule(self, payload, run_at):
+        with self._condition:
+            heapq.heappush(self._delayed, (run_at, next(self._order), payload))
+            self._condition.notify()
+
+    def dead(self, payload):
+        with self._condition:
+            self._dead.append(payload)
+
+    def pop(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                while self._delayed and self._delayed[0][0] <= time.time():
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+                if self._ready:
+                    return self._ready.pop(0)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if self._delayed:
+                    remaining = min(remaining, max(self._delayed[0][0] - time.time(), 0.01))
+                self._condition.wait(remaining)
+
+    @property
+    def dead_jobs(self):
+        with self._condition:
+            return list(self._dead)
+
+    def clear(self):
+        with self._condition:
+            self._ready.clear()
+            self._delayed.clear()
+            self._dead.clear()
+
+
+memory_backend = MemoryBackend()
+
+
+def _resolve(name):
+    module, _, attribute = name.partition(':')
+    return getattr(importlib.import_module(module), attribute)
+
+
+def execute(payload):
+    """Run the function a payload names, in the current app context."""
+    return _resolve(payload['name'])(*payload['args'], **payload['kwargs'])
+
+
+class Worker:
+    """
+    Takes jobs from `backend` and runs them inside `app`'s context.
+
+    Args:
+        app: Flask application the jobs run in
+        backend: RedisBackend or MemoryBackend
+        concurrency: Number of threads started by `start`
+        poll_timeout: Seconds each `pop` blocks waiting for work
+    """
+
+    def __init__(self, app, backend, concurrency=1, poll_timeout=1):
+        self.app = app
+        self.backend = backend
+        self.concurrency = concurrency
+        self.poll_timeout = poll_timeout
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def run_once(self, timeout=0):
+        """Run at most one job. Returns True if a job was taken."""
+        payload = self.backend.pop(timeout)
+        if payload is None:
+            return False
+        with self.app.app_context():
+            try:
+                execute(payload)
+            except Exception as e:
+                db.session.rollback()
+                self._retry_or_bury(payload, e)
+            finally:
+                db.session.remove()
+        return True
+
+    def _retry_or_bury(self, payload, error):
+        payload['attempts'] += 1
+        if payload['attempts'] <= payload['retries']:
+            delay = payload['backoff'] * 2 ** (payload['attempts'] - 1)
+            logger.warning("Job %s (%s) failed, retry %d in %.1fs: %s",
+                           payload['name'], payload['id'], payload['attempts'], delay, str(error))
+            self.backend.schedule(payload, time.time() + delay)
+        else:
+            logger.error("Job %s (%s) failed after %d attempts: %s",
+                         payload['name'], payload['id'], payload['attempts'], str(error))
+            payload['error'] = str(error)
+            self.backend.dead(payload)
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self.run_once(self.poll_timeout)
+            except redis.RedisError as e:
+                logger.warning("Job queue unavailable: %s", str(e))
+                self._stopped.wait(5)
+
+    def start(self):
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self.run, name=f'job-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+
+_local_worker = None
+_local_worker_pid = None
+_local_worker_lock = threading.Lock()
+
+
+def _ensure_local_worker():
+    # Serves the memory backend in this process; restarted after a fork
+    global _local_worker, _local_worker_pid
+    if _local_worker_pid == os.getpid():
+        return
+    with _local_worker_lock:
+        if _local_worker_pid != os.getpid():
+            concurrency = current_app.config.get('JOBS_LOCAL_CONCURRENCY', 1)
+            _local_worker = Worker(current_app._get_current_object(), memory_backend, concurrency).start()
+            _local_worker_pid = os.getpid()
+
+
+def enqueue(name, args=(), kwargs=None, retries=3, backoff=2.0):
+    """
+    Queue the job `name` ("module:function").
+
+    Returns:
+        The job ID
+    """
+    payload = {
+        'id': uuid.uuid4().hex,
+        'name': name,
+        'args': list(args),
+        'kwargs': kwargs or {},
+        'attempts': 0,
+        'retries': retries,
+        'backoff': backoff,
+        'enqueued_at': time.time()
+    }
+    if current_app.config.get('JOBS_BACKEND', 'redis') == 'redis':
+        client = get_redis()
+        if client is not None:
+            try:
+                RedisBackend(client).push(payload)
+                return payload['id']
+            except redis.RedisError as e:
+                mark_redis_down(e)
+    _ensure_local_worker()
+    memory_backend.push(payload)
+    return payload['id']
+
+
+def job(func=None, *, retries=3, backoff=2.0):
+    """
+    Make `func` runnable in the background through `func.delay(...)`.
+
+    Arguments must be JSON-serializable. Calling `func` directly still runs
+    it synchronously.
+
+    Args:
+        retries: Attempts after the first before the job is dead-lettered
+        backoff: Seconds before the first retry; doubled for each later one
+    """
+    def decorate(func):
+        name = f"{func.__module__}:{func.__name__}"
+
+        @wraps(func)
+        def delay(*args, **kwargs):
+            if current_app.config.get('JOBS_EAGER', False):
+                func(*args, **kwargs)
+                return None
+            return enqueue(name, args, kwargs, retries=retries, backoff=backoff)
+
+        func.delay = delay
+        func.job_name = name
+        return func
+
+    return decorate(func) if func is not None else decorate
+
+
+def _redis_backend():
+    client = get_redis()
+    if client is None:
+        raise click.ClickException('Redis is unavailable')
+    return RedisBackend(client)
+
+
+def _serve(worker):
+    worker.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop(timeout=5)
+
+
+def _run_forked_worker(app):
+    with app.app_context():
+        backend = _redis_backend()
+    _serve(Worker(app, backend))
+
+
+@click.command('worker')
+@click.option('--concurrency', type=int, default=None, help='Threads, or processes with --pool process.')
+@click.option('--pool', type=click.Choice(['thread', 'process']), default='thread', help='Worker pool type.')
+@with_appcontext
+def worker_command(concurrency, pool):
+    """Run queued background jobs until interrupted."""
+    app = current_app._get_current_object()
+    if app.config.get('JOBS_BACKEND', 'redis') != 'redis':
+        raise click.UsageError('flask worker needs JOBS_BACKEND=redis')
+    concurrency = concurrency or app.config.get('JOBS_CONCURRENCY', 4)
+    click.echo(f"Starting {concurrency} job worker {pool}(s)")
+
+    if pool == 'thread':
+        _serve(Worker(app, _redis_backend(), concurrency))
+        return
+
+    # Children must not share the parent's database connections
+    db.engine.dispose()
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_run_forked_worker, args=(app,), daemon=True) for _ in range(concurrency)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+def init_jobs(app):
+    """Register the `flask worker` command."""
+    app.cli.add_command(worker_command)
@@ -0,0 +1,91 @@
+"""
+orjson-backed JSON provider for the Flask app.
+
+Every `jsonify` call and every Socket.IO packet (`create_app` hands `app.json`
+to `socketio.init_app`) goes through `app.json`. orjson serializes dicts,
+lists, datetimes, dates, enums, UUIDs and dataclasses natively in C, so only
+the few types it does not know fall back to Python (`_default`).
+
+Differences from Flask's default provider:
+    - datetime/date values are emitted as ISO 8601 instead of HTTP dates,
+      matching the `.isoformat()` strings the models already return
+    - Enum members are emitted as their value
+
+Decimals still become strings and objects with `__html__` are still rendered
+through it, as before.
+"""
+import json
+from decimal import Decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+# orjson's only output format; other separators need the standard library
+_COMPACT_SEPARATORS = (',', ':')
+
+
+def _default(obj):
+    """Serialize the types orjson does not handle natively."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Drop-in replacement for `DefaultJSONProvider` built on orjson.
+
+    `sort_keys`, `compact` and `mimetype` behave like the default provider's
+    attributes. `dumps` and `loads` accept the keyword arguments callers pass
+    to the standard library; those orjson cannot express are served by `json`.
+    """
+
+    sort_keys = True
+    compact = None
+    mimetype = 'application/json'
+
+    def _options(self, indent=False, sort_keys=None):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize `obj` to a JSON string.
+
+        Socket.IO calls this with `separators=(',', ':')`, which is orjson's
+        only output format anyway.
+        """
+        sort_keys = kwargs.pop('sort_keys', None)
+        if kwargs.get('separators') == _COMPACT_SEPARATORS:
+            kwargs.pop('separators')
+        if kwargs:
+            kwargs.setdefault('default', _default)
+            kwargs.setdefault('sort_keys', self.sort_keys if sort_keys is None else sort_keys)
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options(sort_keys=sort_keys)).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize JSON text or UTF-8 bytes."""
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the arguments as JSON and return a response.
+
+        Same contract as `DefaultJSONProvider.response`; the body is written
+        as bytes without an intermediate string.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=_default, option=self._options(indent=indent))
+        if indent:
+            body += b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
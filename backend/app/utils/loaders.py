@@ -0,0 +1,56 @@
+"""
+Loader options for admin read paths.
+
+Each admin listing declares exactly which columns it reads and eager-loads
+the relationships its serializer touches, so a page costs a fixed number of
+queries. Any other relationship access raises instead of lazy-loading one
+row at a time.
+"""
+from sqlalchemy.orm import joinedload, load_only, raiseload
+
+from app.models.user import User
+from app.models.loan import Loan
+from app.models.withdrawal import Withdrawal
+
+# Columns read by User.to_admin_dict
+ADMIN_USER_COLUMNS = (
+    User.user_id, User.name, User.email, User.phone_number,
+    User.role, User.account_status, User.created_at
+)
+
+# Columns read by Loan.to_admin_dict (a superset of LOAN_SORT_FIELDS)
+ADMIN_LOAN_COLUMNS = (
+    Loan.application_id, Loan.application_number, Loan.user_id, Loan.loan_amount,
+    Loan.interest_rate, Loan.term_months, Loan.loan_status, Loan.purpose,
+    Loan.application_date, Loan.approval_date, Loan.created_at
+)
+
+# Columns read by Withdrawal.to_admin_dict; the OTP is never loaded
+ADMIN_WITHDRAWAL_COLUMNS = (
+    Withdrawal.id, Withdrawal.user_id, Withdrawal.application_number, Withdrawal.amount,
+    Withdrawal.withdrawal_status, Withdrawal.transaction_id, Withdrawal.processed_date,
+    Withdrawal.created_at
+)
+
+
+def sparse_options(fieldset, names, *extra_columns):
+    """Options loading only the `names` of `fieldset` (see app.utils.fieldsets)."""
+    return [*fieldset.load_options(names, *extra_columns), raiseload('*')]
+
+
+def admin_user_options():
+    return [load_only(*ADMIN_USER_COLUMNS), raiseload('*')]
+
+
+def admin_loan_options(include_borrower=True):
+    """Options for loans rendered with `to_admin_dict(include_borrower=...)`."""
+    options = [load_only(*ADMIN_LOAN_COLUMNS)]
+    if include_borrower:
+        # Many-to-one: a LEFT OUTER JOIN keeps the page to a single query
+        options.append(joinedload(Loan.borrower).load_only(*ADMIN_USER_COLUMNS))
+    options.append(raiseload('*'))
+    return options
+
+
+def admin_withdrawal_options():
+    return [load_only(*ADMIN_WITHDRAWAL_COLUMNS), raiseload('*')]
@@ -0,0 +1,134 @@
+"""
+One-time passwords kept in Redis instead of an ever-growing table.
+
+Each customer has at most one live code, stored as an HMAC digest (never the
+code itself) under `otp:<customer_id>` with a native TTL of OTP_TTL seconds.
+Verification compares, consumes and counts failed attempts in a single Lua
+script, so a code cannot be used twice and is discarded after
+OTP_MAX_ATTEMPTS wrong guesses. While Redis is unreachable, an in-process
+store with the same semantics is used.
+"""
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+
+import redis
+from flask import current_app
+
+from app.utils.cache import get_redis, mark_redis_down
+
+ALLOWED_LENGTHS = (6, 8, 10)
+
+# Verify-and-consume: 1 = match (code deleted), 0 = wrong code, -1 = no live code
+_VERIFY_SCRIPT = """
+local digest = redis.call('hget', KEYS[1], 'digest')
+if not digest then
+    return -1
+end
+if digest == ARGV[1] then
+    redis.call('del', KEYS[1])
+    return 1
+end
+if redis.call('hincrby', KEYS[1], 'attempts', 1) >= tonumber(ARGV[2]) then
+    redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _key(customer_id):
+    return f"otp:{int(customer_id)}"
+
+
+def _digest(customer_id, code):
+    secret = current_app.config['SECRET_KEY'].encode()
+    return hmac.new(secret, f"{int(customer_id)}:{code}".encode(), hashlib.sha256).hexdigest()
+
+
+class LocalOTPStore:
+    """In-process store with the Redis script's semantics."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def save(self, key, digest, ttl):
+        with self._lock:
+            self._entries[key] = [digest, 0, time.monotonic() + ttl]
+
+    def verify(self, key, digest, max_attempts):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                self._entries.pop(key, None)
+                return -1
+            if hmac.compare_digest(entry[0], digest):
+                del self._entries[key]
+                return 1
+            entry[1] += 1
+            if entry[1] >= max_attempts:
+                del self._entries[key]
+            return 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_otp_store = LocalOTPStore()
+
+
+def issue_otp(customer_id, length=6):
+    """
+    Create a new code for `customer_id`, replacing any live one.
+
+    Args:
+        customer_id: User the code is issued to
+        length: Number of digits, one of ALLOWED_LENGTHS
+
+    Returns:
+        The plain code, to be delivered to the customer
+    """
+    if length not in ALLOWED_LENGTHS:
+        raise ValueError(f"OTP length must be one of {ALLOWED_LENGTHS}")
+    code = ''.join(secrets.choice('0123456789') for _ in range(length))
+    key, digest = _key(customer_id), _digest(customer_id, code)
+    ttl = current_app.config.get('OTP_TTL', 300)
+
+    client = get_redis()
+    if client is not None:
+        try:
+            with client.pipeline() as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping={'digest': digest, 'attempts': 0})
+                pipe.expire(key, ttl)
+                pipe.execute()
+            return code
+        except redis.RedisError as e:
+            mark_redis_down(e)
+    local_otp_store.save(key, digest, ttl)
+    return code
+
+
+def verify_otp(customer_id, code):
+    """
+    Check and consume the live code of `customer_id`.
+
+    Returns:
+        True if `code` matches; the code can then not be used again
+    """
+    code = str(code).strip()
+    if not code.isdigit() or len(code) not in ALLOWED_LENGTHS:
+        return False
+    key, digest = _key(customer_id), _digest(customer_id, code)
+    max_attempts = current_app.config.get('OTP_MAX_ATTEMPTS', 5)
+
+    client = get_redis()
+    if client is not None:
+        try:
+            return client.eval(_VERIFY_SCRIPT, 1, key, digest, max_attempts) == 1
+        except redis.RedisError as e:
+            mark_redis_down(e)
+    return local_otp_store.verify(key, digest, max_attempts) == 1
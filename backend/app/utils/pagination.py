@@ -1,13 +1,297 @@
-from flask import jsonify, request
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are addressed by an opaque cursor encoding the sort value and the
+primary key of the last row returned, so every page is an index range
+scan instead of OFFSET/LIMIT. Totals are only computed when the client
+asks for them, using a pluggable count strategy: an exact COUNT(*), a
+COUNT(*) cached per filter fingerprint, or a PostgreSQL planner estimate.
+"""
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+
+from flask import current_app, jsonify, request
+from sqlalchemy import Select, Table, and_, func, inspect, or_, select, text, tuple_
+
+from app.extensions import db
+from app.utils.cache import get_or_compute
+from app.utils.sql import Explain, is_postgres
+
+MAX_PER_PAGE = 100
+
+COUNT_EXACT = 'exact'
+COUNT_CACHED = 'cached'
+COUNT_ESTIMATED = 'estimated'
+COUNT_STRATEGIES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATED)
+
+
+def encode_cursor(sort_key, values):
+    """Encode the sort key and last-row values as an opaque URL-safe token."""
+    payload = json.dumps({'s': sort_key, 'v': [
+        value.isoformat() if isinstance(value, (datetime, date)) else value
+        for value in values
+    ]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, sort_key, columns):
+    """
+    Decode a cursor produced by `encode_cursor` for the same sort.
+
+    Raises:
+        ValueError: If the token is malformed or was issued for another sort order
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = payload['v']
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+    if payload.get('s') != sort_key or len(values) != len(columns):
+        raise ValueError("Pagination cursor does not match the requested sort")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        if value is not None and python_type in (datetime, date):
+            value = python_type.fromisoformat(value)
+        decoded.append(value)
+    return decoded
+
+
+def primary_key_attribute(entity):
+    """Mapped attribute of the (single-column) primary key of `entity`."""
+    mapper = inspect(entity)
+    return getattr(entity, mapper.get_property_by_column(mapper.primary_key[0]).key)
+
+
+def _statement(query):
+    """Unordered Core statement behind an ORM query or Core select."""
+    query = query.order_by(None)
+    return query if isinstance(query, Select) else query.statement
+
+
+def query_fingerprint(query):
+    """Stable hash of a query's SQL and bound parameters, used as a count cache key."""
+    compiled = _statement(query).compile()
+    params = sorted((key, repr(value)) for key, value in compiled.params.items())
+    return hashlib.sha1(f"{compiled}|{params}".encode('utf-8')).hexdigest()
+
+
+def exact_count(query):
+    if isinstance(query, Select):
+        return db.session.execute(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        ).scalar()
+    return query.order_by(None).count()
+
+
+def cached_count(query, ttl):
+    """Exact count shared across requests with the same filters for `ttl` seconds."""
+    return get_or_compute(
+        f"count:{query_fingerprint(query)}",
+        lambda: exact_count(query),
+        ttl=ttl,
+        stale_ttl=ttl
+    )
+
+
+def estimated_count(query):
+    """
+    Planner row estimate for `query` on PostgreSQL.
+
+    Unfiltered single-table queries read `pg_class.reltuples`; everything
+    else takes the top-level "Plan Rows" of EXPLAIN.
+
+    Returns:
+        Estimated row count, or None when no estimate is available
+    """
+    if not is_postgres(db.session):
+        return None
+
+    statement = _statement(query)
+    froms = statement.get_final_froms()
+    if statement.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+        reltuples = db.session.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+            {'table': froms[0].name}
+        ).scalar()
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+
+    plan = db.session.execute(Explain(statement, json=True)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_total(query, strategy=COUNT_CACHED, ttl=60):
+    """
+    Count the rows of `query` with the given strategy.
+
+    Returns:
+        Tuple of (total, estimated flag). Cached and planner totals are
+        reported as estimated; the planner strategy falls back to the cached
+        count on databases without an estimate.
+    """
+    if strategy == COUNT_EXACT:
+        return exact_count(query), False
+    if strategy == COUNT_ESTIMATED:
+        estimate = estimated_count(query)
+        if estimate is not None:
+            return estimate, True
+    return cached_count(query, ttl), True
+
+
+def _after(columns, values, descending, nullable):
+    # Rows following the cursor row. NULL sort values order after every
+    # value (ASC NULLS LAST, DESC NULLS FIRST), matching PostgreSQL's default
+    # b-tree order, and are walked by key among themselves.
+    def follows(left, right):
+        return left < right if descending else left > right
+
+    if len(columns) == 1:
+        return follows(columns[0], values[0])
+    (sort_column, pk), (value, key) = columns, values
+    if not nullable:
+        return follows(tuple_(sort_column, pk), tuple_(value, key))
+    if value is None:
+        tail = and_(sort_column.is_(None), follows(pk, key))
+        return or_(tail, sort_column.is_not(None)) if descending else tail
+    bound = follows(tuple_(sort_column, pk), tuple_(value, key))
+    return bound if descending else or_(bound, sort_column.is_(None))
+
+
+def _ordering(column, descending, nullable):
+    ordered = column.desc() if descending else column.asc()
+    if not nullable:
+        return ordered
+    return ordered.nulls_first() if descending else ordered.nulls_last()
+
+
+def keyset_paginate(query, sort_column, descending=True, per_page=20, cursor=None, count_strategy=None,
+                    primary_key=None):
+    """
+    Fetch one page of `query` ordered by `sort_column` plus the primary key.
+
+    Args:
+        query: Filtered ORM query over a single mapped entity, or a Core
+            `select()` whose rows expose the sort and key columns by attribute name
+        sort_column: Mapped attribute to sort by. NULLs of a nullable column
+            sort as the largest value: last ascending, first descending
+        descending: Sort direction, applied to both the column and the key
+        per_page: Page size, capped at MAX_PER_PAGE
+        cursor: Token from a previous page's `next_cursor`
+        count_strategy: One of COUNT_STRATEGIES to include a total, None to skip it
+        primary_key: Tie-breaking key attribute; defaults to the ORM query's entity key
+
+    Returns:
+        Tuple of (items or rows, pagination metadata dictionary)
+
+    Raises:
+        ValueError: If the cursor is invalid for this sort
+    """
+    pk = primary_key or primary_key_attribute(query.column_descriptions[0]['entity'])
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    columns = [sort_column] if sort_column is pk else [sort_column, pk]
+    sort_key = f"{'-' if descending else ''}{sort_column.key}"
+
+    meta = {'per_page': per_page}
+    if count_strategy:
+        meta['total'], meta['total_estimated'] = count_total(
+            query, count_strategy, current_app.config.get('PAGINATION_COUNT_TTL', 60)
+        )
+
+    nullable = getattr(sort_column.expression, 'nullable', True) and sort_column is not pk
+
+    if cursor:
+        values = decode_cursor(cursor, sort_key, columns)
+        query = query.filter(_after(columns, values, descending, nullable))
+
+    query = query.order_by(*[
+        _ordering(column, descending, nullable and column is sort_column) for column in columns
+    ])
+    query = query.limit(per_page + 1)
+    rows = db.session.execute(query).all() if isinstance(query, Select) else query.all()
+    items = rows[:per_page]
+    has_more = len(rows) > per_page
+
+    meta['has_more'] = has_more
+    meta['next_cursor'] = encode_cursor(
+        sort_key, [getattr(items[-1], column.key) for column in columns]
+    ) if has_more else None
+    return items, meta
+
+
+def parse_sort(model, sort, allowed):
+    """
+    Resolve a `sort` argument such as '-created_at' against a whitelist.
+
+    Returns:
+        Tuple of (mapped attribute, descending flag)
+
+    Raises:
+        ValueError: If the field is not sortable
+    """
+    descending = sort.startswith('-')
+    field = sort.lstrip('-')
+    if field not in allowed:
+        raise ValueError(f"Cannot sort by {field}")
+    return getattr(model, field), descending
+
+
+def requested_count_strategy():
+    """
+    Count strategy requested by the client, or None when no total is wanted.
+
+    Totals are opt-in with `?include_total=true`; `?count=exact|cached|estimated`
+    overrides the PAGINATION_COUNT_STRATEGY default.
+
+    Raises:
+        ValueError: If an unknown strategy is requested
+    """
+    if request.args.get('include_total', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+    strategy = request.args.get('count') or current_app.config.get('PAGINATION_COUNT_STRATEGY', COUNT_CACHED)
+    if strategy not in COUNT_STRATEGIES:
+        raise ValueError(f"Unknown count strategy: {strategy}")
+    return strategy
+
+
+def paginate(query, serializer=lambda x: x, per_page=10, sort_column=None, descending=True, fieldset=None):
+    """
+    Paginate `query` with a cursor taken from the request arguments.
+
+    The sort defaults to the primary key of the queried entity. Pass
+    `?cursor=` from the previous response to fetch the next page and
+    `?include_total=true` to also receive a total. When a `fieldset` is
+    given, `?fields=a,b` limits both the loaded columns and the serialized
+    keys to the requested fields.
+    """
+    if sort_column is None:
+        sort_column = primary_key_attribute(query.column_descriptions[0]['entity'])
+
+    try:
+        if fieldset is not None and request.args.get('fields'):
+            names = fieldset.parse(request.args['fields'])
+            query = query.options(*fieldset.load_options(names, sort_column))
+            serializer = fieldset.serializer(names)
+
+        items, meta = keyset_paginate(
+            query,
+            sort_column,
+            descending=descending,
+            per_page=per_page,
+            cursor=request.args.get('cursor'),
+            count_strategy=requested_count_strategy()
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
 
-def paginate(query, serializer=lambda x: x, per_page=10):
-    page = request.args.get('page', 1, type=int)
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    
     return jsonify({
-        'items': [serializer(item) for item in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': pagination.page,
-        'per_page': pagination.per_page
-    })
\ No newline at end of file
+        'items': [serializer(item) for item in items],
+        **meta
+    })
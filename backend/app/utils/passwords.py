@@ -0,0 +1,160 @@
+"""
+Password hashing off the request thread.
+
+Key derivation is deliberately CPU-bound, so a burst of logins on one worker
+starves every other request it serves. `PasswordHasher` runs
+`generate_password_hash`/`check_password_hash` in a small process pool
+(PASSWORD_HASH_WORKERS processes, at most PASSWORD_HASH_MAX_PENDING jobs
+queued or running). When the pool is saturated for PASSWORD_HASH_TIMEOUT
+seconds, or a job takes longer than that, `PasswordHasherBusy` (a 503) is
+raised instead of queueing more work. A job keeps its slot until it has
+actually finished, even after the request stopped waiting for it.
+
+New hashes use PASSWORD_HASH_METHOD, a Werkzeug method string such as
+`pbkdf2:sha256:600000`. Hashes stored with any other method or cost are
+reported by `needs_rehash`, and `verify_and_upgrade` replaces them on the
+next successful login.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+SALT_LENGTH = 16
+
+
+class PasswordHasherBusy(ServiceUnavailable):
+    description = 'Too many concurrent sign-ins. Please try again shortly.'
+
+
+def canonical_method(method):
+    """
+    Spell out the defaults Werkzeug fills in, so equal costs compare equal.
+
+    Example:
+        'pbkdf2:sha256' -> 'pbkdf2:sha256:260000'
+    """
+    if not method.startswith('pbkdf2'):
+        return method
+    parts = method.split(':')
+    digest = parts[1] if len(parts) > 1 and parts[1] else 'sha256'
+    iterations = parts[2] if len(parts) > 2 and parts[2] else DEFAULT_PBKDF2_ITERATIONS
+    return f"pbkdf2:{digest}:{int(iterations)}"
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords in a bounded process pool.
+
+    Args:
+        method: Werkzeug method string used for new hashes
+        workers: Pool processes; 0 hashes in the calling thread
+        max_pending: Jobs allowed in the pool at once, queued or running
+        timeout: Seconds to wait for a free slot and for the result
+    """
+
+    def __init__(self, method=DEFAULT_METHOD, workers=0, max_pending=16, timeout=10):
+        self.method = canonical_method(method)
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def configure(self, config):
+        self.shutdown()
+        self.method = canonical_method(config.get('PASSWORD_HASH_METHOD', self.method))
+        self.workers = config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.timeout = config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self._slots = threading.BoundedSemaphore(max(config.get('PASSWORD_HASH_MAX_PENDING', 16), 1))
+
+    def _executor(self):
+        # Pools do not survive a fork; each server worker gets its own
+        if self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        slots = self._slots
+        if not slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor().submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, SALT_LENGTH)
+
+    def verify(self, pwhash, password):
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if `pwhash` was not produced with the configured method and cost."""
+        if not pwhash or '$' not in pwhash:
+            return True
+        return canonical_method(pwhash.split('$', 1)[0]) != self.method
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._pool_pid = None
+
+
+password_hasher = PasswordHasher()
+
+
+def hash_password(password):
+    return password_hasher.hash(password)
+
+
+def verify_password(pwhash, password):
+    return password_hasher.verify(pwhash, password)
+
+
+def needs_rehash(pwhash):
+    return password_hasher.needs_rehash(pwhash)
+
+
+def verify_and_upgrade(user, password):
+    """
+    Check `password` against `user.password_hash`, rehashing it if outdated.
+
+    The new hash is only assigned; committing it is up to the caller.
+
+    Returns:
+        True if the password matches
+    """
+    if not verify_password(user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+    return True
+
+
+def init_passwords(app):
+    password_hasher.configure(app.config)
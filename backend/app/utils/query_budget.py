@@ -0,0 +1,78 @@
+"""
+Per-request SQL statement budget.
+
+Views declare how many statements they may issue with `@query_budget(n)`.
+Every statement executed while handling a request is counted on `g`; when a
+view goes over its budget the request is logged, or fails outright when
+QUERY_BUDGET_STRICT is set (as in the test configuration), so N+1 regressions
+surface in tests instead of production.
+"""
+import logging
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_BUDGET_ATTRIBUTE = '_query_budget'
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view issued more SQL statements than its declared budget."""
+
+
+def query_budget(limit):
+    """Declare the maximum number of SQL statements a view may execute."""
+    def decorator(f):
+        setattr(f, _BUDGET_ATTRIBUTE, limit)
+        return f
+    return decorator
+
+
+def budget_for(view):
+    """Budget declared on `view` or any function it wraps, or None."""
+    while view is not None:
+        limit = getattr(view, _BUDGET_ATTRIBUTE, None)
+        if limit is not None:
+            return limit
+        view = getattr(view, '__wrapped__', None)
+    return None
+
+
+def queries_this_request():
+    return g.get('query_count', 0)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def enforce_budget(limit, endpoint=None):
+    """
+    Compare this request's statement count with `limit`.
+
+    Raises:
+        QueryBudgetExceeded: If over budget and QUERY_BUDGET_STRICT is enabled
+    """
+    count = queries_this_request()
+    if limit is None or count <= limit:
+        return
+    message = f"{endpoint or request.endpoint} executed {count} queries (budget {limit})"
+    if current_app.config.get('QUERY_BUDGET_STRICT'):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _check_budget(response):
+    view = current_app.view_functions.get(request.endpoint)
+    enforce_budget(budget_for(view))
+    return response
+
+
+def init_query_budget(app):
+    """Count statements per request and check view budgets after each request."""
+    if not event.contains(Engine, 'before_cursor_execute', _count_statement):
+        event.listen(Engine, 'before_cursor_execute', _count_statement)
+    app.after_request(_check_budget)
@@ -0,0 +1,118 @@
+"""
+Core read path for list endpoints.
+
+Listings turn every row straight into a dictionary, so hydrating ORM
+instances, registering them in the session identity map and tracking their
+state is pure overhead. A read model selects exactly the columns of a field
+set with a Core `select()` and feeds the resulting rows to a serializer
+compiled for plain attribute access (`FieldSet.row_serializer`).
+
+Columns are labelled with their mapped attribute name, so rows look like
+read-only instances to the serializers and to keyset pagination. A selected
+relation (the borrower of a loan) is outer-joined and its columns labelled
+`<field>__<attribute>`.
+"""
+import math
+
+from flask import jsonify, request
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.utils.pagination import keyset_paginate, requested_count_strategy
+
+
+def read_columns(fieldset, names, *extra):
+    """Labelled columns to select for `names` of `fieldset`, plus `extra` attributes."""
+    columns = [attribute.label(attribute.key) for attribute in fieldset.columns(names, *extra)]
+    for name in names:
+        if name in fieldset.relations:
+            _, nested, nested_names = fieldset.relations[name]
+            columns.extend(
+                attribute.label(f"{name}__{attribute.key}") for attribute in nested.columns(nested_names)
+            )
+    return columns
+
+
+def read_select(fieldset, names, *extra):
+    """
+    Core `select()` of the columns `fieldset.row_serializer(names)` reads.
+
+    Args:
+        fieldset: FieldSet describing the model's selectable fields
+        names: Field names to select
+        extra: Additional attributes needed by the caller, e.g. the sort column
+
+    Returns:
+        Select over the model's table, outer-joined to any selected relations
+    """
+    statement = select(*read_columns(fieldset, names, *extra)).select_from(fieldset.model)
+    for name in names:
+        if name in fieldset.relations:
+            statement = statement.outerjoin(getattr(fieldset.model, fieldset.relations[name][0]))
+    return statement
+
+
+def read_page(statement, serializer, sort_column, primary_key, descending=True, per_page=20,
+              cursor=None, count_strategy=None):
+    """
+    One keyset page of a read-model select, serialized.
+
+    Returns:
+        Tuple of (list of dictionaries, pagination metadata dictionary)
+
+    Raises:
+        ValueError: If the cursor is invalid for this sort
+    """
+    rows, meta = keyset_paginate(
+        statement,
+        sort_column,
+        descending=descending,
+        per_page=per_page,
+        cursor=cursor,
+        count_strategy=count_strategy,
+        primary_key=primary_key
+    )
+    return [serializer(row) for row in rows], meta
+
+
+def read_offset_page(statement, serializer, page=1, per_page=10):
+    """
+    Page-numbered variant for endpoints that expose `page`/`pages`.
+
+    `statement` must already be ordered.
+
+    Returns:
+        Tuple of (list of dictionaries, total row count, page count)
+    """
+    page, per_page = max(page, 1), max(per_page, 1)
+    total = db.session.execute(
+        select(func.count()).select_from(statement.order_by(None).subquery())
+    ).scalar()
+    rows = db.session.execute(statement.limit(per_page).offset((page - 1) * per_page))
+    return [serializer(row) for row in rows], total, math.ceil(total / per_page)
+
+
+def paginate_read_model(fieldset, criteria, default_fields=None, per_page=10, sort_column=None, descending=True):
+    """
+    Read-model counterpart of `pagination.paginate` for customer listings.
+
+    Selects `?fields=` (or `default_fields`) of `fieldset` filtered by
+    `criteria` and returns the same `{'items': [...], ...}` envelope.
+    """
+    sort_column = sort_column if sort_column is not None else fieldset.primary_key
+    try:
+        names = fieldset.parse(request.args.get('fields'), default=default_fields)
+        items, meta = read_page(
+            read_select(fieldset, names, sort_column).where(*criteria),
+            fieldset.row_serializer(names),
+            sort_column,
+            fieldset.primary_key,
+            descending=descending,
+            per_page=per_page,
+            cursor=request.args.get('cursor'),
+            count_strategy=requested_count_strategy()
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({'items': items, **meta})
@@ -0,0 +1,162 @@
+"""
+Retention policies for tables that otherwise only grow.
+
+Each policy names a table and the rows that may go. `purge` removes them in
+primary-key order, BATCH_SIZE rows per transaction, so no statement holds
+locks or writes WAL for long, and pauses briefly between batches to leave
+room for foreground traffic. Run it with `flask purge run` (e.g. from cron)
+or call `run_retention()` from a scheduled job.
+"""
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, delete, func, or_, select
+
+from app.extensions import db
+from app.models.activity_log import ActivityLog
+from app.models.token import TokenBlocklist
+
+purge_cli = AppGroup('purge', help='Delete rows past their retention period.')
+
+
+class RetentionPolicy:
+    """
+    Rows of `model` matching `criteria(config, now)` are eligible for deletion.
+
+    Args:
+        name: Identifier used on the command line
+        model: Mapped class with a single integer primary key `id`
+        criteria: Callable returning a SQL expression for eligible rows
+    """
+
+    def __init__(self, name, model, criteria):
+        self.name = name
+        self.model = model
+        self.criteria = criteria
+
+    def where(self, config, now):
+        return self.criteria(config, now)
+
+
+def _expired_tokens(config, now):
+    # Rows written before expires_at existed live as long as a refresh token
+    refresh = config.get('JWT_REFRESH_TOKEN_EXPIRES') or timedelta(days=30)
+    return or_(
+        TokenBlocklist.expires_at < now,
+        and_(TokenBlocklist.expires_at.is_(None), TokenBlocklist.created_at < now - refresh)
+    )
+
+
+def _old_activity(config, now):
+    days = config.get('ACTIVITY_LOG_RETENTION_DAYS', 365)
+    return ActivityLog.timestamp < now - timedelta(days=days)
+
+
+POLICIES = {
+    policy.name: policy for policy in (
+        RetentionPolicy('token_blocklist', TokenBlocklist, _expired_tokens),
+        RetentionPolicy('activity_logs', ActivityLog, _old_activity),
+    )
+}
+
+
+def eligible_rows(policy, now=None):
+    """Number of rows `policy` would delete right now."""
+    now = now or datetime.utcnow()
+    statement = select(func.count()).select_from(policy.model).where(policy.where(current_app.config, now))
+    return db.session.execute(statement).scalar()
+
+
+def purge(policy, batch_size=None, max_batches=None, pause=None, now=None):
+    """
+    Delete the rows `policy` selects, one small keyset-ordered batch at a time.
+
+    Args:
+        policy: RetentionPolicy to apply
+        batch_size: Rows per transaction (RETENTION_BATCH_SIZE)
+        max_batches: Stop after this many batches; None runs until done
+        pause: Seconds to sleep between batches (RETENTION_BATCH_PAUSE)
+        now: Reference time for the policy's cutoffs
+
+    Yields:
+        (rows deleted, seconds spent) per committed batch
+    """
+    config = current_app.config
+    batch_size = batch_size or config.get('RETENTION_BATCH_SIZE', 1000)
+    pause = config.get('RETENTION_BATCH_PAUSE', 0.05) if pause is None else pause
+    now = now or datetime.utcnow()
+
+    primary_key = policy.model.id
+    criteria = policy.where(config, now)
+    last_id = None
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        started = time.perf_counter()
+        statement = select(primary_key).where(criteria).order_by(primary_key).limit(batch_size)
+        if last_id is not None:
+            statement = statement.where(primary_key > last_id)
+        try:
+            ids = db.session.execute(statement).scalars().all()
+            if not ids:
+                db.session.rollback()
+                return
+            deleted = db.session.execute(
+                delete(policy.model).where(primary_key.in_(ids)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        last_id = ids[-1]
+        batches += 1
+        yield deleted, time.perf_counter() - started
+
+        if len(ids) < batch_size:
+            return
+        if pause:
+            time.sleep(pause)
+
+
+def run_retention(names=None, batch_size=None, max_batches=None):
+    """
+    Apply the named policies (all of them by default).
+
+    Returns:
+        Dictionary of policy name to total rows deleted
+    """
+    return {
+        name: sum(rows for rows, _ in purge(POLICIES[name], batch_size, max_batches))
+        for name in (names or POLICIES)
+    }
+
+
+@purge_cli.command('run')
+@click.option('--policy', 'names', multiple=True, type=click.Choice(sorted(POLICIES)),
+              help='Policy to apply; repeatable. Defaults to all.')
+@click.option('--batch-size', type=int, default=None, help='Rows deleted per transaction.')
+@click.option('--max-batches', type=int, default=None, help='Stop each policy after this many batches.')
+@click.option('--dry-run', is_flag=True, help='Only count eligible rows.')
+def purge_command(names, batch_size, max_batches, dry_run):
+    """Delete expired revoked tokens and old audit rows."""
+    for name in names or POLICIES:
+        policy = POLICIES[name]
+        if dry_run:
+            click.echo(f"{name}: {eligible_rows(policy)} eligible rows")
+            continue
+
+        total, elapsed = 0, 0.0
+        for batch, (rows, seconds) in enumerate(purge(policy, batch_size, max_batches), start=1):
+            total += rows
+            elapsed += seconds
+            click.echo(f"{name}: batch {batch} deleted {rows} rows in {seconds * 1000:.1f}ms")
+        click.echo(f"{name}: {total} rows deleted in {elapsed:.2f}s")
+
+
+def init_retention(app):
+    """Register the `flask purge` command group."""
+    app.cli.add_command(purge_cli)
@@ -0,0 +1,307 @@
+"""
+Layered JWT revocation checks.
+
+`token_blocklist` stays the source of truth, but it is no longer queried on
+every authenticated request:
+
+1. In-process: an LRU of JTIs known to be revoked, plus a short-lived memo
+   of JTIs recently found not revoked (REVOCATION_NEGATIVE_TTL seconds).
+2. Redis: one `revoked:jti:<jti>` key per revoked token, expiring with the
+   token. The mirror is rebuilt from the database whenever its
+   `revoked:synced` marker is missing, and at least every
+   REVOCATION_RESYNC_INTERVAL seconds, which also picks up revocations
+   written while Redis was unreachable.
+3. The database, used while Redis is unavailable or the mirror is being
+   rebuilt.
+
+Revocations are published on a Redis channel. Every worker subscribes,
+moves the JTI into its revoked LRU and drops it from the negative memo,
+so a revoked token stops working everywhere at once rather than after the
+memo expires.
+
+A revocation whose Redis write fails (or that is made while Redis is marked
+down) is kept in a per-process pending list. The next time that worker
+reaches Redis it deletes `revoked:synced`, which makes every worker rebuild
+the mirror from the database, and publishes the pending JTIs. Until then
+other workers may still accept the token: the worst case is
+REVOCATION_RESYNC_INTERVAL (the lifetime of `revoked:synced`) plus
+REVOCATION_NEGATIVE_TTL, if the revoking worker never reaches Redis again.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import redis
+from flask import current_app
+
+from app.extensions import db
+from app.models.token import TokenBlocklist
+from app.utils.cache import get_redis, mark_redis_down
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'revoked:jti:'
+SYNCED_KEY = 'revoked:synced'
+SYNC_LOCK_KEY = 'revoked:sync:lock'
+CHANNEL = 'revoked:events'
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _ExpiringLRU:
+    """Bounded mapping of key to a monotonic deadline."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            deadline = self._entries.get(key)
+            if deadline is None:
+                return False
+            if deadline < time.monotonic():
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, key, ttl):
+        with self._lock:
+            self._entries[key] = time.monotonic() + max(ttl, 0)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _seconds_until(expires_at):
+    """Seconds from now until a naive-UTC datetime or an epoch timestamp."""
+    if expires_at is None:
+        return None
+    if isinstance(expires_at, datetime):
+        return (expires_at - datetime.utcnow()).total_seconds()
+    return expires_at - time.time()
+
+
+class RevocationChecker:
+    """
+    Answers "is this JTI revoked?" from memory or Redis when it safely can.
+
+    Args:
+        max_entries: Size of each in-process tier
+        negative_ttl: Seconds a "not revoked" answer is reused in-process
+        resync_interval: Seconds before the Redis mirror is rebuilt from the database
+        default_ttl: Lifetime assumed for blocklist rows without `expires_at`
+    """
+
+    def __init__(self, max_entries=10000, negative_ttl=5, resync_interval=300, default_ttl=86400):
+        self.negative_ttl = negative_ttl
+        self.resync_interval = resync_interval
+        self.default_ttl = default_ttl
+        self._revoked = _ExpiringLRU(max_entries)
+        self._clear = _ExpiringLRU(max_entries)
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+        # JTIs revoked in the database whose Redis write failed
+        self._unmirrored = set()
+        self._unmirrored_lock = threading.Lock()
+
+    def configure(self, config):
+        self.negative_ttl = config.get('REVOCATION_NEGATIVE_TTL', self.negative_ttl)
+        self.resync_interval = config.get('REVOCATION_RESYNC_INTERVAL', self.resync_interval)
+        refresh = config.get('JWT_REFRESH_TOKEN_EXPIRES')
+        if isinstance(refresh, timedelta):
+            self.default_ttl = int(refresh.total_seconds())
+
+    def reset(self):
+        self._revoked.clear()
+        self._clear.clear()
+        with self._unmirrored_lock:
+            self._unmirrored.clear()
+
+    def remember_revoked(self, jti, expires_at=None):
+        ttl = _seconds_until(expires_at)
+        self._revoked.add(jti, self.default_ttl if ttl is None else ttl)
+        self._clear.discard(jti)
+
+    def is_revoked(self, jti, expires_at=None):
+        """
+        Check `jti`, whose token expires at `expires_at` (epoch seconds or datetime).
+
+        Returns:
+            True if the token has been revoked
+        """
+        if jti in self._revoked:
+            return True
+        if jti in self._clear:
+            return False
+
+        revoked = self._check_redis(jti)
+        if revoked is None:
+            revoked = self._check_database(jti)
+
+        if revoked:
+            self.remember_revoked(jti, expires_at)
+        elif self.negative_ttl:
+            self._clear.add(jti, self.negative_ttl)
+        return revoked
+
+    def _check_redis(self, jti):
+        """True/False from the Redis mirror, or None if it cannot be trusted right now."""
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            self._ensure_listener()
+            self._invalidate_mirror(client)
+            if not client.exists(SYNCED_KEY) and not self.resync(client):
+                return None
+            return bool(client.exists(f"{KEY_PREFIX}{jti}"))
+        except redis.RedisError as e:
+            mark_redis_down(e)
+            return None
+
+    @staticmethod
+    def _check_database(jti):
+        return db.session.query(db.exists().where(TokenBlocklist.jti == jti)).scalar()
+
+    def resync(self, client):
+        """
+        Rebuild the Redis mirror from unexpired blocklist rows.
+
+        Returns:
+            True if the mirror is complete, False if another worker is rebuilding it
+        """
+        token = uuid.uuid4().hex
+        if not client.set(SYNC_LOCK_KEY, token, nx=True, px=60000):
+            return False
+        try:
+            now = datetime.utcnow()
+            rows = db.session.query(TokenBlocklist.jti, TokenBlocklist.expires_at, TokenBlocklist.created_at).filter(
+                db.or_(TokenBlocklist.expires_at.is_(None), TokenBlocklist.expires_at > now)
+            )
+            with client.pipeline(transaction=False) as pipe:
+                for jti, expires_at, created_at in rows:
+                    if expires_at is None:
+                        expires_at = (created_at or now) + timedelta(seconds=self.default_ttl)
+                    ttl = int((expires_at - now).total_seconds())
+                    if ttl > 0:
+                        pipe.set(f"{KEY_PREFIX}{jti}", 1, ex=ttl)
+                pipe.set(SYNCED_KEY, int(time.time()), ex=self.resync_interval)
+                pipe.execute()
+            return True
+        finally:
+            client.eval(_RELEASE_LOCK_SCRIPT, 1, SYNC_LOCK_KEY, token)
+
+    def _invalidate_mirror(self, client):
+        # Revocations that missed the mirror: force every worker to rebuild it
+        if not self._unmirrored:
+            return
+        with self._unmirrored_lock:
+            pending, self._unmirrored = self._unmirrored, set()
+        try:
+            client.delete(SYNCED_KEY)
+            for jti in pending:
+                client.publish(CHANNEL, jti)
+        except redis.RedisError:
+            with self._unmirrored_lock:
+                self._unmirrored |= pending
+            raise
+        logger.info("Redis revocation mirror invalidated after %d unmirrored revocation(s)", len(pending))
+
+    def revoke(self, jti, expires_at=None):
+        """
+        Revoke `jti` in the database, then in Redis and every worker.
+
+        Args:
+            jti: Token identifier
+            expires_at: Token expiry as epoch seconds or naive-UTC datetime; keys
+                and cache entries live until then
+        """
+        if expires_at is not None and not isinstance(expires_at, datetime):
+            expires_at = datetime.utcfromtimestamp(expires_at)
+        db.session.add(TokenBlocklist(jti=jti, expires_at=expires_at))
+        db.session.commit()
+
+        self.remember_revoked(jti, expires_at)
+        client = get_redis()
+        if client is None:
+            self._unmirror(jti)
+            return
+        ttl = _seconds_until(expires_at)
+        try:
+            self._invalidate_mirror(client)
+            client.set(f"{KEY_PREFIX}{jti}", 1, ex=max(int(self.default_ttl if ttl is None else ttl), 1))
+            client.publish(CHANNEL, jti)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+            self._unmirror(jti)
+
+    def _unmirror(self, jti):
+        with self._unmirrored_lock:
+            self._unmirrored.add(jti)
+        logger.warning("Revocation of %s not mirrored to Redis; the mirror is invalidated on reconnect", jti)
+
+    def _ensure_listener(self):
+        # One subscriber thread per process, started after any fork
+        if self._listener_pid == os.getpid() or not current_app.config.get('REVOCATION_PUBSUB', True):
+            return
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            threading.Thread(target=self._listen, name='revocation-listener', daemon=True).start()
+
+    def _listen(self):
+        while True:
+            client = get_redis()
+            if client is None:
+                time.sleep(5)
+                continue
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    jti = message.get('data')
+                    if isinstance(jti, bytes):
+                        jti = jti.decode()
+                    if jti:
+                        self.remember_revoked(jti)
+            except redis.RedisError as e:
+                logger.warning("Revocation listener disconnected: %s", str(e))
+                time.sleep(5)
+
+
+revocation_checker = RevocationChecker()
+
+
+def is_token_revoked(jwt_payload):
+    """`token_in_blocklist_loader` implementation."""
+    return revocation_checker.is_revoked(jwt_payload['jti'], jwt_payload.get('exp'))
+
+
+def revoke_token(jwt_payload):
+    """Revoke the token described by a decoded JWT payload (e.g. `get_jwt()`)."""
+    revocation_checker.revoke(jwt_payload['jti'], jwt_payload.get('exp'))
+
+
+def init_revocation(app):
+    revocation_checker.configure(app.config)
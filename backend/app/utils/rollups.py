@@ -0,0 +1,235 @@
+"""
+Incrementally maintained daily rollups for platform statistics.
+
+Mapper hooks on User, Loan and Withdrawal upsert counters into the
+`stats_daily` table inside the same transaction as the write, so the admin
+dashboard can read totals and windows from a few hundred rollup rows
+instead of scanning the base tables.
+"""
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import String, cast, event, func, inspect, literal, select
+
+from app.extensions import db
+from app.models.user import User
+from app.models.loan import Loan
+from app.models.withdrawal import Withdrawal
+from app.models.stats_daily import StatsDaily
+from app.utils.sql import dialect_insert
+
+# Rollup metric names
+USERS = 'users'
+LOANS = 'loans'
+LOAN_STATUS = 'loan_status'
+WITHDRAWALS = 'withdrawals'
+WITHDRAWAL_STATUS = 'withdrawal_status'
+
+stats_cli = AppGroup('stats', help='Maintain the stats_daily rollup tables.')
+
+
+def _day(value):
+    return (value or datetime.utcnow()).date()
+
+
+def _status_name(status):
+    return status.name if status is not None else ''
+
+
+def bump(connection, day, metric, dimension='', count=1, amount=0.0):
+    """Add `count` and `amount` to a rollup bucket, creating it if needed."""
+    table = StatsDaily.__table__
+    stmt = dialect_insert(connection, table).values(
+        day=day,
+        metric=metric,
+        dimension=dimension,
+        count=count,
+        amount=amount or 0.0,
+        updated_at=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.metric, table.c.dimension],
+        set_={
+            'count': table.c.count + stmt.excluded.count,
+            'amount': table.c.amount + stmt.excluded.amount,
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+    connection.execute(stmt)
+
+
+def _previous(target, attr):
+    """Value of `attr` before the pending flush."""
+    history = inspect(target).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, attr)
+
+
+def _changed(target, *attrs):
+    state = inspect(target)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _apply_transition(connection, day, total_metric, status_metric,
+                      old_status, old_amount, new_status, new_amount):
+    if old_amount != new_amount:
+        bump(connection, day, total_metric, count=0, amount=(new_amount or 0) - (old_amount or 0))
+    bump(connection, day, status_metric, _status_name(old_status), -1, -(old_amount or 0))
+    bump(connection, day, status_metric, _status_name(new_status), 1, new_amount)
+
+
+def on_user_insert(mapper, connection, target):
+    bump(connection, _day(target.created_at), USERS)
+
+
+def on_user_delete(mapper, connection, target):
+    bump(connection, _day(target.created_at), USERS, count=-1)
+
+
+def on_loan_insert(mapper, connection, target):
+    day = _day(target.created_at)
+    bump(connection, day, LOANS, amount=target.loan_amount)
+    bump(connection, day, LOAN_STATUS, _status_name(target.loan_status), amount=target.loan_amount)
+
+
+def on_loan_update(mapper, connection, target):
+    if not _changed(target, 'loan_status', 'loan_amount'):
+        return
+    _apply_transition(
+        connection, _day(target.created_at), LOANS, LOAN_STATUS,
+        _previous(target, 'loan_status'), _previous(target, 'loan_amount'),
+        target.loan_status, target.loan_amount
+    )
+
+
+def on_loan_delete(mapper, connection, target):
+    day = _day(target.created_at)
+    bump(connection, day, LOANS, count=-1, amount=-(target.loan_amount or 0))
+    bump(connection, day, LOAN_STATUS, _status_name(target.loan_status), -1, -(target.loan_amount or 0))
+
+
+def on_withdrawal_insert(mapper, connection, target):
+    day = _day(target.created_at)
+    bump(connection, day, WITHDRAWALS, amount=target.amount)
+    bump(connection, day, WITHDRAWAL_STATUS, _status_name(target.withdrawal_status), amount=target.amount)
+
+
+def on_withdrawal_update(mapper, connection, target):
+    if not _changed(target, 'withdrawal_status', 'amount'):
+        return
+    _apply_transition(
+        connection, _day(target.created_at), WITHDRAWALS, WITHDRAWAL_STATUS,
+        _previous(target, 'withdrawal_status'), _previous(target, 'amount'),
+        target.withdrawal_status, target.amount
+    )
+
+
+def on_withdrawal_delete(mapper, connection, target):
+    day = _day(target.created_at)
+    bump(connection, day, WITHDRAWALS, count=-1, amount=-(target.amount or 0))
+    bump(connection, day, WITHDRAWAL_STATUS, _status_name(target.withdrawal_status), -1, -(target.amount or 0))
+
+
+LISTENERS = [
+    (User, 'after_insert', on_user_insert),
+    (User, 'after_delete', on_user_delete),
+    (Loan, 'after_insert', on_loan_insert),
+    (Loan, 'after_update', on_loan_update),
+    (Loan, 'after_delete', on_loan_delete),
+    (Withdrawal, 'after_insert', on_withdrawal_insert),
+    (Withdrawal, 'after_update', on_withdrawal_update),
+    (Withdrawal, 'after_delete', on_withdrawal_delete),
+]
+
+
+# Attributes whose previous value must be known in after_update, even when
+# the instance was expired by an earlier commit
+HISTORY_ATTRIBUTES = [
+    Loan.loan_status,
+    Loan.loan_amount,
+    Withdrawal.withdrawal_status,
+    Withdrawal.amount,
+]
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    """No-op set listener; registering it with active_history loads `oldvalue`."""
+
+
+def register_rollup_listeners():
+    """Attach the rollup hooks to the mapped models (idempotent)."""
+    for model, identifier, listener in LISTENERS:
+        if not event.contains(model, identifier, listener):
+            event.listen(model, identifier, listener)
+    for attribute in HISTORY_ATTRIBUTES:
+        if not event.contains(attribute, 'set', _load_previous_value):
+            event.listen(attribute, 'set', _load_previous_value, active_history=True)
+
+
+# ======================
+# BACKFILL
+# ======================
+
+def _backfill_statements():
+    columns = ['day', 'metric', 'dimension', 'count', 'amount']
+    loan_status = cast(Loan.loan_status, String)
+    withdrawal_status = cast(Withdrawal.withdrawal_status, String)
+    sources = [
+        (USERS, User.created_at, None, func.count(User.user_id), literal(0.0)),
+        (LOANS, Loan.created_at, None, func.count(Loan.application_id),
+         func.coalesce(func.sum(Loan.loan_amount), 0)),
+        (LOAN_STATUS, Loan.created_at, loan_status, func.count(Loan.application_id),
+         func.coalesce(func.sum(Loan.loan_amount), 0)),
+        (WITHDRAWALS, Withdrawal.created_at, None, func.count(Withdrawal.id),
+         func.coalesce(func.sum(Withdrawal.amount), 0)),
+        (WITHDRAWAL_STATUS, Withdrawal.created_at, withdrawal_status, func.count(Withdrawal.id),
+         func.coalesce(func.sum(Withdrawal.amount), 0)),
+    ]
+    for metric, created_at, dimension, count, amount in sources:
+        day = func.date(created_at)
+        group_by = [day] if dimension is None else [day, dimension]
+        source = select(
+            day,
+            literal(metric),
+            literal('') if dimension is None else func.coalesce(dimension, ''),
+            count,
+            amount
+        ).group_by(*group_by)
+        yield metric, StatsDaily.__table__.insert().from_select(columns, source)
+
+
+def backfill():
+    """
+    Rebuild every rollup row from the base tables in one transaction.
+
+    Returns:
+        Dictionary of metric name to number of rollup rows written
+    """
+    written = {}
+    try:
+        db.session.query(StatsDaily).delete(synchronize_session=False)
+        for metric, statement in _backfill_statements():
+            written[metric] = db.session.execute(statement).rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return written
+
+
+@stats_cli.command('backfill')
+def backfill_command():
+    """Rebuild stats_daily from users, loans and withdrawals."""
+    started = datetime.utcnow()
+    written = backfill()
+    for metric, rows in written.items():
+        click.echo(f"{metric}: {rows} rows")
+    click.echo(f"Backfill finished in {(datetime.utcnow() - started).total_seconds():.2f}s")
+
+
+def init_rollups(app):
+    """Register rollup hooks and the `flask stats` command group."""
+    register_rollup_listeners()
+    app.cli.add_command(stats_cli)
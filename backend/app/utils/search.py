@@ -0,0 +1,166 @@
+"""
+Substring search for the admin loan and user lookups.
+
+On PostgreSQL `ILIKE '%term%'` is served by `pg_trgm` GIN indexes on the
+searched columns; phone numbers and application numbers additionally get
+anchored `LIKE 'term%'` fast paths backed by `varchar_pattern_ops` B-tree
+indexes. Phone-shaped terms still match anywhere in the number: the prefix
+clause is OR-ed with the trigram substring match on `phone_number`. SQLite
+(used by the test suite) has no trigram operator class, so it gets FTS5
+trigram shadow tables kept in sync by triggers.
+
+Loan searches match users through `Loan.user_id IN (SELECT ...)` rather than
+an OR across a join, so each side can use its own index.
+"""
+import re
+
+from sqlalchemy import DDL, event, literal_column, or_, select, table, text
+
+from app.extensions import db
+from app.models.user import User
+from app.models.loan import Loan
+from app.utils.sql import is_postgres
+
+# Trigram indexes cannot help with fewer characters than a trigram
+MIN_TRIGRAM_LENGTH = 3
+
+# Digits with optional spaces, dashes and parentheses around an area code
+PHONE_PATTERN = re.compile(r'^\+?\(?\d[\d\s()-]{2,}$')
+APPLICATION_NUMBER_PATTERN = re.compile(r'^[A-Za-z]{0,4}\d[A-Za-z0-9-]{2,}$')
+
+# SQLite FTS5 trigram shadow tables: (virtual table, base table, rowid column, columns)
+FTS_TABLES = (
+    ('users_search', 'users', 'user_id', ('name', 'email', 'phone_number')),
+    ('loans_search', 'loans', 'application_id', ('application_number',)),
+)
+
+
+def escape_like(term):
+    """Escape LIKE wildcards so user input only matches literally."""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def normalize_phone(term):
+    """Strip separators from a phone-like search term."""
+    return re.sub(r'[\s()-]', '', term)
+
+
+def is_phone_term(term):
+    return bool(PHONE_PATTERN.match(term))
+
+
+def is_application_number_term(term):
+    return bool(APPLICATION_NUMBER_PATTERN.match(term)) and not term.isdigit()
+
+
+def _fts_match(virtual_table, term, column=None):
+    """rowids of `virtual_table` whose indexed text (or `column`) contains `term` (SQLite FTS5)."""
+    phrase = '"' + term.replace('"', '""') + '"'
+    if column:
+        phrase = f"{column} : {phrase}"
+    return select(literal_column('rowid')).select_from(table(virtual_table)).where(
+        text(f"{virtual_table} MATCH :{virtual_table}_q").bindparams(**{f'{virtual_table}_q': phrase})
+    )
+
+
+def _contains(column, term):
+    return column.ilike(f"%{escape_like(term)}%", escape='\\')
+
+
+def user_search_clause(term):
+    """
+    Filter clause matching users by name, email or phone number.
+
+    Args:
+        term: Raw search input, already stripped
+
+    Returns:
+        SQL expression usable in `User.query.filter(...)`
+    """
+    if is_phone_term(term):
+        # Anchored prefix on the normalized number, served by the pattern_ops index,
+        # or the digits anywhere in it through the trigram index
+        phone = normalize_phone(term)
+        prefix = User.phone_number.like(f"{escape_like(phone)}%", escape='\\')
+        if len(phone) < MIN_TRIGRAM_LENGTH or is_postgres(db.session):
+            return or_(prefix, _contains(User.phone_number, phone))
+        return or_(prefix, User.user_id.in_(_fts_match('users_search', phone, 'phone_number')))
+
+    if len(term) < MIN_TRIGRAM_LENGTH or is_postgres(db.session):
+        return or_(
+            _contains(User.name, term),
+            _contains(User.email, term),
+            _contains(User.phone_number, term)
+        )
+    return User.user_id.in_(_fts_match('users_search', term))
+
+
+def loan_search_clause(term):
+    """
+    Filter clause matching loans by application number or borrower.
+
+    Application-number-shaped terms take an anchored prefix match; other
+    terms match the application number as a substring. Either way the term
+    is also matched against the borrower, since names and emails such as
+    "juan2026" look like application numbers too.
+    """
+    borrowers = select(User.user_id).where(user_search_clause(term))
+    if is_application_number_term(term):
+        number_clause = Loan.application_number.like(f"{escape_like(term.upper())}%", escape='\\')
+    elif len(term) < MIN_TRIGRAM_LENGTH or is_postgres(db.session):
+        number_clause = _contains(Loan.application_number, term)
+    else:
+        number_clause = Loan.application_id.in_(_fts_match('loans_search', term))
+    return or_(number_clause, Loan.user_id.in_(borrowers))
+
+
+def _fts_ddl(virtual_table, base_table, rowid, columns):
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    delete_row = (
+        f"INSERT INTO {virtual_table}({virtual_table}, rowid, {column_list}) "
+        f"VALUES ('delete', old.{rowid}, {old_values});"
+    )
+    insert_row = f"INSERT INTO {virtual_table}(rowid, {column_list}) VALUES (new.{rowid}, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {virtual_table} USING fts5("
+        f"{column_list}, content='{base_table}', content_rowid='{rowid}', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {virtual_table}_ai AFTER INSERT ON {base_table} BEGIN {insert_row} END",
+        f"CREATE TRIGGER IF NOT EXISTS {virtual_table}_ad AFTER DELETE ON {base_table} BEGIN {delete_row} END",
+        f"CREATE TRIGGER IF NOT EXISTS {virtual_table}_au AFTER UPDATE ON {base_table} "
+        f"BEGIN {delete_row} {insert_row} END",
+        f"INSERT INTO {virtual_table}({virtual_table}) VALUES ('rebuild')",
+    ]
+
+
+def register_search_ddl():
+    """
+    Hook search DDL onto table creation for `db.create_all()`.
+
+    PostgreSQL gets the `pg_trgm` extension the model trigram indexes need;
+    SQLite gets the FTS5 shadow tables, created and dropped with their base tables.
+    """
+    tables = {'users': User.__table__, 'loans': Loan.__table__}
+    event.listen(
+        User.__table__, 'before_create',
+        DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect='postgresql')
+    )
+    for virtual_table, base_table, rowid, columns in FTS_TABLES:
+        target = tables[base_table]
+        for statement in _fts_ddl(virtual_table, base_table, rowid, columns):
+            ddl = DDL(statement).execute_if(dialect='sqlite')
+            event.listen(target, 'after_create', ddl)
+        drop = DDL(f"DROP TABLE IF EXISTS {virtual_table}").execute_if(dialect='sqlite')
+        event.listen(target, 'before_drop', drop)
+
+
+_registered = False
+
+
+def init_search():
+    """Register the search DDL once per process."""
+    global _registered
+    if not _registered:
+        register_search_ddl()
+        _registered = True
@@ -0,0 +1,145 @@
+"""
+Compiled per-model serializers.
+
+Instead of reflecting over attributes and dispatching on value types for
+every row, a serializer is generated once per model and field list: the
+column types are inspected up front, and the generated function reads each
+attribute directly and applies only the conversion that column needs
+(`.value` for enums, `.isoformat()` for dates). For ORM instances the
+loaded state is read straight from the instance dictionary; a variant using
+plain attribute access serves Core rows (see app.utils.read_models).
+
+Models declare serializers as class attributes:
+
+    to_dict = CompiledSerializer((('id', 'application_id'), 'loan_amount', ...))
+
+and `app.utils.fieldsets` compiles one per requested field set.
+"""
+from sqlalchemy import Date, DateTime, Enum, Time, inspect
+
+ENUM = 'enum'
+ISO = 'iso'
+PLAIN = 'plain'
+
+
+def column_kind(model, attribute):
+    """Conversion a mapped column attribute needs: ENUM, ISO or PLAIN."""
+    column_type = inspect(model).column_attrs[attribute].columns[0].type
+    if isinstance(column_type, Enum) and column_type.enum_class is not None:
+        return ENUM
+    if isinstance(column_type, (DateTime, Date, Time)):
+        return ISO
+    return PLAIN
+
+
+def _normalize(fields):
+    # 'name' is shorthand for ('name', 'name')
+    return [(field, field) if isinstance(field, str) else tuple(field) for field in fields]
+
+
+def _body(model, fields, formatters, nested, namespace, read):
+    """Statements and dict items of a serializer reading attributes via `read(name)`."""
+    prelude = []
+    items = []
+    for index, (key, attribute) in enumerate(fields):
+        if key in formatters:
+            namespace[f'f{index}'] = formatters[key]
+            items.append(f'{key!r}: f{index}({read(attribute)})')
+            continue
+        kind = column_kind(model, attribute)
+        if kind == PLAIN:
+            items.append(f'{key!r}: {read(attribute)}')
+            continue
+        prelude.append(f'v{index} = {read(attribute)}')
+        convert = f'v{index}.value' if kind == ENUM else f'v{index}.isoformat()'
+        items.append(f'{key!r}: None if v{index} is None else {convert}')
+
+    for index, (key, (attribute, serializer)) in enumerate(nested.items()):
+        prelude.append(f'r{index} = {read(attribute)}')
+        if isinstance(serializer, str):
+            call = f'r{index}.{serializer}()'
+        else:
+            namespace[f'n{index}'] = serializer
+            call = f'n{index}(r{index})'
+        items.append(f'{key!r}: None if r{index} is None else {call}')
+    return prelude, '{' + ', '.join(items) + '}'
+
+
+def compile_serializer(model, fields, formatters=None, nested=None, name='serialize', instances=True, prefix=''):
+    """
+    Generate a flat serializer function for `model`.
+
+    Args:
+        model: Mapped class whose column types decide the conversions
+        fields: Sequence of output keys or (output key, attribute name) pairs
+        formatters: Mapping of output key to a callable overriding the conversion
+        nested: Mapping of output key to (relationship attribute, serializer),
+            where the serializer is a callable or the name of a method on the
+            related object
+        name: Function name, shown in tracebacks and profiles
+        instances: Read loaded ORM state straight from the instance `__dict__`,
+            falling back to attribute access for unloaded or expired attributes.
+            Pass False for Core rows and other plain attribute objects.
+        prefix: Prepended to every attribute read, for rows whose columns are
+            labelled `<prefix><attribute>` (one side of a join)
+
+    Returns:
+        Function taking one instance or row and returning a dictionary
+    """
+    fields = _normalize(fields)
+    formatters = formatters or {}
+    nested = nested or {}
+    namespace = {}
+
+    prelude, result = _body(model, fields, formatters, nested, namespace, lambda attribute: f'obj.{prefix}{attribute}')
+    attribute_body = ''.join(f'    {line}\n' for line in prelude) + f'    return {result}\n'
+    if instances:
+        # Skipping the instrumented descriptors is most of the per-row cost
+        prelude, result = _body(model, fields, formatters, nested, namespace, lambda attribute: f'd[{prefix + attribute!r}]')
+        source = (
+            f"def {name}(obj):\n"
+            f"    try:\n"
+            f"        d = obj.__dict__\n"
+            + ''.join(f'        {line}\n' for line in prelude)
+            + f"        return {result}\n"
+            f"    except (AttributeError, KeyError):\n"
+            f"        return {name}_attributes(obj)\n\n"
+            f"def {name}_attributes(obj):\n{attribute_body}"
+        )
+    else:
+        source = f"def {name}(obj):\n{attribute_body}"
+
+    exec(compile(source, f'<serializer {model.__name__}.{name}>', 'exec'), namespace)
+    function = namespace[name]
+    function.__source__ = source
+    return function
+
+
+class CompiledSerializer:
+    """
+    Class attribute compiling its serializer on first use and acting as a method.
+
+    Compilation is deferred until the mapper is configured, then happens once
+    per class; afterwards each call is a plain function call.
+    """
+
+    def __init__(self, fields, formatters=None, nested=None):
+        self.fields = tuple(fields)
+        self.formatters = formatters
+        self.nested = nested
+        self.function = None
+        self.name = 'serialize'
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def compile(self, owner):
+        if self.function is None:
+            self.function = compile_serializer(owner, self.fields, self.formatters, self.nested, self.name)
+        return self.function
+
+    def __get__(self, instance, owner):
+        function = self.function or self.compile(owner)
+        if instance is None:
+            return function
+        return function.__get__(instance, owner)
@@ -0,0 +1,92 @@
+"""
+Dialect helpers for statements that differ between PostgreSQL and SQLite.
+"""
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+def dialect_name(bind):
+    """Return the dialect name of an engine, connection or session."""
+    if hasattr(bind, 'get_bind'):
+        bind = bind.get_bind()
+    return bind.dialect.name
+
+
+def is_postgres(bind):
+    """Return True when `bind` targets PostgreSQL."""
+    return dialect_name(bind) == 'postgresql'
+
+
+def dialect_insert(bind, table):
+    """
+    Build an INSERT supporting ON CONFLICT for the dialect behind `bind`.
+
+    Args:
+        bind: Engine, connection or session the statement will run on
+        table: Table or mapped class to insert into
+
+    Returns:
+        A PostgreSQL or SQLite `Insert` construct
+    """
+    if is_postgres(bind):
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def violates_unique(error, name, table, columns):
+    """
+    Whether IntegrityError `error` was raised by the unique index `name`.
+
+    PostgreSQL names the index; SQLite only lists its columns as
+    `table.column`, so those must not be covered by another unique index.
+    """
+    orig = getattr(error, 'orig', error)
+    constraint = getattr(getattr(orig, 'diag', None), 'constraint_name', None)
+    if constraint:
+        return constraint == name
+    message = str(orig)
+    return name in message or message.endswith(', '.join(f"{table}.{column}" for column in columns))
+
+
+class Explain(Executable, ClauseElement):
+    """
+    `EXPLAIN` wrapper for a SELECT, rendered for the executing dialect.
+
+    Bound parameters go through the statement's own type processing, so
+    enum and expanding IN filters work as they do in the query itself.
+    `json=True` asks PostgreSQL for a single JSON plan document.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement, json=False):
+        self.statement = statement
+        self.json = json
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    if compiler.dialect.name == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        prefix = 'EXPLAIN (FORMAT JSON) ' if element.json else 'EXPLAIN '
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def query_plan(session, statement):
+    """Return the planner output for `statement` as a list of text lines."""
+    return [str(row[-1]) for row in session.execute(Explain(statement))]
+
+
+def sequential_scans(plan):
+    """
+    Plan lines that read a whole table instead of an index.
+
+    Matches PostgreSQL `Seq Scan` nodes and SQLite `SCAN <table>` steps
+    that do not go through an index.
+    """
+    return [
+        line for line in plan
+        if 'Seq Scan' in line or (line.lstrip().startswith('SCAN ') and 'INDEX' not in line)
+    ]
@@ -0,0 +1,165 @@
+"""
+Aggregate engine for the admin platform statistics.
+
+Totals and per-status figures are read from the `stats_daily` rollup
+(see app.utils.rollups), so the number of round trips and the rows
+touched stay constant as the base tables grow.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, func, or_
+
+from app.extensions import db
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.models.withdrawal import Withdrawal, WithdrawalStatus
+from app.models.stats_daily import StatsDaily
+from app.utils.cache import get_or_compute, invalidate_on_write
+from app.utils.loaders import admin_loan_options, admin_user_options, admin_withdrawal_options
+from app.utils.rollups import USERS, LOAN_STATUS, WITHDRAWAL_STATUS
+
+TIME_WINDOWS = {
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30)
+}
+
+RECENT_ACTIVITY_LIMIT = 5
+
+STATS_CACHE_KEY = 'admin:stats:platform'
+
+
+def time_ranges(now):
+    """Return the lower bound of every statistics window relative to `now`."""
+    return {label: now - delta for label, delta in TIME_WINDOWS.items()}
+
+
+def _sum(expression):
+    return func.coalesce(func.sum(expression), 0)
+
+
+def _rollup_by_dimension(metric):
+    """Summed count and amount per dimension of a rollup metric across all days."""
+    rows = db.session.query(
+        StatsDaily.dimension,
+        _sum(StatsDaily.count),
+        _sum(StatsDaily.amount)
+    ).filter(StatsDaily.metric == metric).group_by(StatsDaily.dimension).all()
+    # Plain int/float, so a cached copy decodes to the same types
+    return {dimension: (int(count), float(amount)) for dimension, count, amount in rows}
+
+
+def compute_user_stats(ranges):
+    """
+    Total users and new sign-ups per window.
+
+    Whole days after each window's boundary come from the rollup. The
+    partial boundary day is counted from `users.created_at`, which touches
+    at most one day of rows per window.
+    """
+    boundary_days = {label: since.date() for label, since in ranges.items()}
+
+    rollup = db.session.query(
+        _sum(StatsDaily.count),
+        *[_sum(case((StatsDaily.day > day, StatsDaily.count), else_=0))
+          for day in boundary_days.values()]
+    ).filter(StatsDaily.metric == USERS).one()
+
+    partial_days = [
+        and_(User.created_at >= since,
+             User.created_at < datetime.combine(boundary_days[label] + timedelta(days=1), datetime.min.time()))
+        for label, since in ranges.items()
+    ]
+    partial = db.session.query(
+        *[_sum(case((condition, 1), else_=0)) for condition in partial_days]
+    ).filter(or_(*partial_days)).one()
+
+    return {
+        'total': int(rollup[0]),
+        'new': {
+            label: int(whole) + int(part)
+            for label, whole, part in zip(ranges.keys(), rollup[1:], partial)
+        }
+    }
+
+
+def compute_loan_stats():
+    """Loan counts and amounts per status from the rollup."""
+    by_status = _rollup_by_dimension(LOAN_STATUS)
+
+    return {
+        'total': sum(count for count, _ in by_status.values()),
+        'amount': {
+            'total': sum((amount for _, amount in by_status.values()), 0.0),
+            'approved': by_status.get(LoanStatus.APPROVED.name, (0, 0.0))[1]
+        },
+        'status': {
+            status.name: by_status.get(status.name, (0, 0))[0]
+            for status in LoanStatus
+        }
+    }
+
+
+def compute_withdrawal_stats():
+    """Withdrawal counts per status from the rollup."""
+    by_status = _rollup_by_dimension(WITHDRAWAL_STATUS)
+    total = sum(count for count, _ in by_status.values())
+
+    return {
+        'amount': total,
+        'otp-code': total,
+        'completed': by_status.get(WithdrawalStatus.COMPLETED.name, (0, 0))[0],
+        'pending': by_status.get(WithdrawalStatus.PROCESSING.name, (0, 0))[0]
+    }
+
+
+def compute_recent_activity(limit=RECENT_ACTIVITY_LIMIT):
+    """Latest loans, users and withdrawals for the dashboard feed."""
+    return {
+        'loans': [loan.to_admin_dict(include_borrower=True) for loan in
+                  Loan.query.options(*admin_loan_options())
+                  .order_by(Loan.created_at.desc()).limit(limit).all()],
+        'users': [user.to_admin_dict() for user in
+                  User.query.options(*admin_user_options())
+                  .order_by(User.created_at.desc()).limit(limit).all()],
+        'withdrawals': [w.to_admin_dict() for w in
+                        Withdrawal.query.options(*admin_withdrawal_options())
+                        .order_by(Withdrawal.created_at.desc()).limit(limit).all()]
+    }
+
+
+def compute_platform_stats(now=None):
+    """
+    Compute the full admin statistics payload.
+
+    Args:
+        now: Reference time for the windows, defaults to the current UTC time
+
+    Returns:
+        Dictionary with users, loans, withdrawals, recent_activity and timestamp
+    """
+    now = now or datetime.utcnow()
+    ranges = time_ranges(now)
+
+    return {
+        'users': compute_user_stats(ranges),
+        'loans': compute_loan_stats(),
+        'withdrawals': compute_withdrawal_stats(),
+        'recent_activity': compute_recent_activity(),
+        'timestamp': now.isoformat()
+    }
+
+
+def cached_platform_stats(ttl=60, stale_ttl=300):
+    """
+    Platform statistics through the single-flight cache.
+
+    Concurrent misses trigger one computation and stale values are served
+    while it runs; loan and withdrawal writes drop the entry on commit.
+    """
+    return get_or_compute(STATS_CACHE_KEY, compute_platform_stats, ttl=ttl, stale_ttl=stale_ttl)
+
+
+def init_stats_cache():
+    """Invalidate the cached statistics whenever loans or withdrawals change."""
+    invalidate_on_write([Loan, Withdrawal], STATS_CACHE_KEY)
@@ -0,0 +1,169 @@
+"""
+Time-bucketed loan and withdrawal volume series for the admin dashboard.
+
+Bucketing happens in SQL (`date_trunc` on PostgreSQL, `strftime` on
+SQLite) so a whole range costs one grouped query per table. Buckets that
+have closed never change and are cached without expiry; only the open
+bucket and uncached gaps are recomputed.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.loan import Loan
+from app.models.withdrawal import Withdrawal
+from app.utils.cache import get_many, set_many
+from app.utils.sql import is_postgres
+
+INTERVALS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1)
+}
+
+MAX_BUCKETS = 2000
+
+# SQLite equivalents of date_trunc; 'weekday 0', '-6 days' lands on Monday like ISO weeks
+_SQLITE_BUCKETS = {
+    'hour': ('%Y-%m-%d %H:00:00',),
+    'day': ('%Y-%m-%d 00:00:00',),
+    'week': ('%Y-%m-%d 00:00:00', 'weekday 0', '-6 days')
+}
+
+EMPTY_BUCKET = {
+    'applications': 0,
+    'approved_amount': 0.0,
+    'withdrawal_count': 0,
+    'withdrawal_amount': 0.0
+}
+
+
+def as_naive_utc(value):
+    """`value` as a naive UTC datetime, the form stored in the timestamp columns."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 query parameter; offsets are converted to naive UTC.
+
+    Raises:
+        ValueError: If `value` is not an ISO 8601 date or datetime
+    """
+    return as_naive_utc(datetime.fromisoformat(value))
+
+
+def truncate(value, interval):
+    """Start of the bucket containing `value`, matching the SQL bucketing."""
+    if interval == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    start = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == 'week':
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def bucket_starts(start, end, interval):
+    """Every bucket start from the bucket containing `start` up to `end` (exclusive)."""
+    step = INTERVALS[interval]
+    current = truncate(start, interval)
+    buckets = []
+    while current < end:
+        buckets.append(current)
+        current += step
+    return buckets
+
+
+def bucket_expression(column, interval):
+    """SQL expression truncating `column` to the start of its bucket."""
+    if is_postgres(db.session):
+        return func.date_trunc(interval, column)
+    fmt, *modifiers = _SQLITE_BUCKETS[interval]
+    return func.strftime(fmt, column, *modifiers)
+
+
+def _as_datetime(value):
+    # SQLite returns the strftime text, PostgreSQL a timestamp
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _grouped(column, interval, start, end, *aggregates):
+    bucket = bucket_expression(column, interval)
+    rows = db.session.query(bucket, *aggregates).filter(
+        column >= start, column < end
+    ).group_by(bucket).all()
+    return {_as_datetime(row[0]): row[1:] for row in rows}
+
+
+def query_buckets(start, end, interval):
+    """
+    Compute bucket values for [start, end) straight from the base tables.
+
+    Returns:
+        Dictionary of bucket start to a bucket dictionary
+    """
+    applications = _grouped(Loan.created_at, interval, start, end, func.count(Loan.application_id))
+    approved = _grouped(Loan.approval_date, interval, start, end,
+                        func.coalesce(func.sum(Loan.loan_amount), 0))
+    withdrawals = _grouped(Withdrawal.created_at, interval, start, end,
+                           func.count(Withdrawal.id), func.coalesce(func.sum(Withdrawal.amount), 0))
+
+    buckets = {}
+    for bucket in bucket_starts(start, end, interval):
+        withdrawal_count, withdrawal_amount = withdrawals.get(bucket, (0, 0.0))
+        buckets[bucket] = {
+            'applications': applications.get(bucket, (0,))[0],
+            'approved_amount': float(approved.get(bucket, (0.0,))[0]),
+            'withdrawal_count': withdrawal_count,
+            'withdrawal_amount': float(withdrawal_amount)
+        }
+    return buckets
+
+
+def volume_series(start, end, interval='day', now=None):
+    """
+    Application counts, approved amounts and withdrawal totals per bucket.
+
+    Args:
+        start: Range start (inclusive), rounded down to its bucket
+        end: Range end (exclusive)
+        interval: One of 'hour', 'day' or 'week'
+        now: Reference time deciding which buckets are closed
+
+    Offset-aware datetimes are converted to naive UTC first.
+
+    Returns:
+        List of bucket dictionaries ordered by bucket start
+
+    Raises:
+        ValueError: If the interval is unknown or the range is invalid or too large
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    start, end = as_naive_utc(start), as_naive_utc(end)
+    if end <= start:
+        raise ValueError("Range end must be after range start")
+
+    step = INTERVALS[interval]
+    if (end - start) / step > MAX_BUCKETS:
+        raise ValueError(f"Range spans more than {MAX_BUCKETS} {interval} buckets")
+
+    now = as_naive_utc(now) if now else datetime.utcnow()
+    buckets = bucket_starts(start, end, interval)
+    closed = [bucket.isoformat() for bucket in buckets if bucket + step <= now]
+    namespace = f"stats:timeseries:{interval}"
+    values = {datetime.fromisoformat(key): value for key, value in get_many(namespace, closed).items()}
+
+    missing = [bucket for bucket in buckets if bucket not in values]
+    if missing:
+        computed = query_buckets(missing[0], missing[-1] + step, interval)
+        values.update({bucket: computed.get(bucket, dict(EMPTY_BUCKET)) for bucket in missing})
+        set_many(namespace, {
+            bucket.isoformat(): values[bucket]
+            for bucket in missing if bucket + step <= now
+        })
+
+    return [{'bucket': bucket.isoformat(), **values[bucket]} for bucket in buckets]
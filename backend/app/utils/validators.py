@@ -58,6 +58,13 @@ def validate_loan_request(data):
     if not data.get('termMonths'):
         return "Loan term is required"
     
+    # Loan.national_id is NOT NULL, unique and at most 20 characters
+    national_id = data.get('national_id')
+    if not national_id or not str(national_id).strip():
+        return "National ID is required"
+    if not isinstance(national_id, str) or len(national_id.strip()) > 20:
+        return "Invalid national ID"
+    
     # Validate amount
     try:
         amount = float(data['amount'])
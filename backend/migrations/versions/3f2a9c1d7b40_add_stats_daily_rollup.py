@@ -0,0 +1,39 @@
+"""Add stats_daily rollup table
+
+Revision ID: 3f2a9c1d7b40
+Revises: 621bb427e5b1
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b40'
+down_revision = '621bb427e5b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stats_daily',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('dimension', sa.String(length=64), nullable=False, server_default=''),
+    sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('amount', sa.Float(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'metric', 'dimension', name='uq_stats_daily_bucket')
+    )
+    with op.batch_alter_table('stats_daily', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stats_daily_day'), ['day'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stats_daily', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stats_daily_day'))
+
+    op.drop_table('stats_daily')
@@ -0,0 +1,54 @@
+"""Add pg_trgm search indexes for admin lookups
+
+Revision ID: 8c4e1b7a2d95
+Revises: 3f2a9c1d7b40
+Create Date: 2026-10-18 11:04:52.718330
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e1b7a2d95'
+down_revision = '3f2a9c1d7b40'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = (
+    ('ix_users_name_trgm', 'users', 'name'),
+    ('ix_users_email_trgm', 'users', 'email'),
+    ('ix_users_phone_number_trgm', 'users', 'phone_number'),
+    ('ix_loans_application_number_trgm', 'loans', 'application_number'),
+)
+
+PREFIX_INDEXES = (
+    ('ix_users_phone_number_prefix', 'users', 'phone_number'),
+    ('ix_loans_application_number_prefix', 'loans', 'application_number'),
+)
+
+
+def upgrade():
+    # Trigram operator classes only exist on PostgreSQL
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(name, table, [column], unique=False,
+                            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                            postgresql_concurrently=True, if_not_exists=True)
+        for name, table, column in PREFIX_INDEXES:
+            op.create_index(name, table, [column], unique=False,
+                            postgresql_ops={column: 'varchar_pattern_ops'},
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, _ in PREFIX_INDEXES + TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
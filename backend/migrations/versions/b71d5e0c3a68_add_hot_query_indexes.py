@@ -0,0 +1,46 @@
+"""Add composite and partial indexes for hot loan and withdrawal queries
+
+Revision ID: b71d5e0c3a68
+Revises: 8c4e1b7a2d95
+Create Date: 2026-10-18 13:27:09.551284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71d5e0c3a68'
+down_revision = '8c4e1b7a2d95'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, live rows only)
+INDEXES = (
+    ('ix_loans_user_id_loan_status', 'loans', ['user_id', 'loan_status'], False),
+    ('ix_loans_user_id_created_at_live', 'loans', ['user_id', 'created_at', 'application_id'], True),
+    ('ix_loans_created_at', 'loans', ['created_at'], False),
+    ('ix_loans_approval_date', 'loans', ['approval_date'], False),
+    ('ix_withdrawals_user_id_created_at_live', 'withdrawals', ['user_id', 'created_at', 'id'], True),
+    ('ix_withdrawals_created_at', 'withdrawals', ['created_at'], False),
+    ('ix_users_created_at', 'users', ['created_at'], False),
+)
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, live_only in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text('is_deleted = false') if live_only else None,
+                sqlite_where=sa.text('is_deleted = 0') if live_only else None,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,40 @@
+"""Add expires_at to token_blocklist
+
+Revision ID: d4a7c2e91f03
+Revises: b71d5e0c3a68
+Create Date: 2026-10-18 16:02:44.318790
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7c2e91f03'
+down_revision = 'b71d5e0c3a68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Older deployments created token_blocklist with db.create_all()
+    if not sa.inspect(op.get_bind()).has_table('token_blocklist'):
+        op.create_table('token_blocklist',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_token_blocklist_jti'), 'token_blocklist', ['jti'], unique=False)
+    else:
+        with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    op.create_index(op.f('ix_token_blocklist_expires_at'), 'token_blocklist', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_token_blocklist_expires_at'), table_name='token_blocklist')
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_column('expires_at')
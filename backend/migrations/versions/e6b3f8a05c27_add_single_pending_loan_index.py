@@ -0,0 +1,46 @@
+"""Allow at most one pending loan application per user
+
+Revision ID: e6b3f8a05c27
+Revises: d4a7c2e91f03
+Create Date: 2026-10-18 19:41:06.902614
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b3f8a05c27'
+down_revision = 'd4a7c2e91f03'
+branch_labels = None
+depends_on = None
+
+INDEX = 'uq_loans_user_id_pending'
+PENDING = sa.text("loan_status = 'PENDING'")
+
+
+def upgrade():
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT user_id FROM loans WHERE loan_status = 'PENDING' "
+        "GROUP BY user_id HAVING COUNT(*) > 1 LIMIT 10"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            f"Users with more than one pending loan (first 10: {duplicates}); "
+            f"resolve them before creating {INDEX}"
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX, 'loans', ['user_id'], unique=True,
+            postgresql_concurrently=True,
+            postgresql_where=PENDING,
+            sqlite_where=PENDING,
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX, table_name='loans', postgresql_concurrently=True, if_exists=True)
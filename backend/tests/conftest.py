@@ -2,10 +2,13 @@ import pytest
 import time
 import psutil
 import os
+from contextlib import contextmanager
 from functools import wraps
 from flask import current_app
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
 from app import create_app, db
-from app.models.user import User
+from app.models.user import User, Useroles
 from app.models.loan import Loan
 import redis
 from unittest.mock import Mock, patch
@@ -70,6 +73,25 @@ def db_session(app):
         db.session.remove()
         db.drop_all()
 
+@pytest.fixture
+def count_queries(db_session):
+    """Count SQL statements executed inside a `with count_queries() as queries:` block."""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
+
 @pytest.fixture
 def test_user(db_session):
     """Create test user."""
@@ -92,6 +114,15 @@ def auth_headers(test_user, client):
     token = response.get_json()['access_token']
     return {'Authorization': f'Bearer {token}'}
 
+@pytest.fixture
+def admin_headers(app, db_session):
+    """Bearer header for an admin user, as issued by the admin login."""
+    admin = User(name='fixture-admin', phone_number='09170009999', role=Useroles.ADMIN)
+    db_session.session.add(admin)
+    db_session.session.commit()
+    token = create_access_token(identity=admin.user_id, additional_claims={'role': 'admin'})
+    return {'Authorization': f'Bearer {token}'}
+
 @pytest.fixture
 def mock_redis():
     """Mock Redis connection."""
@@ -100,6 +131,73 @@ def mock_redis():
         mock.return_value = mock_client
         yield mock_client
 
+class FakeRedis:
+    """In-memory stand-in for the Redis commands the app's caches use."""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value).encode()
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def expire(self, key, ttl):
+        return key in self.data
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 0
+
+    def eval(self, script, numkeys, *args):
+        # Only the compare-and-delete lock release script is used
+        key, token = args[0], args[numkeys]
+        if self.data.get(key) == token:
+            return self.delete(key)
+        return 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+@pytest.fixture
+def fake_redis():
+    """Dictionary-backed Redis client; patch it in where a module calls get_redis()."""
+    return FakeRedis()
+
 @pytest.fixture
 def mock_google_drive():
     """Mock Google Drive API."""
@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.models.withdrawal import Withdrawal, WithdrawalStatus
+from app.models.stats_daily import StatsDaily
+from app.utils import cache as cache_module
+from app.utils.cache import local_cache
+from app.utils.rollups import backfill
+from app.utils.stats import (
+    cached_platform_stats,
+    compute_user_stats,
+    compute_loan_stats,
+    compute_withdrawal_stats,
+    time_ranges
+)
+
+AGGREGATE_QUERY_BUDGET = 4
+
+
+def seed_platform(db_session, count, offset=0):
+    """Insert `count` users, each with one loan and one withdrawal."""
+    now = datetime.utcnow()
+    statuses = [LoanStatus.PENDING, LoanStatus.APPROVED, LoanStatus.REJECTED]
+    for i in range(offset, offset + count):
+        user = User(name=f'user{i}', phone_number=f'0917{i:07d}', created_at=now - timedelta(days=i % 40))
+        db_session.session.add(user)
+        db_session.session.flush()
+        db_session.session.add(Loan(
+            user_id=user.user_id,
+            application_number=f'APP{i:08d}',
+            national_id=f'NID{i:08d}',
+            loan_amount=100000.0 + i,
+            term_months=12,
+            loan_status=statuses[i % len(statuses)],
+            created_at=now - timedelta(days=i % 40)
+        ))
+        db_session.session.add(Withdrawal(
+            user_id=user.user_id,
+            application_id=f'WID{i:08d}',
+            application_number=f'WDN{i:08d}',
+            amount=1000.0,
+            otp='123456',
+            withdrawal_status=WithdrawalStatus.COMPLETED if i % 2 else WithdrawalStatus.PROCESSING
+        ))
+    db_session.session.commit()
+
+
+def compute_aggregates():
+    ranges = time_ranges(datetime.utcnow())
+    return compute_user_stats(ranges), compute_loan_stats(), compute_withdrawal_stats()
+
+
+def test_aggregates_match_row_counts(db_session):
+    seed_platform(db_session, 30)
+
+    users, loans, withdrawals = compute_aggregates()
+
+    assert users['total'] == 30
+    assert users['new']['24h'] == 1
+    assert users['new']['30d'] == 30
+    assert loans['total'] == 30
+    assert loans['status']['APPROVED'] == 10
+    assert set(loans['status']) == {status.name for status in LoanStatus}
+    assert loans['amount']['total'] == pytest.approx(sum(100000.0 + i for i in range(30)))
+    assert withdrawals['completed'] == 15
+    assert withdrawals['pending'] == 15
+
+
+def test_aggregate_query_count_is_flat(db_session, count_queries):
+    seed_platform(db_session, 10)
+    with count_queries() as small:
+        compute_aggregates()
+
+    seed_platform(db_session, 200, offset=10)
+    with count_queries() as large:
+        compute_aggregates()
+
+    assert len(small) == AGGREGATE_QUERY_BUDGET
+    assert len(large) == AGGREGATE_QUERY_BUDGET
+
+
+def test_status_transition_moves_rollup_counts(db_session):
+    seed_platform(db_session, 3)
+    loan = Loan.query.filter_by(loan_status=LoanStatus.PENDING).first()
+    loan.loan_status = LoanStatus.APPROVED
+    db_session.session.commit()
+
+    loans = compute_loan_stats()
+    assert loans['status']['PENDING'] == 0
+    assert loans['status']['APPROVED'] == 2
+    assert loans['total'] == 3
+
+
+def test_backfill_matches_incremental_rollup(db_session):
+    seed_platform(db_session, 25)
+    incremental = compute_aggregates()
+
+    backfill()
+
+    assert StatsDaily.query.count() > 0
+    assert compute_aggregates() == incremental
+
+
+def test_cached_stats_hit_matches_fresh_compute(db_session, fake_redis, monkeypatch):
+    seed_platform(db_session, 6)
+    local_cache.clear()
+    monkeypatch.setattr(cache_module, 'get_redis', lambda: fake_redis)
+
+    miss = cached_platform_stats()
+    hit = cached_platform_stats()
+
+    assert hit == miss
+    assert isinstance(miss['loans']['amount']['total'], float)
@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.utils import autocomplete
+from app.utils.autocomplete import LOAN, USER, PrefixIndex, autocomplete_index, user_tokens
+
+
+@pytest.fixture
+def fresh_index(db_session):
+    autocomplete_index.reset()
+    yield autocomplete_index
+    autocomplete_index.reset()
+
+
+def labels(suggestions):
+    return [suggestion['label'] for suggestion in suggestions]
+
+
+def test_prefix_index_matches_any_token():
+    index = PrefixIndex([
+        (USER, 1, user_tokens('Juan Dela Cruz', '0917-123-4567'), {'label': 'Juan Dela Cruz'}),
+        (USER, 2, user_tokens('Maria Cruz', '+639181112222'), {'label': 'Maria Cruz'}),
+        (LOAN, 1, {'ln2026abc01'}, {'label': 'LN2026ABC01'}),
+    ])
+
+    assert labels(index.search('cruz')) == ['Juan Dela Cruz', 'Maria Cruz']
+    assert labels(index.search('09171')) == ['Juan Dela Cruz']
+    assert labels(index.search('63918')) == ['Maria Cruz']
+    assert labels(index.search('0917 123')) == ['Juan Dela Cruz']
+    assert labels(index.search('(0917) 12')) == ['Juan Dela Cruz']
+    assert labels(index.search('+63 918')) == ['Maria Cruz']
+    assert labels(index.search('LN20')) == ['LN2026ABC01']
+    assert labels(index.search('cruz', limit=1)) == ['Juan Dela Cruz']
+
+
+def test_upsert_replaces_old_tokens():
+    index = PrefixIndex()
+    index.upsert(USER, 1, user_tokens('Juan', None), {'label': 'Juan'})
+    index.upsert(USER, 1, user_tokens('Pedro', None), {'label': 'Pedro'})
+
+    assert index.search('juan') == []
+    assert labels(index.search('ped')) == ['Pedro']
+    index.remove(USER, 1)
+    assert index.search('ped') == []
+
+
+def test_committed_writes_update_built_index(fresh_index, db_session, count_queries):
+    user = User(name='Juan Dela Cruz', phone_number='09171234567')
+    db_session.session.add(user)
+    db_session.session.commit()
+    fresh_index.ensure_built()
+
+    db_session.session.add(Loan(
+        user_id=user.user_id,
+        application_number='LN2026ABC01',
+        national_id='AC-0001',
+        loan_amount=50000.0,
+        term_months=12,
+        loan_status=LoanStatus.PENDING
+    ))
+    db_session.session.commit()
+    db_session.session.add(User(name='Rolled Back'))
+    db_session.session.flush()
+    db_session.session.rollback()
+
+    with count_queries() as queries:
+        assert labels(fresh_index.suggest('ln2026')) == ['LN2026ABC01']
+        assert labels(fresh_index.suggest('dela')) == ['Juan Dela Cruz']
+        assert fresh_index.suggest('rolled') == []
+    assert queries == []
+
+
+def test_stale_index_rebuilt_in_background_keeps_concurrent_writes(fresh_index, monkeypatch):
+    old = fresh_index.build()
+    release = threading.Event()
+
+    def slow_entries():
+        release.wait(5)
+        return [(USER, 1, user_tokens('Juan Dela Cruz', None), {'label': 'Juan Dela Cruz'})]
+
+    monkeypatch.setattr(autocomplete, 'load_entries', slow_entries)
+    assert fresh_index.ensure_built(max_age=0) is old
+
+    # The stale index keeps answering while the rebuild waits on the database
+    fresh_index.upsert(USER, 2, user_tokens('Maria Cruz', None), {'label': 'Maria Cruz'})
+    assert labels(old.search('maria')) == ['Maria Cruz']
+
+    release.set()
+    fresh_index.wait_for_rebuild(5)
+    assert fresh_index.ensure_built() is not old
+    assert labels(fresh_index.suggest('cruz')) == ['Juan Dela Cruz', 'Maria Cruz']
+
+
+def test_suggest_endpoint_for_admin(client, fresh_index, db_session, admin_headers):
+    db_session.session.add(User(name='Juan Dela Cruz', phone_number='09171234567'))
+    db_session.session.commit()
+
+    # A cold index is built in the background instead of inside the request
+    response = client.get('/api/admin/lookup/suggest', query_string={'q': 'dela'}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['data'] == {'suggestions': [], 'warming': True}
+    assert response.headers['Retry-After'] == '1'
+    fresh_index.wait_for_rebuild(5)
+
+    response = client.get('/api/admin/lookup/suggest', query_string={'q': '0917 123'}, headers=admin_headers)
+    assert response.status_code == 200
+    assert labels(response.get_json()['data']['suggestions']) == ['Juan Dela Cruz']
+
+    response = client.get('/api/admin/lookup/suggest', query_string={'q': 'dela'}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert labels(response.get_json()['data']['suggestions']) == ['Juan Dela Cruz']
+    assert client.get('/api/admin/lookup/suggest', query_string={'q': 'dela'}).status_code == 401
@@ -0,0 +1,75 @@
+import pytest
+from flask import jsonify
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.utils import etags
+
+
+@pytest.fixture
+def versions(monkeypatch, fake_redis):
+    monkeypatch.setattr(etags, 'get_redis', lambda: fake_redis)
+    monkeypatch.setattr(etags, 'get_jwt_identity', lambda: 7)
+    return fake_redis
+
+
+@pytest.fixture
+def view():
+    calls = []
+
+    @etags.conditional_get
+    def listing():
+        calls.append(1)
+        return jsonify({'items': []})
+
+    listing.calls = calls
+    return listing
+
+
+def test_unchanged_version_returns_304_without_calling_view(app, versions, view):
+    with app.test_request_context('/api/loans/'):
+        first = view()
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag.startswith('W/')
+
+    with app.test_request_context('/api/loans/', headers={'If-None-Match': etag}):
+        second = view()
+    assert second.status_code == 304
+    assert second.headers['ETag'] == etag
+    assert len(view.calls) == 1
+
+    etags.bump_version(7)
+    with app.test_request_context('/api/loans/', headers={'If-None-Match': etag}):
+        third = view()
+    assert third.status_code == 200 and third.headers['ETag'] != etag
+
+
+def test_tag_depends_on_url(app, versions, view):
+    with app.test_request_context('/api/loans/?fields=id'):
+        sparse = view().headers['ETag']
+    with app.test_request_context('/api/loans/'):
+        full = view().headers['ETag']
+    assert sparse != full
+
+
+def test_no_etag_without_redis(app, monkeypatch, view):
+    monkeypatch.setattr(etags, 'get_redis', lambda: None)
+    monkeypatch.setattr(etags, 'get_jwt_identity', lambda: 7)
+    with app.test_request_context('/api/loans/', headers={'If-None-Match': 'W/"anything"'}):
+        response = view()
+    assert response.status_code == 200 and 'ETag' not in response.headers
+
+
+def test_committed_loan_write_bumps_owner_version(app, db_session, versions):
+    user = User(name='etag-user', phone_number='09175550000')
+    db_session.session.add(user)
+    db_session.session.commit()
+    before = etags.current_version(user.user_id)
+
+    db_session.session.add(Loan(
+        user_id=user.user_id, application_number='ET00000001', national_id='ETN00000001',
+        loan_amount=5000.0, term_months=6, loan_status=LoanStatus.PENDING
+    ))
+    assert etags.current_version(user.user_id) == before
+    db_session.session.commit()
+
+    assert etags.current_version(user.user_id) != before
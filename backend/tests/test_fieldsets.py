@@ -0,0 +1,67 @@
+import pytest
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.utils.fieldsets import ADMIN_LOAN_FIELDS, LOAN_FIELDS
+from app.utils.loaders import sparse_options
+from app.utils.pagination import paginate
+
+
+@pytest.fixture
+def loan(db_session):
+    user = User(name='sparse-user', phone_number='09173330000')
+    db_session.session.add(user)
+    db_session.session.flush()
+    loan = Loan(
+        user_id=user.user_id,
+        application_number='SF00000001',
+        national_id='SFN00000001',
+        loan_amount=150000.0,
+        term_months=24,
+        loan_status=LoanStatus.PENDING,
+        bank_name='Sparse Bank',
+        account_number='000111222'
+    )
+    db_session.session.add(loan)
+    db_session.session.commit()
+    db_session.session.expunge_all()
+    return loan
+
+
+def test_parse_rejects_unknown_fields():
+    assert LOAN_FIELDS.parse('loan_amount, loan_status,loan_amount') == ('loan_amount', 'loan_status')
+    assert LOAN_FIELDS.parse('', default=ADMIN_LOAN_FIELDS) == ADMIN_LOAN_FIELDS
+    with pytest.raises(ValueError):
+        LOAN_FIELDS.parse('loan_amount,otp')
+
+
+def test_projection_selects_only_requested_columns(loan, count_queries):
+    names = LOAN_FIELDS.parse('application_number,loan_status,borrower')
+
+    with count_queries() as queries:
+        loaded = Loan.query.options(*sparse_options(LOAN_FIELDS, names, Loan.created_at)).one()
+        data = LOAN_FIELDS.serialize(loaded, names)
+
+    assert data == {
+        'application_number': 'SF00000001',
+        'loan_status': 'pending',
+        'borrower': {
+            'id': loaded.user_id,
+            'name': 'sparse-user',
+            'email': None,
+            'phone_number': '09173330000',
+            'role': 'user',
+            'account_status': 'active',
+            'created_at': data['borrower']['created_at']
+        }
+    }
+    assert len(queries) == 1
+    assert 'bank_name' not in queries[0]
+    assert 'national_id' not in queries[0]
+
+
+def test_paginate_applies_fields_argument(app, loan):
+    with app.test_request_context('/api/loans/?fields=application_number,loan_amount'):
+        response = paginate(Loan.query, serializer=lambda item: item.to_dict(),
+                            sort_column=Loan.created_at, fieldset=LOAN_FIELDS)
+
+    assert response.get_json()['items'] == [{'application_number': 'SF00000001', 'loan_amount': 150000.0}]
@@ -0,0 +1,63 @@
+import pytest
+from flask import g
+from app.models.user import AccountStatus, User, Useroles
+from app.utils import identity
+from app.utils.cache import local_cache
+from app.utils.identity import load_identity
+
+
+@pytest.fixture
+def user(db_session, monkeypatch):
+    # Exercise the in-process tier
+    monkeypatch.setattr('app.utils.cache.get_redis', lambda: None)
+    local_cache.clear()
+    user = User(name='identity-user', email='identity@example.com', role=Useroles.ADMIN)
+    db_session.session.add(user)
+    db_session.session.commit()
+    return user
+
+
+def test_identity_memoized_and_cached(app, user, count_queries):
+    user_id = user.user_id
+    with app.test_request_context():
+        with count_queries() as queries:
+            first = load_identity(user_id)
+            assert load_identity(str(user_id)) is first
+        assert len(queries) == 1
+        assert (first.role, first.account_status, first.is_active) == (Useroles.ADMIN, AccountStatus.ACTIVE, True)
+
+    with app.test_request_context():
+        with count_queries() as queries:
+            assert load_identity(user_id).email == 'identity@example.com'
+        assert queries == []
+
+
+def test_status_change_invalidates_after_commit(app, db_session, user):
+    with app.test_request_context():
+        assert load_identity(user.user_id).is_active
+
+    user.account_status = AccountStatus.BANNED
+    db_session.session.commit()
+
+    with app.test_request_context():
+        assert load_identity(user.user_id).account_status == AccountStatus.BANNED
+
+
+def test_unrelated_change_keeps_cache(app, db_session, user, monkeypatch):
+    dropped = []
+    monkeypatch.setattr(identity, 'invalidate_identity', dropped.append)
+
+    user.phone_number = '09176660000'
+    db_session.session.commit()
+    assert dropped == []
+
+    user.role = Useroles.USER
+    db_session.session.commit()
+    assert dropped == [user.user_id]
+
+
+def test_unknown_user(app, user):
+    with app.test_request_context():
+        assert load_identity(999999) is None
+        assert load_identity('not-a-number') is None
+        assert g._identities[999999] is None
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+from app.utils import jobs
+from app.utils.jobs import MemoryBackend, Worker, enqueue, job
+
+calls = []
+
+
+@job
+def remember(value):
+    calls.append(value)
+
+
+@job(retries=2, backoff=0.01)
+def flaky(fail_times):
+    calls.append('attempt')
+    if calls.count('attempt') <= fail_times:
+        raise RuntimeError('temporary failure')
+
+
+@pytest.fixture
+def backend(app, monkeypatch):
+    calls.clear()
+    backend = MemoryBackend()
+    monkeypatch.setattr(jobs, 'memory_backend', backend)
+    monkeypatch.setattr(jobs, '_ensure_local_worker', lambda: None)
+    monkeypatch.setitem(app.config, 'JOBS_BACKEND', 'memory')
+    monkeypatch.setitem(app.config, 'JOBS_EAGER', False)
+    return backend
+
+
+def drain(app, backend, timeout=1.0):
+    worker = Worker(app, backend)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        worker.run_once(timeout=0.05)
+
+
+def test_delay_queues_instead_of_running(app, backend):
+    with app.app_context():
+        remember.delay('queued')
+    assert calls == []
+
+    assert Worker(app, backend).run_once() is True
+    assert calls == ['queued']
+
+
+def test_eager_mode_runs_inline(app, backend):
+    app.config['JOBS_EAGER'] = True
+    with app.app_context():
+        remember.delay('inline')
+    assert calls == ['inline']
+
+
+def test_failed_job_retried_with_backoff(app, backend):
+    with app.app_context():
+        flaky.delay(2)
+    drain(app, backend)
+
+    assert calls == ['attempt'] * 3
+    assert backend.dead_jobs == []
+
+
+def test_exhausted_job_is_dead_lettered(app, backend):
+    with app.app_context():
+        job_id = flaky.delay(10)
+    drain(app, backend)
+
+    assert calls == ['attempt'] * 3
+    [dead] = backend.dead_jobs
+    assert dead['id'] == job_id and dead['attempts'] == 3 and 'temporary failure' in dead['error']
+
+
+def test_redis_outage_falls_back_to_memory(app, backend, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOBS_BACKEND', 'redis')
+    monkeypatch.setattr(jobs, 'get_redis', lambda: None)
+    with app.app_context():
+        enqueue(remember.job_name, ['fallback'])
+
+    assert Worker(app, backend).run_once() is True
+    assert calls == ['fallback']
+
+
+def test_worker_threads_drain_queue(app, backend):
+    worker = Worker(app, backend, concurrency=4, poll_timeout=0.05).start()
+    with app.app_context():
+        for value in range(20):
+            remember.delay(value)
+    deadline = time.monotonic() + 2
+    while len(calls) < 20 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    worker.stop()
+
+    assert sorted(calls) == list(range(20))
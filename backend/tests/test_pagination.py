@@ -0,0 +1,125 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.utils.cache import local_cache
+from app.utils.pagination import (
+    COUNT_CACHED, COUNT_ESTIMATED, COUNT_EXACT, decode_cursor, encode_cursor, keyset_paginate
+)
+
+
+@pytest.fixture
+def loans(db_session):
+    user = User(name='pager', phone_number='09170000002')
+    db_session.session.add(user)
+    db_session.session.flush()
+    created = datetime(2026, 1, 1)
+    for i in range(45):
+        db_session.session.add(Loan(
+            user_id=user.user_id,
+            application_number=f'PG{i:08d}',
+            national_id=f'PGN{i:08d}',
+            loan_amount=100000.0 + (i % 5),  # duplicate sort values exercise the key tiebreaker
+            term_months=12,
+            loan_status=LoanStatus.APPROVED,  # one user may hold only one pending loan
+            created_at=created + timedelta(minutes=i // 3)
+        ))
+    db_session.session.commit()
+    return Loan.query
+
+
+@pytest.mark.parametrize('sort_column, descending', [
+    (Loan.created_at, True),
+    (Loan.loan_amount, False),
+])
+def test_cursor_walk_visits_every_row_once(loans, sort_column, descending):
+    seen = []
+    cursor = None
+    while True:
+        items, meta = keyset_paginate(loans, sort_column, descending=descending, per_page=10, cursor=cursor)
+        seen.extend(loan.application_id for loan in items)
+        if not meta['has_more']:
+            break
+        cursor = meta['next_cursor']
+
+    assert len(seen) == 45
+    assert len(set(seen)) == 45
+
+
+@pytest.mark.parametrize('descending', [True, False])
+def test_cursor_walk_includes_null_sort_values(db_session, descending):
+    user = User(name='pager-nulls', phone_number='09170000003')
+    db_session.session.add(user)
+    db_session.session.flush()
+    for i in range(25):
+        db_session.session.add(Loan(
+            user_id=user.user_id,
+            application_number=f'PN{i:08d}',
+            national_id=f'PNN{i:08d}',
+            loan_amount=100000.0,
+            term_months=12,
+            loan_status=LoanStatus.APPROVED,  # one user may hold only one pending loan
+            application_date=datetime(2026, 1, 1) + timedelta(days=i % 4) if i % 3 else None
+        ))
+    db_session.session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        items, meta = keyset_paginate(
+            Loan.query, Loan.application_date, descending=descending, per_page=4, cursor=cursor
+        )
+        seen.extend(items)
+        if not meta['has_more']:
+            break
+        cursor = meta['next_cursor']
+
+    assert len({loan.application_id for loan in seen}) == len(seen) == 25
+    nulls = [loan.application_date is None for loan in seen]
+    assert nulls == sorted(nulls, reverse=descending)  # NULLs first descending, last ascending
+
+
+def test_total_is_opt_in(loans, count_queries):
+    with count_queries() as without_total:
+        _, meta = keyset_paginate(loans, Loan.created_at, per_page=10)
+    assert 'total' not in meta
+    assert len(without_total) == 1
+
+    _, meta = keyset_paginate(loans, Loan.created_at, per_page=10, count_strategy=COUNT_EXACT)
+    assert meta['total'] == 45
+    assert meta['total_estimated'] is False
+
+
+def test_cached_total_is_shared_per_filter(loans, count_queries):
+    local_cache.clear()
+    keyset_paginate(loans, Loan.created_at, per_page=10, count_strategy=COUNT_CACHED)
+
+    with count_queries() as queries:
+        _, meta = keyset_paginate(loans, Loan.created_at, per_page=10, count_strategy=COUNT_CACHED)
+    assert len(queries) == 1
+    assert meta['total'] == 45
+    assert meta['total_estimated'] is True
+
+    filtered = loans.filter(Loan.loan_amount == 100000.0)
+    _, meta = keyset_paginate(filtered, Loan.created_at, per_page=10, count_strategy=COUNT_CACHED)
+    assert meta['total'] == 9
+    local_cache.clear()
+
+
+def test_estimated_total_falls_back_without_planner(loans):
+    local_cache.clear()
+    # SQLite has no planner estimate, so the cached exact count is used
+    _, meta = keyset_paginate(loans, Loan.created_at, per_page=10, count_strategy=COUNT_ESTIMATED)
+    assert meta['total'] == 45
+    assert meta['total_estimated'] is True
+    local_cache.clear()
+
+
+def test_cursor_rejected_for_other_sort():
+    token = encode_cursor('-created_at', [datetime(2026, 1, 1), 7])
+
+    assert decode_cursor(token, '-created_at', [Loan.created_at, Loan.application_id]) == [datetime(2026, 1, 1), 7]
+    with pytest.raises(ValueError):
+        decode_cursor(token, 'loan_amount', [Loan.loan_amount, Loan.application_id])
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor', '-created_at', [Loan.created_at, Loan.application_id])
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.api import loans as loans_api
+from app.models.user import User
+from app.models.loan import PENDING_LOAN_INDEX, Loan, LoanStatus
+from app.utils.sql import violates_unique
+
+
+@pytest.fixture
+def borrower(db_session):
+    user = User(name='pending-user', phone_number='09175551234')
+    db_session.session.add(user)
+    db_session.session.commit()
+    return user
+
+
+def make_loan(user, number, status=LoanStatus.PENDING):
+    return Loan(
+        user_id=user.user_id, application_number=f'PL{number:08d}', national_id=f'PLN{number:08d}',
+        loan_amount=150000.0, term_months=12, loan_status=status
+    )
+
+
+def test_second_pending_loan_rejected_by_index(db_session, borrower):
+    db_session.session.add_all([make_loan(borrower, 1), make_loan(borrower, 2, LoanStatus.APPROVED)])
+    db_session.session.commit()
+
+    db_session.session.add(make_loan(borrower, 3))
+    with pytest.raises(IntegrityError) as excinfo:
+        db_session.session.commit()
+    db_session.session.rollback()
+
+    assert violates_unique(excinfo.value, PENDING_LOAN_INDEX, 'loans', ('user_id',))
+
+
+def test_other_unique_violations_are_not_mistaken_for_pending(db_session, borrower):
+    other = User(name='pending-user-2', phone_number='09175554321')
+    db_session.session.add_all([other, make_loan(borrower, 1)])
+    db_session.session.commit()
+
+    duplicate = make_loan(other, 1)
+    db_session.session.add(duplicate)
+    with pytest.raises(IntegrityError) as excinfo:
+        db_session.session.commit()
+    db_session.session.rollback()
+
+    assert not violates_unique(excinfo.value, PENDING_LOAN_INDEX, 'loans', ('user_id',))
+
+
+def test_create_loan_maps_conflict_to_400(app, db_session, borrower, monkeypatch, count_queries):
+    monkeypatch.setattr(loans_api, 'get_jwt_identity', lambda: borrower.user_id)
+    view = loans_api.create_loan.__wrapped__.__wrapped__  # below @jwt_required and @idempotent
+    body = {'amount': 150000, 'termMonths': 12, 'national_id': 'PLN00000009'}
+
+    with app.test_request_context('/api/loans/', method='POST', json=body):
+        response, status = view()
+    assert status == 201
+    number = response.get_json()['application_number']
+
+    with app.test_request_context('/api/loans/', method='POST', json={**body, 'national_id': 'PLN00000010'}):
+        with count_queries() as queries:
+            response, status = view()
+    assert status == 400
+    assert response.get_json()['application_number'] == number
+    assert sum(statement.lstrip().upper().startswith('INSERT') for statement in queries) == 1
+
+
+def test_create_loan_rejects_missing_or_reused_national_id(app, db_session, borrower, monkeypatch):
+    other = User(name='pending-user-3', phone_number='09175556789')
+    db_session.session.add_all([other, make_loan(borrower, 1, LoanStatus.APPROVED)])
+    db_session.session.commit()
+    monkeypatch.setattr(loans_api, 'get_jwt_identity', lambda: other.user_id)
+    view = loans_api.create_loan.__wrapped__.__wrapped__
+    body = {'amount': 150000, 'termMonths': 12}
+
+    with app.test_request_context('/api/loans/', method='POST', json=body):
+        response, status = view()
+    assert status == 400
+    assert response.get_json() == {'message': 'National ID is required'}
+
+    with app.test_request_context('/api/loans/', method='POST', json={**body, 'national_id': 'PLN00000001'}):
+        response, status = view()
+    assert status == 400
+    assert 'error' not in response.get_json()
+    assert Loan.query.filter_by(user_id=other.user_id).count() == 0
@@ -0,0 +1,93 @@
+import pytest
+from functools import wraps
+from flask import g
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.models.withdrawal import Withdrawal
+from app.utils.loaders import admin_loan_options
+from app.utils.pagination import keyset_paginate
+from app.utils.query_budget import QueryBudgetExceeded, budget_for, enforce_budget, query_budget
+from app.utils.cache import invalidate, local_cache
+from app.utils.stats import STATS_CACHE_KEY, compute_recent_activity
+
+
+@pytest.fixture
+def borrowers(db_session):
+    for i in range(30):
+        user = User(name=f'budget-user-{i}', phone_number=f'0917444{i:04d}')
+        db_session.session.add(user)
+        db_session.session.flush()
+        db_session.session.add(Loan(
+            user_id=user.user_id,
+            application_number=f'QB{i:08d}',
+            national_id=f'QBN{i:08d}',
+            loan_amount=100000.0,
+            term_months=12,
+            loan_status=LoanStatus.PENDING
+        ))
+        db_session.session.add(Withdrawal(
+            user_id=user.user_id,
+            application_id=f'QBW{i:08d}',
+            application_number=f'QBW{i:08d}',
+            amount=1000.0,
+            otp='123456'
+        ))
+    db_session.session.commit()
+    db_session.session.expunge_all()
+    return db_session
+
+
+def test_admin_loan_page_with_borrowers_is_one_query(borrowers, count_queries):
+    with count_queries() as queries:
+        loans, _ = keyset_paginate(Loan.query.options(*admin_loan_options()), Loan.created_at, per_page=20)
+        page = [loan.to_admin_dict(include_borrower=True) for loan in loans]
+
+    assert len(page) == 20
+    assert all(item['borrower']['name'].startswith('budget-user-') for item in page)
+    assert len(queries) == 1
+
+
+def test_recent_activity_query_count_is_flat(borrowers, count_queries):
+    with count_queries() as queries:
+        activity = compute_recent_activity(limit=5)
+
+    assert len(activity['loans']) == 5
+    assert 'otp' not in activity['withdrawals'][0]
+    assert len(queries) == 3
+
+
+def test_budget_found_through_wrappers():
+    @query_budget(3)
+    def view():
+        pass
+
+    @wraps(view)
+    def decorated():
+        return view()
+
+    assert budget_for(decorated) == 3
+
+
+def test_strict_budget_raises(app):
+    with app.test_request_context('/api/admin/loans'):
+        g.query_count = 5
+        enforce_budget(5)
+        with pytest.raises(QueryBudgetExceeded):
+            enforce_budget(4)
+
+
+@pytest.mark.parametrize('path', [
+    '/api/admin/loans',
+    '/api/admin/users',
+    '/api/admin/stats',
+    '/api/admin/stats/timeseries',
+])
+def test_admin_views_stay_within_budget(app, client, borrowers, admin_headers, path):
+    assert app.config['QUERY_BUDGET_STRICT']
+    local_cache.clear()
+    invalidate(STATS_CACHE_KEY, *(f'stats:timeseries:{interval}' for interval in ('hour', 'day', 'week')))
+
+    response = client.get(path, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'success'
@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import false, func, select, text, tuple_
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.models.withdrawal import Withdrawal
+from app.utils.sql import is_postgres, query_plan, sequential_scans
+
+START = datetime(2026, 10, 1)
+END = datetime(2026, 10, 8)
+
+HOT_QUERIES = {
+    'pending_loan_check': select(Loan).filter_by(user_id=1, loan_status=LoanStatus.PENDING).limit(1),
+    'user_loan_page': select(Loan).where(
+        Loan.user_id == 1, Loan.is_deleted == false(),
+        tuple_(Loan.created_at, Loan.application_id) < tuple_(END, 1000)
+    ).order_by(Loan.created_at.desc(), Loan.application_id.desc()).limit(11),
+    'user_withdrawal_page': select(Withdrawal).where(
+        Withdrawal.user_id == 1, Withdrawal.is_deleted == false()
+    ).order_by(Withdrawal.created_at.desc(), Withdrawal.id.desc()).limit(11),
+    'loan_created_range': select(func.count()).select_from(Loan).where(
+        Loan.created_at >= START, Loan.created_at < END
+    ),
+    'loan_approval_range': select(func.sum(Loan.loan_amount)).where(
+        Loan.approval_date >= START, Loan.approval_date < END
+    ),
+    'withdrawal_created_range': select(func.count()).select_from(Withdrawal).where(
+        Withdrawal.created_at >= START, Withdrawal.created_at < END
+    ),
+    'user_created_range': select(func.count()).select_from(User).where(
+        User.created_at >= START, User.created_at < END
+    ),
+}
+
+
+@pytest.fixture
+def seeded(db_session):
+    users = [User(name=f'plan-user-{i}', phone_number=f'0917555{i:04d}') for i in range(20)]
+    db_session.session.add_all(users)
+    db_session.session.flush()
+    for i in range(200):
+        created = START + timedelta(hours=i)
+        db_session.session.add(Loan(
+            user_id=users[i % 20].user_id,
+            application_number=f'QP{i:08d}',
+            national_id=f'QPN{i:08d}',
+            loan_amount=10000.0,
+            term_months=12,
+            # One pending application per user, as the partial unique index allows
+            loan_status=LoanStatus.PENDING if i < len(users) else LoanStatus.APPROVED,
+            created_at=created,
+            approval_date=created + timedelta(days=1)
+        ))
+        db_session.session.add(Withdrawal(
+            user_id=users[i % 20].user_id,
+            application_id=f'QPW{i:08d}',
+            application_number=f'QPW{i:08d}',
+            amount=500.0,
+            otp='123456',
+            created_at=created
+        ))
+    db_session.session.commit()
+    if is_postgres(db_session.session):
+        db_session.session.execute(text('ANALYZE'))
+        # With a small seed the planner prefers sequential scans; only flag ones with no usable index
+        db_session.session.execute(text('SET LOCAL enable_seqscan = off'))
+    return db_session
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(seeded, name):
+    plan = query_plan(seeded.session, HOT_QUERIES[name])
+
+    assert sequential_scans(plan) == [], '\n'.join(plan)
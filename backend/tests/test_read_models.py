@@ -0,0 +1,104 @@
+import pytest
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.models.withdrawal import Withdrawal
+from app.utils.fieldsets import (
+    ADMIN_LOAN_FIELDS, LOAN_DETAIL_FIELDS, LOAN_FIELDS, USER_FIELDS, WITHDRAWAL_FIELDS
+)
+from app.utils.read_models import paginate_read_model, read_offset_page, read_page, read_select
+
+
+@pytest.fixture
+def loans(db_session):
+    user = User(name='read-model-user', phone_number='09174440000')
+    db_session.session.add(user)
+    db_session.session.flush()
+    loans = [
+        Loan(
+            user_id=user.user_id,
+            application_number=f'RM0000000{index}',
+            national_id=f'RMN0000000{index}',
+            loan_amount=10000.0 * (index + 1),
+            term_months=12,
+            loan_status=status
+        )
+        # At most one pending application per user
+        for index, status in enumerate((LoanStatus.PENDING, LoanStatus.APPROVED, LoanStatus.REJECTED))
+    ]
+    db_session.session.add_all(loans)
+    db_session.session.commit()
+    db_session.session.expunge_all()
+    return loans
+
+
+def test_rows_serialize_like_instances(db_session, loans):
+    statement = read_select(LOAN_FIELDS, ADMIN_LOAN_FIELDS, Loan.created_at).order_by(Loan.application_id)
+    rows = [LOAN_FIELDS.row_serializer(ADMIN_LOAN_FIELDS)(row) for row in db_session.session.execute(statement)]
+
+    # Nothing was hydrated into the identity map
+    assert len(db_session.session.identity_map) == 0
+
+    instances = Loan.query.order_by(Loan.application_id).all()
+    assert rows == [loan.to_admin_dict(include_borrower=True) for loan in instances]
+
+
+def test_detail_fields_match_to_dict(db_session, loans):
+    statement = read_select(LOAN_FIELDS, LOAN_DETAIL_FIELDS).order_by(Loan.application_id)
+    rows = [LOAN_FIELDS.row_serializer(LOAN_DETAIL_FIELDS)(row) for row in db_session.session.execute(statement)]
+
+    assert rows == [loan.to_dict() for loan in Loan.query.order_by(Loan.application_id)]
+
+
+def test_withdrawal_rows_match_to_dict_without_otp(db_session):
+    user = User(name='read-model-withdrawer', phone_number='09174440001')
+    db_session.session.add(user)
+    db_session.session.flush()
+    db_session.session.add(Withdrawal(
+        user_id=user.user_id, application_id='RMW00000001', application_number='RMW00000001',
+        amount=1000.0, otp='123456'
+    ))
+    db_session.session.commit()
+
+    names = WITHDRAWAL_FIELDS.names
+    rows = [WITHDRAWAL_FIELDS.row_serializer(names)(row)
+            for row in db_session.session.execute(read_select(WITHDRAWAL_FIELDS, names))]
+
+    assert rows == [withdrawal.to_dict() for withdrawal in Withdrawal.query]
+    assert 'otp' not in rows[0]
+
+
+def test_keyset_and_offset_pages(app, loans):
+    names = ('id', 'application_number')
+    serializer = LOAN_FIELDS.row_serializer(names)
+    statement = read_select(LOAN_FIELDS, names, Loan.created_at)
+
+    with app.test_request_context():
+        first, meta = read_page(statement, serializer, Loan.created_at, LOAN_FIELDS.primary_key,
+                                per_page=2, count_strategy='exact')
+        second, _ = read_page(statement, serializer, Loan.created_at, LOAN_FIELDS.primary_key,
+                              per_page=2, cursor=meta['next_cursor'])
+        numbered, total, pages = read_offset_page(
+            statement.order_by(Loan.created_at.desc(), Loan.application_id.desc()), serializer, page=2, per_page=2
+        )
+
+    assert meta['total'] == 3 and meta['has_more']
+    assert len({item['id'] for item in first + second}) == 3
+    assert numbered == second and (total, pages) == (3, 2)
+
+
+def test_paginate_read_model_applies_fields(app, loans):
+    # The fixture's loans are detached and expired; look the owner up again
+    user_id = User.query.filter_by(name='read-model-user').one().user_id
+    with app.test_request_context('/api/loans/?fields=application_number'):
+        response = paginate_read_model(
+            LOAN_FIELDS, [Loan.user_id == user_id], sort_column=Loan.created_at
+        )
+
+    assert sorted(item['application_number'] for item in response.get_json()['items']) == [
+        'RM00000000', 'RM00000001', 'RM00000002'
+    ]
+
+
+def test_users_select_excludes_unrequested_columns():
+    sql = str(read_select(USER_FIELDS, ('id', 'name')))
+    assert 'password_hash' not in sql and 'email' not in sql
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from app.models.activity_log import ActivityLog
+from app.models.token import TokenBlocklist
+from app.models.user import User
+from app.utils.retention import POLICIES, eligible_rows, purge, purge_cli, run_retention
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+def seed_tokens(db_session):
+    db_session.session.add_all([
+        TokenBlocklist(jti='expired-1', expires_at=NOW - timedelta(hours=1), created_at=NOW - timedelta(days=1)),
+        TokenBlocklist(jti='expired-2', expires_at=NOW - timedelta(days=3), created_at=NOW - timedelta(days=4)),
+        TokenBlocklist(jti='live', expires_at=NOW + timedelta(hours=1), created_at=NOW),
+        TokenBlocklist(jti='legacy-old', created_at=NOW - timedelta(days=400)),
+        TokenBlocklist(jti='legacy-recent', created_at=NOW - timedelta(seconds=1)),
+    ])
+    db_session.session.commit()
+
+
+def remaining_jtis(db_session):
+    return {row.jti for row in db_session.session.query(TokenBlocklist.jti)}
+
+
+def test_expired_tokens_removed_in_batches(app, db_session):
+    seed_tokens(db_session)
+
+    batches = list(purge(POLICIES['token_blocklist'], batch_size=2, now=NOW))
+
+    assert [rows for rows, _ in batches] == [2, 1]
+    assert all(seconds >= 0 for _, seconds in batches)
+    assert remaining_jtis(db_session) == {'live', 'legacy-recent'}
+
+
+def test_max_batches_bounds_a_run(app, db_session):
+    seed_tokens(db_session)
+
+    batches = list(purge(POLICIES['token_blocklist'], batch_size=1, max_batches=2, now=NOW))
+
+    assert len(batches) == 2
+    assert eligible_rows(POLICIES['token_blocklist'], now=NOW) == 1
+
+
+def test_activity_logs_kept_for_retention_period(app, db_session):
+    admin = User(name='retention-admin', email='retention@example.com')
+    db_session.session.add(admin)
+    db_session.session.flush()
+    db_session.session.add_all([
+        ActivityLog(admin_id=admin.user_id, action='old', timestamp=datetime.utcnow() - timedelta(days=400)),
+        ActivityLog(admin_id=admin.user_id, action='recent', timestamp=datetime.utcnow() - timedelta(days=5)),
+    ])
+    db_session.session.commit()
+
+    assert run_retention(['activity_logs']) == {'activity_logs': 1}
+    assert [row.action for row in db_session.session.query(ActivityLog.action)] == ['recent']
+
+
+def test_cli_dry_run_reports_without_deleting(app, db_session):
+    seed_tokens(db_session)
+
+    result = app.test_cli_runner().invoke(purge_cli, ['run', '--policy', 'token_blocklist', '--dry-run'])
+
+    assert 'token_blocklist:' in result.output and 'eligible rows' in result.output
+    assert len(remaining_jtis(db_session)) == 5
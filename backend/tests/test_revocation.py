@@ -0,0 +1,69 @@
+import time
+
+import pytest
+from app.models.token import TokenBlocklist
+from app.utils import revocation
+from app.utils.revocation import CHANNEL, KEY_PREFIX, SYNCED_KEY, RevocationChecker
+
+
+@pytest.fixture
+def redis_up(monkeypatch, fake_redis):
+    monkeypatch.setattr(revocation, 'get_redis', lambda: fake_redis)
+    return fake_redis
+
+
+def test_revoked_and_clean_tokens_answered_without_database(db_session, redis_up, count_queries):
+    expires = time.time() + 600
+    RevocationChecker().revoke('revoked-jti', expires)
+    assert redis_up.published == [(CHANNEL, 'revoked-jti')]
+
+    # A fresh worker: empty in-process tiers, no negative memo
+    checker = RevocationChecker(negative_ttl=0)
+    assert checker.is_revoked('clean-jti', expires) is False  # rebuilds the mirror once
+    assert SYNCED_KEY in redis_up.data
+
+    with count_queries() as queries:
+        assert checker.is_revoked('revoked-jti', expires) is True
+        assert checker.is_revoked('other-clean-jti', expires) is False
+    assert queries == []
+
+
+def test_mirror_rebuild_loads_unexpired_rows(db_session, redis_up):
+    db_session.session.add(TokenBlocklist(jti='written-while-redis-was-down'))
+    db_session.session.commit()
+
+    assert RevocationChecker().is_revoked('written-while-redis-was-down') is True
+    assert f"{KEY_PREFIX}written-while-redis-was-down" in redis_up.data
+
+
+def test_database_fallback_without_redis(db_session, monkeypatch):
+    monkeypatch.setattr(revocation, 'get_redis', lambda: None)
+    checker = RevocationChecker(negative_ttl=0)
+
+    assert checker.is_revoked('jti-1') is False
+    checker.revoke('jti-1', time.time() + 600)
+    assert RevocationChecker().is_revoked('jti-1') is True
+
+
+def test_invalidation_overrides_negative_memo(db_session, redis_up):
+    checker = RevocationChecker(negative_ttl=60)
+    assert checker.is_revoked('jti-2') is False
+
+    # What the pub/sub listener does when another worker revokes the token
+    checker.remember_revoked('jti-2')
+    assert checker.is_revoked('jti-2') is True
+
+
+def test_unmirrored_revocation_forces_rebuild_on_reconnect(db_session, redis_up, monkeypatch):
+    other_worker = RevocationChecker(negative_ttl=0)
+    assert other_worker.is_revoked('jti-3') is False  # mirror built and marked synced
+
+    revoking_worker = RevocationChecker()
+    monkeypatch.setattr(revocation, 'get_redis', lambda: None)
+    revoking_worker.revoke('jti-3', time.time() + 600)
+    monkeypatch.setattr(revocation, 'get_redis', lambda: redis_up)
+    assert other_worker.is_revoked('jti-3') is False  # the documented window
+
+    revoking_worker.is_revoked('unrelated-jti')  # next contact with Redis
+    assert (CHANNEL, 'jti-3') in redis_up.published
+    assert other_worker.is_revoked('jti-3') is True
@@ -0,0 +1,89 @@
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.utils.search import is_application_number_term, is_phone_term, loan_search_clause, user_search_clause
+
+
+def seed_people(db_session):
+    juan = User(name='Juan Dela Cruz', email='juan@example.com', phone_number='09171234567')
+    maria = User(name='Maria Santos', email='maria@example.ph', phone_number='+639181112222')
+    db_session.session.add_all([juan, maria])
+    db_session.session.flush()
+    for user, number in ((juan, 'LN2026ABC01'), (maria, 'LN2026XYZ02')):
+        db_session.session.add(Loan(
+            user_id=user.user_id,
+            application_number=number,
+            national_id=f'SRCH-{number}',
+            loan_amount=50000.0,
+            term_months=12,
+            loan_status=LoanStatus.PENDING
+        ))
+    db_session.session.commit()
+    return juan, maria
+
+
+def search_users(term):
+    return {user.name for user in User.query.filter(user_search_clause(term))}
+
+
+def search_loans(term):
+    return {loan.application_number for loan in Loan.query.filter(loan_search_clause(term))}
+
+
+def test_term_classification():
+    assert is_phone_term('0917 123')
+    assert is_phone_term('+63918')
+    assert is_phone_term('(0917) 123')
+    assert not is_phone_term('juan')
+    assert is_application_number_term('LN2026')
+    assert not is_application_number_term('2026')
+
+
+def test_user_substring_and_phone_prefix(db_session):
+    seed_people(db_session)
+
+    assert search_users('dela') == {'Juan Dela Cruz'}
+    assert search_users('EXAMPLE') == {'Juan Dela Cruz', 'Maria Santos'}
+    assert search_users('0917-123') == {'Juan Dela Cruz'}
+    assert search_users('+6391') == {'Maria Santos'}
+    assert search_users('1234567') == {'Juan Dela Cruz'}
+    assert search_users('111-2222') == {'Maria Santos'}
+    assert search_users('(0917) 123') == {'Juan Dela Cruz'}
+    assert search_users('100%') == set()
+
+
+def test_loan_search_matches_number_prefix_or_borrower(db_session):
+    seed_people(db_session)
+
+    assert search_loans('ln2026x') == {'LN2026XYZ02'}
+    assert search_loans('santos') == {'LN2026XYZ02'}
+    assert search_loans('ABC') == {'LN2026ABC01'}
+
+
+def test_number_shaped_term_still_matches_borrower_names(db_session):
+    seed_people(db_session)
+    reyes = User(name='Juan2026 Reyes', email='jr2026@example.com', phone_number='09179998888')
+    db_session.session.add(reyes)
+    db_session.session.flush()
+    db_session.session.add(Loan(
+        user_id=reyes.user_id,
+        application_number='LN2026QRS03',
+        national_id='SRCH-LN2026QRS03',
+        loan_amount=50000.0,
+        term_months=12,
+        loan_status=LoanStatus.PENDING
+    ))
+    db_session.session.commit()
+
+    assert is_application_number_term('juan2026')
+    assert search_loans('juan2026') == {'LN2026QRS03'}
+    assert search_loans('jr2026') == {'LN2026QRS03'}
+    assert search_loans('LN2026A') == {'LN2026ABC01'}
+
+
+def test_search_index_follows_updates(db_session):
+    juan, _ = seed_people(db_session)
+    juan.name = 'Pedro Penduko'
+    db_session.session.commit()
+
+    assert search_users('dela') == set()
+    assert search_users('penduko') == {'Pedro Penduko'}
@@ -0,0 +1,103 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.models.user import User
+from app.models.loan import Loan, LoanStatus
+from app.utils.cache import invalidate, local_cache
+from app.utils.timeseries import bucket_starts, parse_timestamp, truncate, volume_series
+
+NOW = datetime(2026, 10, 14, 15, 30)
+
+
+@pytest.fixture
+def empty_series_cache():
+    local_cache.clear()
+    invalidate(*(f'stats:timeseries:{interval}' for interval in ('hour', 'day', 'week')))
+    yield
+    local_cache.clear()
+
+
+def seed_loans(db_session, created):
+    user = User(name='series-user', phone_number='09170000001')
+    db_session.session.add(user)
+    db_session.session.flush()
+    for i, created_at in enumerate(created):
+        db_session.session.add(Loan(
+            user_id=user.user_id,
+            application_number=f'TS{i:08d}',
+            national_id=f'TSN{i:08d}',
+            loan_amount=100000.0,
+            term_months=12,
+            loan_status=LoanStatus.APPROVED,
+            created_at=created_at,
+            approval_date=created_at + timedelta(hours=1)
+        ))
+    db_session.session.commit()
+
+
+def test_week_buckets_start_on_monday():
+    assert truncate(datetime(2026, 10, 18, 13, 45), 'week') == datetime(2026, 10, 12)
+    assert bucket_starts(datetime(2026, 10, 1, 5), datetime(2026, 10, 3), 'day') == [
+        datetime(2026, 10, 1), datetime(2026, 10, 2)
+    ]
+
+
+def test_daily_series_counts_per_bucket(db_session, empty_series_cache):
+    seed_loans(db_session, [
+        datetime(2026, 10, 12, 9), datetime(2026, 10, 12, 18), datetime(2026, 10, 13, 10)
+    ])
+
+    series = volume_series(datetime(2026, 10, 11), datetime(2026, 10, 15), 'day', now=NOW)
+
+    assert [bucket['applications'] for bucket in series] == [0, 2, 1, 0]
+    assert series[1]['approved_amount'] == 200000.0
+
+
+def test_closed_buckets_are_served_from_cache(db_session, empty_series_cache, count_queries):
+    seed_loans(db_session, [datetime(2026, 10, 12, 9)])
+    start, end = datetime(2026, 10, 1), datetime(2026, 10, 15)
+    volume_series(start, end, 'day', now=NOW)
+
+    with count_queries() as queries:
+        series = volume_series(start, end, 'day', now=NOW)
+
+    # Only the open bucket (Oct 14) is recomputed: one grouped query per table
+    assert len(queries) == 3
+    assert series[11]['applications'] == 1
+
+
+def test_offset_timestamps_are_converted_to_utc(db_session, empty_series_cache):
+    assert parse_timestamp('2026-10-12T08:00:00+08:00') == datetime(2026, 10, 12)
+    assert parse_timestamp('2026-10-12') == datetime(2026, 10, 12)
+    with pytest.raises(ValueError):
+        parse_timestamp('last tuesday')
+
+    seed_loans(db_session, [datetime(2026, 10, 12, 9)])
+    manila = timezone(timedelta(hours=8))
+    series = volume_series(
+        datetime(2026, 10, 12, 8, tzinfo=manila), datetime(2026, 10, 14, 8, tzinfo=manila), 'day',
+        now=NOW.replace(tzinfo=timezone.utc)
+    )
+
+    assert [bucket['bucket'] for bucket in series] == ['2026-10-12T00:00:00', '2026-10-13T00:00:00']
+    assert series[0]['applications'] == 1
+
+
+def test_rejects_too_many_buckets(db_session):
+    with pytest.raises(ValueError):
+        volume_series(datetime(2000, 1, 1), datetime(2026, 1, 1), 'hour')
+
+
+def test_timeseries_endpoint_for_admin(client, db_session, admin_headers, empty_series_cache):
+    seed_loans(db_session, [datetime(2026, 10, 12, 9)])
+
+    response = client.get('/api/admin/stats/timeseries', headers=admin_headers, query_string={
+        'interval': 'day', 'start': '2026-10-12T08:00:00+08:00', 'end': '2026-10-14T08:00:00+08:00'
+    })
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['start'] == '2026-10-12T00:00:00'
+    assert [bucket['applications'] for bucket in data['series']] == [1, 0]
+
+    response = client.get('/api/admin/stats/timeseries', headers=admin_headers, query_string={'interval': 'year'})
+    assert response.status_code == 400
@@ -0,0 +1,55 @@
+from flask_jwt_extended import create_access_token
+from app.models.activity_log import ActivityLog
+from app.models.user import User
+from app.models.withdrawal import Withdrawal, WithdrawalStatus
+
+
+def make_withdrawal(user):
+    return Withdrawal(
+        user_id=user.user_id, application_id='WA00000001', application_number='WN00000001',
+        amount=5000.0, otp='123456'
+    )
+
+
+def bearer(app, user, role):
+    with app.app_context():
+        token = create_access_token(identity=user.user_id, additional_claims={'role': role})
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_processing_a_withdrawal_writes_the_audit_row(app, client, db_session):
+    admin = User(name='audit-admin', phone_number='09175550001')
+    borrower = User(name='audit-borrower', phone_number='09175550002')
+    db_session.session.add_all([admin, borrower])
+    db_session.session.commit()
+    withdrawal = make_withdrawal(borrower)
+    db_session.session.add(withdrawal)
+    db_session.session.commit()
+
+    response = client.post(
+        f'/api/withdrawals/{withdrawal.id}/process', json={'status': 'completed'},
+        headers=bearer(app, admin, 'admin')
+    )
+
+    assert response.status_code == 200
+    assert db_session.session.get(Withdrawal, withdrawal.id).withdrawal_status == WithdrawalStatus.COMPLETED
+    [log] = ActivityLog.query.all()
+    assert log.admin_id == admin.user_id
+    assert log.action == f'WITHDRAWAL_PROCESSED {withdrawal.id}: completed'
+
+
+def test_processing_a_withdrawal_requires_admin_role(app, client, db_session):
+    borrower = User(name='audit-borrower', phone_number='09175550002')
+    db_session.session.add(borrower)
+    db_session.session.commit()
+    withdrawal = make_withdrawal(borrower)
+    db_session.session.add(withdrawal)
+    db_session.session.commit()
+
+    response = client.post(
+        f'/api/withdrawals/{withdrawal.id}/process', json={'status': 'completed'},
+        headers=bearer(app, borrower, 'user')
+    )
+
+    assert response.status_code == 403
+    assert ActivityLog.query.count() == 0
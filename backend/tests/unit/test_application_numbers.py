@@ -0,0 +1,135 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import cache
+from app.utils.application_numbers import (
+    _RELEASE_LEASE_SCRIPT, EPOCH_MS, WORKER_LEASE_KEY, ApplicationNumberGenerator, WorkerIdUnavailable,
+    is_valid, parse
+)
+
+NOW_MS = EPOCH_MS + 86_400_000
+
+
+class LeaseRedis:
+    """The SET NX and owner-checked renew/release calls a worker ID lease makes."""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, owner, *args):
+        if self.data.get(key) != owner:
+            return 0
+        if script == _RELEASE_LEASE_SCRIPT:
+            del self.data[key]
+        return 1
+
+
+@pytest.fixture
+def lease_redis(monkeypatch):
+    client = LeaseRedis()
+    monkeypatch.setattr(cache, 'get_redis', lambda: client)
+    return client
+
+
+def test_numbers_carry_time_worker_and_check_character():
+    number = ApplicationNumberGenerator(worker_id=17, clock=lambda: NOW_MS).generate()
+
+    assert number.startswith('LN') and len(number) == 16
+    assert is_valid(number) and is_valid(number.lower())
+    assert parse(number) == (NOW_MS, 17, 0)
+
+
+def test_single_character_typos_are_rejected():
+    number = ApplicationNumberGenerator(worker_id=1).generate()
+
+    for position in range(2, len(number)):
+        replacement = '1' if number[position] != '1' else '2'
+        assert not is_valid(number[:position] + replacement + number[position + 1:])
+    assert not is_valid('LN123')
+    assert not is_valid(None)
+
+
+def test_monotonic_through_sequence_overflow_and_clock_rollback():
+    now = [NOW_MS]
+    generator = ApplicationNumberGenerator(worker_id=3, clock=lambda: now[0])
+
+    first = [generator.generate() for _ in range(5000)]  # more than 4096 in one millisecond
+    now[0] -= 1000  # wall clock steps back
+    second = [generator.generate() for _ in range(10)]
+
+    numbers = first + second
+    assert numbers == sorted(numbers)
+    assert len(set(numbers)) == len(numbers)
+
+
+def test_workers_never_collide():
+    first = ApplicationNumberGenerator(worker_id=1, clock=lambda: NOW_MS)
+    second = ApplicationNumberGenerator(worker_id=2, clock=lambda: NOW_MS)
+    left = {first.generate() for _ in range(100)}
+    right = {second.generate() for _ in range(100)}
+
+    assert len(left) == len(right) == 100
+    assert not left & right
+
+
+def test_worker_id_range_is_enforced():
+    with pytest.raises(ValueError):
+        ApplicationNumberGenerator(worker_id=1024)
+
+
+def test_processes_lease_distinct_worker_ids(lease_redis):
+    generators = [ApplicationNumberGenerator(clock=lambda: NOW_MS) for _ in range(50)]
+    worker_ids = [generator.worker_id for generator in generators]
+
+    assert len(set(worker_ids)) == 50
+    assert set(lease_redis.data) == {WORKER_LEASE_KEY.format(worker_id) for worker_id in worker_ids}
+    for generator in generators:
+        generator._lease.release()
+    assert lease_redis.data == {}
+
+
+def test_lost_lease_is_replaced_before_the_next_number(lease_redis):
+    generator = ApplicationNumberGenerator()
+    lost = generator.worker_id
+    lease = generator._lease
+    lease_redis.data[WORKER_LEASE_KEY.format(lost)] = 'another-process'
+
+    assert lease.renew() is False
+    assert parse(generator.generate())[1] != lost
+    generator._lease.release()
+
+
+def test_no_worker_id_is_guessed_without_redis(monkeypatch):
+    monkeypatch.setattr(cache, 'get_redis', lambda: None)
+
+    with pytest.raises(WorkerIdUnavailable):
+        ApplicationNumberGenerator().generate()
+
+
+def test_configured_worker_id_refused_in_forked_child(monkeypatch):
+    generator = ApplicationNumberGenerator(worker_id=5)
+    parent = os.getpid()
+    monkeypatch.setattr(os, 'getpid', lambda: parent + 1)
+
+    with pytest.raises(RuntimeError):
+        generator.generate()
+
+
+def test_numbers_unique_and_ordered_across_32_threads():
+    generator = ApplicationNumberGenerator(worker_id=9)
+
+    with ThreadPoolExecutor(32) as pool:
+        batches = list(pool.map(lambda _: [generator.generate() for _ in range(500)], range(32)))
+
+    numbers = [number for batch in batches for number in batch]
+    assert len(set(numbers)) == len(numbers) == 32 * 500
+    assert all(batch == sorted(batch) for batch in batches)
+    assert all(is_valid(number) and parse(number)[1] == 9 for number in numbers)
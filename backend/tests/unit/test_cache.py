@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+import redis
+from app.utils import cache as cache_module
+from app.utils.cache import LocalCache, get_or_compute
+
+
+def test_concurrent_misses_compute_once():
+    cache = LocalCache()
+    calls = []
+    barrier = threading.Barrier(20)
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {'total': 42}
+
+    def worker():
+        barrier.wait()
+        results.append(cache.get_or_compute('stats', compute, ttl=60, stale_ttl=60))
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'total': 42}] * 20
+
+
+def test_stale_value_served_while_refreshing():
+    cache = LocalCache()
+    cache.set('stats', 'old', ttl=0.01, stale_ttl=60)
+    time.sleep(0.02)
+    refreshing = threading.Event()
+    release = threading.Event()
+
+    def slow_compute():
+        refreshing.set()
+        release.wait(1)
+        return 'new'
+
+    refresher = threading.Thread(target=lambda: cache.get_or_compute('stats', slow_compute, 60, 60))
+    refresher.start()
+    refreshing.wait(1)
+
+    assert cache.get_or_compute('stats', lambda: 'unexpected', 60, 60) == 'old'
+
+    release.set()
+    refresher.join()
+    assert cache.get('stats') == 'new'
+
+
+def test_delete_forces_recompute():
+    cache = LocalCache()
+    cache.get_or_compute('stats', lambda: 1, 60, 60)
+    cache.delete('stats')
+
+    assert cache.get_or_compute('stats', lambda: 2, 60, 60) == 2
+
+
+class ReadOnlyRedis:
+    """Grants the recompute lock, then fails to store the value."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        if nx:
+            return True
+        raise redis.ConnectionError('connection lost')
+
+
+def test_failed_cache_write_does_not_recompute(monkeypatch):
+    monkeypatch.setattr(cache_module, 'get_redis', lambda: ReadOnlyRedis())
+    monkeypatch.setattr(cache_module, 'mark_redis_down', lambda error: None)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'total': 42}
+
+    assert get_or_compute('stats:write-fails', compute) == {'total': 42}
+    assert len(calls) == 1
+
+
+class DictRedis:
+    """Just enough of Redis for get_or_compute."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def eval(self, script, numkeys, *args):
+        return self.data.pop(args[0], None) is not None
+
+
+def test_hit_returns_what_the_miss_returned(monkeypatch):
+    client = DictRedis()
+    monkeypatch.setattr(cache_module, 'get_redis', lambda: client)
+    value = {'total': 3, 'amount': 1500.5, 'timestamp': datetime(2026, 10, 18).isoformat(), 'by': [1, None]}
+
+    miss = get_or_compute('stats:types', lambda: value)
+    hit = get_or_compute('stats:types', lambda: pytest.fail('recomputed on a hit'))
+
+    assert miss == hit == value
+
+
+def test_value_that_does_not_round_trip_fails_loudly(monkeypatch):
+    client = DictRedis()
+    monkeypatch.setattr(cache_module, 'get_redis', lambda: client)
+
+    with pytest.raises(TypeError):
+        get_or_compute('stats:decimal', lambda: {'amount': Decimal('1500.50')})
+    assert client.data == {}  # lock released, nothing cached
@@ -0,0 +1,61 @@
+import gzip
+
+from flask import Flask, Response, jsonify
+
+from app.utils.compression import CompressionMiddleware
+
+PAYLOAD = {'items': [{'id': index, 'status': 'pending'} for index in range(200)]}
+
+
+def make_client():
+    app = Flask(__name__)
+
+    @app.route('/large')
+    def large():
+        response = jsonify(PAYLOAD)
+        response.headers['Vary'] = 'Authorization'
+        return response
+
+    @app.route('/small')
+    def small():
+        return jsonify(ok=True)
+
+    @app.route('/binary')
+    def binary():
+        return Response(b'\0' * 4096, mimetype='application/octet-stream')
+
+    middleware = CompressionMiddleware(app.wsgi_app, min_size=256)
+    app.wsgi_app = middleware
+    return app.test_client(), middleware
+
+
+def test_gzip_negotiated_for_large_json():
+    client, _ = make_client()
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Authorization, Accept-Encoding'
+    assert int(response.headers['Content-Length']) == len(response.data)
+    assert gzip.decompress(response.data) == client.get('/large').data
+
+
+def test_small_binary_and_unaccepted_responses_pass_through():
+    client, _ = make_client()
+
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/binary', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/large', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+    assert 'Content-Encoding' not in client.get('/large').headers
+
+
+def test_repeated_body_served_from_cache(monkeypatch):
+    client, middleware = make_client()
+    calls = []
+    compress = gzip.compress
+    monkeypatch.setattr(gzip, 'compress', lambda *args, **kwargs: calls.append(1) or compress(*args, **kwargs))
+
+    first = client.get('/large', headers={'Accept-Encoding': 'gzip'}).data
+    second = client.get('/large', headers={'Accept-Encoding': 'gzip'}).data
+
+    assert first == second
+    assert len(calls) == 1 and len(middleware.cache) == 1
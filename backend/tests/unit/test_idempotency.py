@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+import redis
+from flask import Flask, jsonify, request
+
+from app.utils import idempotency
+from app.utils.idempotency import REPLAYED_HEADER, idempotent, local_idempotency_store
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(idempotency, 'get_redis', lambda: None)
+    monkeypatch.setattr(idempotency, 'get_jwt_identity', lambda: 7)
+    local_idempotency_store.clear()
+
+    app = Flask(__name__)
+    app.config['IDEMPOTENCY_WAIT_TIMEOUT'] = 5
+    app.config['IDEMPOTENCY_LOCK_TTL'] = 30
+    calls = []
+
+    @app.route('/loans', methods=['POST'])
+    @idempotent
+    def create():
+        calls.append(request.get_json())
+        time.sleep(float(request.args.get('delay', 0)))
+        if request.args.get('fail'):
+            return jsonify(message='Database error'), 500
+        return jsonify(number=len(calls)), 201
+
+    client = app.test_client()
+    client.application = app
+    client.calls = calls
+    return client
+
+
+def post(client, key, body=None, path='/loans'):
+    return client.post(path, json=body or {'amount': 100000}, headers={'Idempotency-Key': key})
+
+
+def test_retry_replays_first_response(client):
+    first = post(client, 'retry-1')
+    second = post(client, 'retry-1')
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json() == {'number': 1}
+    assert second.headers[REPLAYED_HEADER] == 'true'
+    assert len(client.calls) == 1
+
+
+def test_requests_without_key_are_not_deduplicated(client):
+    client.post('/loans', json={'amount': 1})
+    client.post('/loans', json={'amount': 1})
+
+    assert len(client.calls) == 2
+
+
+def test_key_reuse_with_different_body_rejected(client):
+    post(client, 'reuse-1', {'amount': 100000})
+
+    assert post(client, 'reuse-1', {'amount': 200000}).status_code == 422
+    assert len(client.calls) == 1
+
+
+def test_server_errors_are_not_stored(client):
+    assert post(client, 'fail-1', path='/loans?fail=1').status_code == 500
+    assert post(client, 'fail-1', path='/loans?fail=1').status_code == 500
+
+    assert len(client.calls) == 2
+
+
+def test_concurrent_duplicate_waits_for_first_result(client):
+    responses = []
+    threads = [
+        threading.Thread(target=lambda: responses.append(post(client, 'race-1', path='/loans?delay=0.3')))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+
+    assert len(client.calls) == 1
+    assert [response.get_json() for response in responses] == [{'number': 1}] * 2
+    assert sorted(REPLAYED_HEADER in response.headers for response in responses) == [False, True]
+
+
+def test_claim_outlives_lock_ttl_while_view_runs(client):
+    client.application.config['IDEMPOTENCY_LOCK_TTL'] = 0.3
+    responses = []
+    first = threading.Thread(target=lambda: responses.append(post(client, 'slow-1', path='/loans?delay=1')))
+    first.start()
+    time.sleep(0.6)  # past the initial claim TTL
+    responses.append(post(client, 'slow-1', path='/loans?delay=1'))
+    first.join()
+
+    assert len(client.calls) == 1
+    assert [response.get_json() for response in responses] == [{'number': 1}] * 2
+
+
+class BrokenRedis:
+    def set(self, *args, **kwargs):
+        raise redis.ConnectionError('connection refused')
+
+
+def test_redis_failure_falls_back_to_local_store(client, monkeypatch):
+    monkeypatch.setattr(idempotency, 'get_redis', lambda: BrokenRedis())
+    monkeypatch.setattr(idempotency, 'mark_redis_down', lambda error: None)
+
+    first = post(client, 'broken-1')
+    second = post(client, 'broken-1')
+
+    assert second.get_json() == first.get_json() == {'number': 1}
+    assert second.headers[REPLAYED_HEADER] == 'true'
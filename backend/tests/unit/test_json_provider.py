@@ -0,0 +1,56 @@
+import enum
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Flask
+
+from app.utils.json_provider import OrjsonProvider
+
+
+class Status(enum.Enum):
+    PENDING = 'PENDING'
+
+
+def make_app():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    return app
+
+
+def test_native_types():
+    provider = make_app().json
+    payload = {
+        'b': Status.PENDING,
+        'a': datetime(2024, 1, 2, 3, 4, 5),
+        'day': date(2024, 1, 2),
+        'amount': Decimal('10.50'),
+        1: 'non-string key'
+    }
+    assert json.loads(provider.dumps(payload)) == {
+        'b': 'PENDING',
+        'a': '2024-01-02T03:04:05',
+        'day': '2024-01-02',
+        'amount': '10.50',
+        '1': 'non-string key'
+    }
+    assert provider.dumps({'b': 1, 'a': 2}) == '{"a":2,"b":1}'
+
+
+def test_jsonify_response():
+    app = make_app()
+    with app.app_context():
+        from flask import jsonify
+        response = jsonify(status=Status.PENDING, total=Decimal('1'))
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == {'status': 'PENDING', 'total': '1'}
+
+
+def test_socketio_style_calls():
+    provider = make_app().json
+    # python-socketio encodes packets with compact separators and decodes text
+    encoded = provider.dumps(['event', {'when': datetime(2024, 1, 1)}], separators=(',', ':'))
+    assert isinstance(encoded, str)
+    assert provider.loads(encoded) == ['event', {'when': '2024-01-01T00:00:00'}]
+    # Arguments orjson cannot express fall back to the standard library
+    assert provider.dumps({'a': 1}, indent=4) == json.dumps({'a': 1}, indent=4)
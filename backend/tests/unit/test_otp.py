@@ -0,0 +1,66 @@
+import pytest
+from flask import Flask
+
+from app.utils import otp
+from app.utils.otp import issue_otp, local_otp_store, verify_otp
+
+
+@pytest.fixture
+def app_context(monkeypatch):
+    monkeypatch.setattr(otp, 'get_redis', lambda: None)
+    local_otp_store.clear()
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY='otp-test-secret-key', OTP_TTL=300, OTP_MAX_ATTEMPTS=3)
+    with app.app_context():
+        yield app
+
+
+def test_code_is_consumed_on_success(app_context):
+    code = issue_otp(7, 6)
+
+    assert len(code) == 6 and code.isdigit()
+    assert verify_otp(7, code) is True
+    assert verify_otp(7, code) is False
+
+
+def test_code_is_bound_to_customer(app_context):
+    code = issue_otp(7)
+
+    assert verify_otp(8, code) is False
+    assert verify_otp('7', code) is True
+
+
+def test_code_discarded_after_max_attempts(app_context):
+    code = issue_otp(7)
+    wrong = '000000' if code != '000000' else '111111'
+
+    for _ in range(3):
+        assert verify_otp(7, wrong) is False
+    assert verify_otp(7, code) is False
+
+
+def test_new_code_replaces_previous(app_context):
+    first = issue_otp(7)
+    second = issue_otp(7, 8)
+
+    assert first == second or verify_otp(7, first) is False
+    assert verify_otp(7, second) is True
+
+
+def test_expired_code_rejected(app_context):
+    app_context.config['OTP_TTL'] = -1
+    code = issue_otp(7)
+
+    assert verify_otp(7, code) is False
+
+
+def test_codes_are_not_stored_in_plain_text(app_context):
+    code = issue_otp(7)
+
+    assert all(code not in entry for entry in map(str, local_otp_store._entries.values()))
+
+
+def test_malformed_input(app_context):
+    with pytest.raises(ValueError):
+        issue_otp(7, 5)
+    assert verify_otp(7, 'abcdef') is False
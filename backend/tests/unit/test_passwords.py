@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.utils import passwords
+from app.utils.passwords import PasswordHasher, PasswordHasherBusy, canonical_method
+
+FAST = 'pbkdf2:sha256:1000'
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    hasher = PasswordHasher(method=FAST)
+    monkeypatch.setattr(passwords, 'password_hasher', hasher)
+    return hasher
+
+
+def test_canonical_method_fills_werkzeug_defaults():
+    assert canonical_method('pbkdf2:sha256') == 'pbkdf2:sha256:260000'
+    assert canonical_method('pbkdf2') == 'pbkdf2:sha256:260000'
+    assert canonical_method('pbkdf2:sha512:1000') == 'pbkdf2:sha512:1000'
+
+
+def test_needs_rehash_on_outdated_method_or_cost(hasher):
+    assert not hasher.needs_rehash(hasher.hash('secret'))
+    assert hasher.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:500'))
+    assert hasher.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha512:1000'))
+    assert hasher.needs_rehash(None)
+
+
+def test_verify_and_upgrade_replaces_outdated_hash(hasher):
+    old = generate_password_hash('secret', 'pbkdf2:sha256:500')
+    user = SimpleNamespace(password_hash=old)
+
+    assert passwords.verify_and_upgrade(user, 'wrong') is False
+    assert user.password_hash == old
+
+    assert passwords.verify_and_upgrade(user, 'secret') is True
+    assert user.password_hash.startswith(f"{FAST}$")
+    assert hasher.verify(user.password_hash, 'secret')
+
+
+def test_pool_hashes_in_worker_processes():
+    hasher = PasswordHasher(method=FAST, workers=1)
+    try:
+        pwhash = hasher.hash('secret')
+        assert hasher.verify(pwhash, 'secret')
+        assert not hasher.verify(pwhash, 'other')
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_pool_refuses_work():
+    hasher = PasswordHasher(method=FAST, workers=1, max_pending=1, timeout=0)
+    hasher._slots.acquire()
+    with pytest.raises(PasswordHasherBusy) as excinfo:
+        hasher.hash('secret')
+    assert excinfo.value.code == 503
+
+
+def test_slow_job_times_out_as_busy_and_keeps_its_slot():
+    hasher = PasswordHasher(method=FAST, workers=1, max_pending=1, timeout=0.2)
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher._run(time.sleep, 1)
+        # The abandoned job is still running in the pool and still holds the only slot
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash('secret')
+
+        # The slot comes back once the job finishes, whatever the machine's speed
+        assert hasher._slots.acquire(timeout=30)
+        hasher._slots.release()
+        hasher.timeout = 30
+        assert hasher.verify(hasher.hash('secret'), 'secret')
+    finally:
+        hasher.shutdown()
+
+
+def test_concurrent_logins_return_every_slot():
+    pwhash = generate_password_hash('secret', FAST)
+    hasher = PasswordHasher(method=FAST, workers=2, max_pending=2, timeout=30)
+    try:
+        with ThreadPoolExecutor(4) as requests:
+            assert all(requests.map(lambda _: hasher.verify(pwhash, 'secret'), range(8)))
+        # Every finished job gave its slot back, and there are still only two
+        assert all(hasher._slots.acquire(timeout=5) for _ in range(2))
+        assert not hasher._slots.acquire(blocking=False)
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,52 @@
+import enum
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship
+from app.utils.serializers import CompiledSerializer, compile_serializer
+
+Base = declarative_base()
+
+
+class Colour(enum.Enum):
+    RED = 'red'
+
+
+class Owner(Base):
+    __tablename__ = 'owners'
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+    to_dict = CompiledSerializer(('id', 'name'))
+
+
+class Widget(Base):
+    __tablename__ = 'widgets'
+    widget_id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, ForeignKey('owners.id'))
+    colour = Column(Enum(Colour))
+    made_at = Column(DateTime)
+    owner = relationship(Owner)
+
+    to_dict = CompiledSerializer(
+        (('id', 'widget_id'), 'colour', 'made_at'),
+        nested={'owner': ('owner', 'to_dict')}
+    )
+
+
+def test_conversions_resolved_from_column_types():
+    widget = Widget(widget_id=1, colour=Colour.RED, made_at=datetime(2026, 1, 2, 3, 4), owner=Owner(id=7, name='ana'))
+
+    assert widget.to_dict() == {
+        'id': 1,
+        'colour': 'red',
+        'made_at': '2026-01-02T03:04:00',
+        'owner': {'id': 7, 'name': 'ana'}
+    }
+    assert Widget(widget_id=2).to_dict() == {'id': 2, 'colour': None, 'made_at': None, 'owner': None}
+
+
+def test_generated_code_has_no_type_dispatch():
+    serializer = compile_serializer(Widget, ['colour', 'made_at'], formatters={'colour': lambda c: 'x'})
+
+    assert 'isinstance' not in serializer.__source__
+    assert serializer(Widget(colour=Colour.RED)) == {'colour': 'x', 'made_at': None}